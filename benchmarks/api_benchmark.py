@@ -0,0 +1,333 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import count
+
+from benchmarks.utils import Timer, percentile, setup_django
+
+SCENARIOS = ('list', 'search', 'filter', 'own_leaves', 'create', 'approve', 'sync')
+# Requests made per scenario before sampling starts; they warm caches and connections.
+WARMUP = 5
+LEAVES_START_OFFSET = 7
+CREATED_LEAVES_START_OFFSET = 3650
+
+
+class StubEmployeeAPI:
+    """Serves a fixed employee feed over HTTP on localhost so sync runs without the network."""
+
+    def __init__(self, employees):
+        body = json.dumps([
+            {'id': (i % 50) + 1, 'name': f'Feed Employee {i}', 'email': f'feed{i}@bench.example.com'}
+            for i in range(employees)
+        ]).encode('utf-8')
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_port}/employees'
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def setup_api_django(database_name=None, **overrides):
+    """Configures Django to serve API requests in-process with side files in a temporary directory."""
+    directory = tempfile.mkdtemp(prefix='benchmark-api-')
+    database_name = setup_django(
+        database_name,
+        ALLOWED_HOSTS=['*'],
+        SECURE_SSL_REDIRECT=False,
+        THROTTLE_STORE_PATH=os.path.join(directory, 'throttle.sqlite3'),
+        JWT_BLACKLIST_PATH=os.path.join(directory, 'token_blacklist.sqlite3'),
+        METRICS_DIR=os.path.join(directory, 'metrics'),
+        **overrides
+    )
+
+    from django.conf import settings
+
+    # The benchmark measures the request path, not how quickly throttles reject it. The rates
+    # dict is shared with the throttle classes, so it is raised in place.
+    rates = settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']
+    for scope in rates:
+        rates[scope] = '1000000/second'
+    # Per-request info lines would drown the results table.
+    logging.disable(logging.INFO)
+    return database_name
+
+
+def seed(users, employees, leaves, batch_size):
+    """Bulk-loads the dataset; every employee with an index below `users` gets a login."""
+    from django.contrib.auth.hashers import make_password
+    from accounts.models import User
+    from employees.models import Employee
+    from leaves.models import LeaveRequest
+
+    password = make_password('benchmark-password')
+    hr_user = User.objects.create(username='bench-hr', email='hr@bench.example.com', password=password, role='HR')
+    User.objects.bulk_create(
+        [
+            User(username=f'bench-user-{i}', email=f'user{i}@bench.example.com', password=password, role='EMPLOYEE')
+            for i in range(users)
+        ],
+        batch_size=batch_size
+    )
+    user_ids = dict(User.objects.filter(role='EMPLOYEE').values_list('username', 'id'))
+
+    rows = []
+    for i in range(employees):
+        name = f'Employee {i}'
+        company_id = (i % 50) + 1
+        rows.append(Employee(
+            user_id=user_ids.get(f'bench-user-{i}'),
+            name=name,
+            email=f'employee{i}@bench.example.com',
+            company_id=company_id,
+            joining_date=date(2020, 1, 1) + timedelta(days=i % 1500),
+            content_hash=Employee.compute_content_hash(name, company_id),
+        ))
+    Employee.objects.bulk_create(rows, batch_size=batch_size)
+    employee_ids = list(Employee.objects.order_by('id').values_list('id', flat=True))
+
+    # Each employee's leaves take consecutive, non-overlapping two-day slots.
+    today = date.today()
+    leave_types = ('annual', 'sick', 'casual')
+    statuses = ('pending', 'pending', 'approved', 'rejected')
+    rows = []
+    for i in range(leaves):
+        start_date = today + timedelta(days=LEAVES_START_OFFSET + (i // len(employee_ids)) * 3)
+        rows.append(LeaveRequest(
+            employee_id=employee_ids[i % len(employee_ids)],
+            leave_type=leave_types[i % len(leave_types)],
+            start_date=start_date,
+            end_date=start_date + timedelta(days=1),
+            status=statuses[i % len(statuses)],
+        ))
+    LeaveRequest.objects.bulk_create(rows, batch_size=batch_size)
+    return hr_user
+
+
+def authenticated_client(user):
+    from rest_framework.test import APIClient
+    from rest_framework_simplejwt.tokens import RefreshToken
+    from core.authentication import add_user_claims
+
+    client = APIClient()
+    token = add_user_claims(RefreshToken.for_user(user), user)
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token.access_token}')
+    return client
+
+
+def check(response, expected_status):
+    if response.status_code != expected_status:
+        raise RuntimeError(
+            f'{response.request["REQUEST_METHOD"]} {response.request["PATH_INFO"]} returned '
+            f'{response.status_code}: {response.content[:500]!r}'
+        )
+    return response
+
+
+def build_scenarios(hr_user, stub_url, sync_timeout):
+    from accounts.models import User
+    from leaves.models import LeaveRequest
+
+    hr = authenticated_client(hr_user)
+    employee_user = User.objects.filter(role='EMPLOYEE', employee_profile__isnull=False).order_by('id').first()
+    employee = authenticated_client(employee_user) if employee_user else None
+    pending_ids = iter(LeaveRequest.objects.filter(status='pending').order_by('id').values_list('id', flat=True))
+    # A unique query parameter per request keeps cache_page from serving the list endpoints.
+    nonce = count()
+    created_offset = count(CREATED_LEAVES_START_OFFSET, 3)
+
+    def list_employees():
+        check(hr.get('/api/employees/', {'page': 1, 'nonce': next(nonce)}), 200)
+
+    def search_employees():
+        check(hr.get('/api/employees/', {'search': 'Employee 1', 'nonce': next(nonce)}), 200)
+
+    def filter_leaves():
+        check(hr.get('/api/leaves/', {'status': 'pending', 'leave_type': 'annual', 'nonce': next(nonce)}), 200)
+
+    def own_leaves():
+        check(employee.get('/api/leaves/', {'nonce': next(nonce)}), 200)
+
+    def create_leave():
+        start_date = date.today() + timedelta(days=next(created_offset))
+        check(employee.post('/api/leaves/', {
+            'leave_type': 'annual',
+            'start_date': start_date.isoformat(),
+            'end_date': (start_date + timedelta(days=1)).isoformat(),
+        }, format='json'), 201)
+
+    def approve_leave():
+        try:
+            leave_id = next(pending_ids)
+        except StopIteration:
+            raise RuntimeError('Not enough pending leave requests seeded; raise --leaves.') from None
+        check(hr.patch(f'/api/leaves/{leave_id}/approve/'), 200)
+
+    def sync_employees():
+        # Measured end to end: queueing the job and polling until the worker finishes it.
+        job_id = check(hr.post('/api/employees/sync/', {'api_url': stub_url}, format='json'), 202).data['data']['job_id']
+        deadline = time.monotonic() + sync_timeout
+        while time.monotonic() < deadline:
+            job = check(hr.get(f'/api/employees/sync/{job_id}/'), 200).data['data']
+            if job['status'] == 'completed':
+                return
+            if job['status'] == 'failed':
+                raise RuntimeError(f"Sync job failed: {job['error_message']}")
+            time.sleep(0.005)
+        raise RuntimeError(f'Sync job {job_id} did not finish within {sync_timeout}s.')
+
+    scenarios = {
+        'list': list_employees,
+        'search': search_employees,
+        'filter': filter_leaves,
+        'approve': approve_leave,
+        'sync': sync_employees,
+    }
+    if employee is not None:
+        scenarios['own_leaves'] = own_leaves
+        scenarios['create'] = create_leave
+    return scenarios
+
+
+def measure(operation, iterations):
+    for _ in range(WARMUP):
+        operation()
+    samples = []
+    with Timer() as timer:
+        for _ in range(iterations):
+            started = time.perf_counter()
+            operation()
+            samples.append(time.perf_counter() - started)
+    return {
+        'iterations': iterations,
+        'mean_ms': round(statistics.fmean(samples) * 1000, 3),
+        'p50_ms': round(percentile(samples, 0.5) * 1000, 3),
+        'p99_ms': round(percentile(samples, 0.99) * 1000, 3),
+        'max_ms': round(max(samples) * 1000, 3),
+        'throughput_rps': round(iterations / timer.elapsed, 1),
+    }
+
+
+def compare(results, baseline, threshold):
+    """Returns (scenario, metric, baseline, current) for every metric that regressed beyond threshold."""
+    regressions = []
+    for name, current in results['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if not previous:
+            continue
+        for metric in ('p50_ms', 'p99_ms'):
+            if current[metric] > previous[metric] * (1 + threshold):
+                regressions.append((name, metric, previous[metric], current[metric]))
+        if current['throughput_rps'] < previous['throughput_rps'] * (1 - threshold):
+            regressions.append((name, 'throughput_rps', previous['throughput_rps'], current['throughput_rps']))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark API latency and throughput against a seeded dataset.')
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--employees', type=int, default=10000)
+    parser.add_argument('--leaves', type=int, default=50000)
+    parser.add_argument('--feed-size', type=int, default=1000, help='Employees served by the stub API for sync')
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--sync-iterations', type=int, default=10)
+    parser.add_argument('--sync-timeout', type=float, default=60)
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS))
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--database', default=None, help='SQLite file to use (defaults to a temporary file)')
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    parser.add_argument('--compare', help='Baseline results JSON; exits non-zero when a scenario regressed')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Allowed relative regression (default 20%%)')
+    args = parser.parse_args()
+
+    selected = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = set(selected) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+    if args.employees <= 0 or args.users > args.employees:
+        parser.error('--employees must be positive and at least --users')
+
+    database_name = setup_api_django(args.database)
+
+    import django
+    from django.db import connection
+
+    with Timer() as timer:
+        hr_user = seed(args.users, args.employees, args.leaves, args.batch_size)
+    print(
+        f'Database: {database_name}, seeded {args.users} users, {args.employees} employees, '
+        f'{args.leaves} leave requests in {timer.elapsed:.2f}s'
+    )
+
+    results = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'platform': platform.platform(),
+            'database': connection.vendor,
+            'users': args.users,
+            'employees': args.employees,
+            'leaves': args.leaves,
+            'feed_size': args.feed_size,
+        },
+        'scenarios': {},
+    }
+
+    print(f"{'scenario':>11} {'n':>6} {'mean ms':>9} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9} {'req/s':>9}")
+    with StubEmployeeAPI(args.feed_size) as stub:
+        scenarios = build_scenarios(hr_user, stub.url, args.sync_timeout)
+        for name in selected:
+            if name not in scenarios:
+                print(f'{name:>11} skipped: no employee user seeded (--users 0)')
+                continue
+            iterations = args.sync_iterations if name == 'sync' else args.iterations
+            result = results['scenarios'][name] = measure(scenarios[name], iterations)
+            print(
+                f"{name:>11} {iterations:>6} {result['mean_ms']:>9.2f} {result['p50_ms']:>9.2f} "
+                f"{result['p99_ms']:>9.2f} {result['max_ms']:>9.2f} {result['throughput_rps']:>9.1f}"
+            )
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f'Results written to {args.output}')
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for name, metric, previous, current in regressions:
+            print(f'REGRESSION {name} {metric}: {previous} -> {current}')
+        if regressions:
+            sys.exit(1)
+        print(f'No regressions beyond {args.threshold:.0%} against {args.compare}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+import argparse
+import io
+import time
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+from benchmarks.utils import parse_int_list, percentile, setup_django
+
+
+def build_page(rows, native):
+    """A paginated leave list of `rows` results.
+
+    With `native`, dates, datetimes and decimals are left as Python objects, as in exports built
+    from `values()`; otherwise they are strings, as the serializers return them.
+    """
+    created = datetime(2024, 1, 1, 8, 30, 12, 345678, tzinfo=timezone.utc)
+    results = []
+    for index in range(rows):
+        start_date = date(2025, 1, 1) + timedelta(days=index % 365)
+        end_date = start_date + timedelta(days=1 + index % 5)
+        approval_date = created + timedelta(hours=index)
+        row = {
+            'id': index + 1,
+            'employee': index // 5 + 1,
+            'employee_name': f'Employee {index // 5}',
+            'employee_email': f'employee{index // 5}@example.com',
+            'leave_type': ('annual', 'sick', 'casual')[index % 3],
+            'start_date': start_date,
+            'end_date': end_date,
+            'status': ('approved', 'rejected', 'pending')[index % 3],
+            'approval_date': approval_date,
+            'created_at': created,
+            'updated_at': created,
+            'days': Decimal(end_date.toordinal() - start_date.toordinal()),
+        }
+        if not native:
+            for field in ('start_date', 'end_date'):
+                row[field] = row[field].isoformat()
+            for field in ('approval_date', 'created_at', 'updated_at'):
+                row[field] = row[field].isoformat().replace('+00:00', 'Z')
+            row['days'] = str(row['days'])
+        results.append(row)
+    return {'count': rows, 'next': None, 'previous': None, 'results': results}
+
+
+def measure(function, iterations):
+    for _ in range(min(iterations, 5)):
+        function()
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the stdlib and orjson JSON renderer and parser.')
+    parser.add_argument('--rows', default='100,10000', help='Comma-separated page sizes')
+    parser.add_argument('--iterations', type=int, default=200, help='Timed runs per measurement (a tenth for 10k+ rows)')
+    args = parser.parse_args()
+
+    setup_django(migrate=False)
+
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+    from core.parsers import FastJSONParser
+    from core.renderers import FastJSONRenderer, orjson
+
+    if orjson is None:
+        print('orjson is not installed: the fast classes fall back to the stdlib and match it.')
+
+    print(f"{'rows':>6} {'payload':>8} {'operation':>9} {'class':>10} {'KiB':>7} {'p50 ms':>9} {'p99 ms':>9} {'speedup':>8}")
+    for rows in parse_int_list(args.rows):
+        iterations = max(args.iterations // 10, 10) if rows >= 10000 else args.iterations
+        for native in (False, True):
+            page = build_page(rows, native)
+            body = JSONRenderer().render(page)
+            payload = 'native' if native else 'strings'
+            operations = [
+                ('render', 'stdlib', lambda: JSONRenderer().render(page)),
+                ('render', 'fast', lambda: FastJSONRenderer().render(page)),
+                ('parse', 'stdlib', lambda: JSONParser().parse(io.BytesIO(body))),
+                ('parse', 'fast', lambda: FastJSONParser().parse(io.BytesIO(body))),
+            ]
+            baseline = None
+            for operation, name, function in operations:
+                # Parsed bodies are the same bytes either way, so parsing is measured once.
+                if operation == 'parse' and native:
+                    continue
+                samples = measure(function, iterations)
+                p50 = percentile(samples, 0.5)
+                if name == 'stdlib':
+                    baseline = p50
+                print(
+                    f'{rows:>6} {payload:>8} {operation:>9} {name:>10} {len(body) / 1024:>7.0f} '
+                    f'{p50 * 1000:>9.3f} {percentile(samples, 0.99) * 1000:>9.3f} {baseline / p50:>7.1f}x'
+                )
+
+
+if __name__ == '__main__':
+    main()
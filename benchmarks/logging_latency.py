@@ -0,0 +1,81 @@
+import argparse
+import logging
+import os
+import statistics
+import tempfile
+import time
+from logging.handlers import RotatingFileHandler
+
+from benchmarks.utils import Timer, percentile
+
+FORMAT = '{levelname} {asctime} {module} {process:d} {thread:d} {message}'
+
+
+def build_handler(kind, filename):
+    from core.log_handlers import QueuedHandler
+
+    kwargs = {'filename': filename, 'maxBytes': 1024 * 1024 * 10, 'backupCount': 5}
+    if kind == 'queued':
+        handler = QueuedHandler('logging.handlers.RotatingFileHandler', **kwargs)
+    else:
+        handler = RotatingFileHandler(**kwargs)
+    handler.setFormatter(logging.Formatter(FORMAT, style='{'))
+    return handler
+
+
+def measure(kind, calls, directory):
+    logger = logging.getLogger(f'benchmarks.logging.{kind}')
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    handler = build_handler(kind, os.path.join(directory, f'{kind}.log'))
+    logger.addHandler(handler)
+
+    samples = []
+    for leave_id in range(calls):
+        started = time.perf_counter_ns()
+        logger.info('Leave request approved: %s', leave_id)
+        samples.append(time.perf_counter_ns() - started)
+
+    with Timer() as drain:
+        logger.removeHandler(handler)
+        handler.close()
+    return samples, drain.elapsed
+
+
+def measure_disabled(calls):
+    logger = logging.getLogger('benchmarks.logging.disabled')
+    logger.setLevel(logging.INFO)
+    payload = {'id': 1, 'name': 'Employee 1', 'email': 'employee1@bench.example.com'}
+
+    with Timer() as eager:
+        for _ in range(calls):
+            logger.debug(f'Employee sync chunk upserted: {payload}')
+    with Timer() as lazy:
+        for _ in range(calls):
+            logger.debug('Employee sync chunk upserted: %s', payload)
+    return eager.elapsed, lazy.elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure caller-side latency of file logging.')
+    parser.add_argument('--calls', type=int, default=50000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='benchmark-logs-') as directory:
+        print(f"{'handler':>10} {'mean us':>9} {'p50 us':>9} {'p99 us':>9} {'max us':>10} {'drain s':>9}")
+        for kind in ('direct', 'queued'):
+            samples, drain = measure(kind, args.calls, directory)
+            print(
+                f'{kind:>10} {statistics.fmean(samples) / 1000:>9.2f} {percentile(samples, 0.5) / 1000:>9.2f} '
+                f'{percentile(samples, 0.99) / 1000:>9.2f} {max(samples) / 1000:>10.1f} {drain:>9.3f}'
+            )
+
+    eager, lazy = measure_disabled(args.calls)
+    print(
+        f'Suppressed debug call: f-string {eager / args.calls * 1e6:.2f} us, '
+        f'lazy %-args {lazy / args.calls * 1e6:.2f} us'
+    )
+
+
+if __name__ == '__main__':
+    main()
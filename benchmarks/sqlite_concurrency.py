@@ -0,0 +1,141 @@
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from itertools import count
+from multiprocessing import get_context
+
+from benchmarks.utils import percentile
+
+# The settings before the tuned profile: default journal mode and pragmas, deferred
+# transactions and a new connection for every request.
+BASELINE_DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'CONN_MAX_AGE': 0,
+    }
+}
+PROFILES = ('baseline', 'tuned')
+
+
+def run_client(role, hr_user_id, leave_ids, duration):
+    """One worker process issuing requests back to back until `duration` elapses."""
+    from django.db import connections
+    from accounts.models import User
+    from benchmarks.api_benchmark import authenticated_client
+
+    client = authenticated_client(User.objects.get(pk=hr_user_id))
+    connections.close_all()
+    nonce = count()
+    leave_ids = iter(leave_ids)
+    samples = []
+    errors = 0
+    deadline = time.monotonic() + duration
+
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        try:
+            if role == 'writer':
+                leave_id = next(leave_ids, None)
+                if leave_id is None:
+                    break
+                response = client.patch(f'/api/leaves/{leave_id}/approve/')
+            else:
+                response = client.get('/api/leaves/', {'status': 'pending', 'nonce': next(nonce)})
+        except Exception:
+            errors += 1
+            continue
+        if response.status_code != 200:
+            errors += 1
+            continue
+        samples.append(time.perf_counter() - started)
+
+    connections.close_all()
+    return role, samples, errors
+
+
+def _run_client(arguments):
+    return run_client(*arguments)
+
+
+def run_profile(profile, args):
+    from benchmarks.api_benchmark import seed, setup_api_django
+
+    overrides = {'DATABASES': BASELINE_DATABASES} if profile == 'baseline' else {}
+    setup_api_django(args.database, **overrides)
+
+    from django.db import connection, connections
+    from leaves.models import LeaveRequest
+
+    hr_user = seed(0, args.employees, args.leaves, 1000)
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA journal_mode')
+        journal_mode = cursor.fetchone()[0]
+    pending = list(LeaveRequest.objects.filter(status='pending').order_by('id').values_list('id', flat=True))
+    # Forked clients must open their own connections.
+    connections.close_all()
+
+    tasks = [('reader', hr_user.pk, [], args.duration) for _ in range(args.readers)]
+    tasks += [('writer', hr_user.pk, pending[index::args.writers], args.duration) for index in range(args.writers)]
+    with get_context('fork').Pool(len(tasks)) as pool:
+        outcomes = pool.map(_run_client, tasks)
+
+    result = {'profile': profile, 'journal_mode': journal_mode}
+    for role, name in (('reader', 'list'), ('writer', 'approve')):
+        samples = [sample for kind, role_samples, _ in outcomes if kind == role for sample in role_samples]
+        errors = sum(role_errors for kind, _, role_errors in outcomes if kind == role)
+        result[name] = {
+            'requests': len(samples),
+            'errors': errors,
+            'throughput_rps': round(len(samples) / args.duration, 1),
+            'mean_ms': round(statistics.fmean(samples) * 1000, 3) if samples else None,
+            'p50_ms': round(percentile(samples, 0.5) * 1000, 3) if samples else None,
+            'p99_ms': round(percentile(samples, 0.99) * 1000, 3) if samples else None,
+        }
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compare concurrent approve and list traffic on the baseline and tuned SQLite profiles.'
+    )
+    parser.add_argument('--profiles', default=','.join(PROFILES))
+    parser.add_argument('--readers', type=int, default=4, help='Processes listing leave requests')
+    parser.add_argument('--writers', type=int, default=2, help='Processes approving leave requests')
+    parser.add_argument('--duration', type=float, default=10, help='Seconds of traffic per profile')
+    parser.add_argument('--employees', type=int, default=2000)
+    parser.add_argument('--leaves', type=int, default=20000)
+    parser.add_argument('--database', default=None, help=argparse.SUPPRESS)
+    parser.add_argument('--profile', choices=PROFILES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.profile:
+        # Settings cannot change after django.setup(), so each profile runs in its own interpreter.
+        print(json.dumps(run_profile(args.profile, args)))
+        return
+
+    print(
+        f'{args.readers} list and {args.writers} approve processes for {args.duration:.0f}s per profile, '
+        f'{args.employees} employees, {args.leaves} leave requests'
+    )
+    print(f"{'profile':>9} {'journal':>8} {'request':>8} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>9} {'errors':>7}")
+    for profile in args.profiles.split(','):
+        command = [
+            sys.executable, '-m', 'benchmarks.sqlite_concurrency', '--profile', profile,
+            '--readers', str(args.readers), '--writers', str(args.writers), '--duration', str(args.duration),
+            '--employees', str(args.employees), '--leaves', str(args.leaves),
+        ]
+        output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        for name in ('list', 'approve'):
+            entry = result[name]
+            print(
+                f"{profile:>9} {result['journal_mode']:>8} {name:>8} {entry['throughput_rps']:>8.1f} "
+                f"{entry['p50_ms'] or 0:>8.2f} {entry['p99_ms'] or 0:>9.2f} {entry['errors']:>7}"
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+import argparse
+import random
+
+from benchmarks.utils import Timer, parse_int_list, setup_django
+
+
+def build_feed(rows, offset=0):
+    return [
+        {'id': (i % 500) + 1, 'name': f'Employee {i}', 'email': f'employee{i}@bench.example.com'}
+        for i in range(offset, offset + rows)
+    ]
+
+
+def run(rows, batch_size, changed_ratio):
+    from employees.models import Employee
+    from employees.services import EmployeeSyncService
+
+    Employee.objects.all().delete()
+    feed = build_feed(rows)
+    results = {}
+
+    with Timer() as timer:
+        counts = EmployeeSyncService.sync_employees(feed, batch_size=batch_size)
+    results['initial'] = (timer.elapsed, counts)
+
+    with Timer() as timer:
+        counts = EmployeeSyncService.sync_employees(feed, batch_size=batch_size)
+    results['unchanged'] = (timer.elapsed, counts)
+
+    for index in random.Random(rows).sample(range(rows), int(rows * changed_ratio)):
+        feed[index]['name'] += ' (renamed)'
+    with Timer() as timer:
+        counts = EmployeeSyncService.sync_employees(feed, batch_size=batch_size)
+    results[f'{int(changed_ratio * 100)}% changed'] = (timer.elapsed, counts)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the chunked employee upsert engine.')
+    parser.add_argument('--rows', default='10000,100000,1000000')
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--changed-ratio', type=float, default=0.1)
+    parser.add_argument('--database', default=None, help='SQLite file to use (defaults to a temporary file)')
+    args = parser.parse_args()
+
+    database_name = setup_django(args.database)
+    print(f'Database: {database_name}, batch size: {args.batch_size}')
+    print(f"{'rows':>10} {'scenario':>14} {'seconds':>9} {'rows/s':>11} {'new':>9} {'updated':>9}")
+
+    for rows in parse_int_list(args.rows):
+        for scenario, (elapsed, (new_count, updated_count)) in run(rows, args.batch_size, args.changed_ratio).items():
+            print(
+                f'{rows:>10} {scenario:>14} {elapsed:>9.2f} {rows / elapsed:>11,.0f} '
+                f'{new_count:>9} {updated_count:>9}'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from benchmarks.utils import percentile, setup_django
+
+
+def build_throttles(rate, store_path):
+    from rest_framework.throttling import UserRateThrottle
+    from core.throttling import SharedUserRateThrottle, SlidingWindowStore
+
+    class HistoryThrottle(UserRateThrottle):
+        scope = 'benchmark'
+
+        def get_rate(self):
+            return rate
+
+    class SlidingWindowThrottle(SharedUserRateThrottle):
+        scope = 'benchmark'
+        store = SlidingWindowStore(store_path)
+
+        def get_rate(self):
+            return rate
+
+    return {'history (locmem)': HistoryThrottle, 'sliding window': SlidingWindowThrottle}
+
+
+def measure(throttle_class, requests):
+    from django.contrib.auth.models import AnonymousUser
+    from django.core.cache import cache
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+
+    cache.clear()
+    request = Request(APIRequestFactory().get('/api/leaves/'))
+    request.user = AnonymousUser()
+    samples = []
+    for _ in range(requests):
+        started = time.perf_counter_ns()
+        throttle_class().allow_request(request, None)
+        samples.append(time.perf_counter_ns() - started)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure per-request throttle overhead.')
+    parser.add_argument('--requests', type=int, default=20000)
+    parser.add_argument('--rates', default='1000/hour,100000/hour')
+    args = parser.parse_args()
+
+    setup_django(migrate=False)
+    directory = tempfile.mkdtemp(prefix='benchmark-throttle-')
+
+    print(f"{'rate':>13} {'throttle':>18} {'mean us':>9} {'p50 us':>9} {'p99 us':>9} {'last 1k us':>11}")
+    for rate in args.rates.split(','):
+        store_path = os.path.join(directory, f"{rate.replace('/', '-')}.sqlite3")
+        for name, throttle_class in build_throttles(rate, store_path).items():
+            samples = measure(throttle_class, args.requests)
+            print(
+                f'{rate:>13} {name:>18} {statistics.fmean(samples) / 1000:>9.2f} '
+                f'{percentile(samples, 0.5) / 1000:>9.2f} {percentile(samples, 0.99) / 1000:>9.2f} '
+                f'{statistics.fmean(samples[-1000:]) / 1000:>11.2f}'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+def setup_django(database_name=None, migrate=True, **overrides):
+    if str(BASE_DIR) not in sys.path:
+        sys.path.insert(0, str(BASE_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+    import django
+    from django.conf import settings
+
+    if database_name is None:
+        database_name = os.path.join(tempfile.mkdtemp(prefix='benchmark-'), 'benchmark.sqlite3')
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+    settings.DATABASES['default']['NAME'] = database_name
+    django.setup()
+
+    if migrate:
+        from django.core.management import call_command
+        call_command('migrate', verbosity=0)
+    return database_name
+
+
+class Timer:
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.elapsed = time.perf_counter() - self.start
+
+
+def parse_int_list(value):
+    return [int(item) for item in value.split(',') if item.strip()]
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
@@ -28,6 +28,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.metrics.RequestMetricsMiddleware',
+    'core.slow_queries.SlowQueryMiddleware',
+    'core.db_router.ReplicaRoutingMiddleware',
+    'core.compression.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -60,30 +64,66 @@ WSGI_APPLICATION = 'config.wsgi.application'
 
 USE_MYSQL = config('USE_MYSQL', default=False, cast=bool)
 
-# For my local MySql DB = in case you want to use it
-
-# if USE_MYSQL:
-#     DATABASES = {
-#         'default': {
-#             'ENGINE': 'django.db.backends.mysql',
-#             'NAME': config('DATABASE_NAME', default='employee_leave_db'),
-#             'USER': config('DATABASE_USER', default='root'),
-#             'PASSWORD': config('DATABASE_PASSWORD', default=''),
-#             'HOST': config('DATABASE_HOST', default='localhost'),
-#             'PORT': config('DATABASE_PORT', default=3306, cast=int),
-#             'OPTIONS': {
-#                 'init_command': "SET sql_mode='STRICT_TRANS_TABLES'",
-#                 'charset': 'utf8mb4',
-#             },
-#         }
-#     }
-# else:
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+if USE_MYSQL:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.mysql',
+            'NAME': config('DATABASE_NAME', default='employee_leave_db'),
+            'USER': config('DATABASE_USER', default='root'),
+            'PASSWORD': config('DATABASE_PASSWORD', default=''),
+            'HOST': config('DATABASE_HOST', default='localhost'),
+            'PORT': config('DATABASE_PORT', default=3306, cast=int),
+            'OPTIONS': {
+                'init_command': "SET sql_mode='STRICT_TRANS_TABLES'",
+                'charset': 'utf8mb4',
+            },
+        }
     }
-}
+else:
+    # WAL lets readers run alongside the single writer; synchronous=NORMAL is durable in WAL mode
+    # except for the last commits on power loss. Write transactions start IMMEDIATE so a busy
+    # writer waits for busy_timeout instead of failing when it upgrades a read lock.
+    SQLITE_PRAGMAS = {
+        'journal_mode': config('SQLITE_JOURNAL_MODE', default='WAL'),
+        'synchronous': config('SQLITE_SYNCHRONOUS', default='NORMAL'),
+        'cache_size': config('SQLITE_CACHE_SIZE', default=-65536, cast=int),
+        'mmap_size': config('SQLITE_MMAP_SIZE', default=268435456, cast=int),
+        'busy_timeout': config('SQLITE_BUSY_TIMEOUT', default=5000, cast=int),
+        'temp_store': 'MEMORY',
+    }
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+            'OPTIONS': {
+                'init_command': ';'.join(f'PRAGMA {name}={value}' for name, value in SQLITE_PRAGMAS.items()),
+                'transaction_mode': 'IMMEDIATE',
+            },
+        }
+    }
+
+# Connections are kept open for this many seconds and checked before reuse (0 closes them after each request).
+DATABASES['default']['CONN_MAX_AGE'] = config('DATABASE_CONN_MAX_AGE', default=60, cast=int)
+DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+
+# Read replicas: SQLite files, or MySQL hosts with USE_MYSQL. Safe requests read from one of them.
+DATABASE_REPLICAS = config('DATABASE_REPLICAS', default='', cast=Csv())
+DATABASE_REPLICA_ALIASES = []
+for index, location in enumerate(DATABASE_REPLICAS, 1):
+    alias = f'replica_{index}'
+    DATABASES[alias] = {**DATABASES['default'], 'TEST': {'MIRROR': 'default'}}
+    DATABASES[alias]['HOST' if USE_MYSQL else 'NAME'] = location
+    DATABASE_REPLICA_ALIASES.append(alias)
+
+DATABASE_ROUTERS = ['core.db_router.PrimaryReplicaRouter']
+
+# After a request writes, the same client reads from the primary for this many seconds to cover replica lag.
+DATABASE_REPLICA_PIN_SECONDS = config('DATABASE_REPLICA_PIN_SECONDS', default=5, cast=int)
+
+# Response compression: encodings in preference order and the smallest body worth compressing, in
+# bytes. br and zstd need their packages and lack gzip's BREACH padding, so they are opt-in.
+COMPRESSION_ENCODINGS = config('COMPRESSION_ENCODINGS', default='gzip', cast=Csv())
+COMPRESSION_MIN_SIZE = config('COMPRESSION_MIN_SIZE', default=1024, cast=int)
 
 CACHES = {
     'default': {
@@ -128,7 +168,7 @@ AUTH_USER_MODEL = 'accounts.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'core.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -141,25 +181,46 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'EXCEPTION_HANDLER': 'core.exceptions.custom_exception_handler',
+    # orjson-backed when installed, the stdlib encoder otherwise.
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'core.renderers.FastJSONRenderer',
     ],
     'DEFAULT_PARSER_CLASSES': [
-        'rest_framework.parsers.JSONParser',
+        'core.parsers.FastJSONParser',
     ],
     'DEFAULT_THROTTLE_CLASSES': [
-        'rest_framework.throttling.UserRateThrottle',
+        'core.throttling.SharedUserRateThrottle',
     ],
     'DEFAULT_THROTTLE_RATES': {
         'auth': '5/minute',
         'employee_sync': '10/hour',
+        'employee_import': '20/hour',
         'create_leave': '20/hour',
         'user': '1000/hour',
     },
 }
 
+# Readiness probes report the result of database and cache checks run on this interval (seconds).
+HEALTH_CHECK_INTERVAL = config('HEALTH_CHECK_INTERVAL', default=10, cast=float)
+
+# Request metrics are kept per process and written to one file per worker in METRICS_DIR every
+# METRICS_FLUSH_INTERVAL seconds; /api/metrics/ merges them. Leave METRICS_DIR empty to report the serving process only.
+# METRICS_ALLOWED_IPS is opt-in: behind a local reverse proxy every request arrives from loopback.
+METRICS_DIR = config('METRICS_DIR', default=str(BASE_DIR / 'logs' / 'metrics'))
+METRICS_FLUSH_INTERVAL = config('METRICS_FLUSH_INTERVAL', default=15, cast=float)
+METRICS_ALLOWED_IPS = config('METRICS_ALLOWED_IPS', default='', cast=Csv())
+
+# Opt-in sampling of slow queries into an in-memory ring buffer, dumped by /api/slow-queries/.
+SLOW_QUERY_LOG_ENABLED = config('SLOW_QUERY_LOG_ENABLED', default=False, cast=bool)
+SLOW_QUERY_THRESHOLD_MS = config('SLOW_QUERY_THRESHOLD_MS', default=100, cast=float)
+SLOW_QUERY_SAMPLE_RATE = config('SLOW_QUERY_SAMPLE_RATE', default=1.0, cast=float)
+SLOW_QUERY_BUFFER_SIZE = config('SLOW_QUERY_BUFFER_SIZE', default=200, cast=int)
+
+# Throttle counters are shared by all worker processes on the host through this SQLite file.
+THROTTLE_STORE_PATH = config('THROTTLE_STORE_PATH', default=str(BASE_DIR / 'throttle.sqlite3'))
+
 SIMPLE_JWT = {
-    'ACCESS_TOKEN_LIFETIME': timedelta(minutes=config('JWT_ACCESS_TOKEN_LIFETIME', default=60, cast=int)),
+    'ACCESS_TOKEN_LIFETIME': timedelta(minutes=config('JWT_ACCESS_TOKEN_LIFETIME', default=15, cast=int)),
     'REFRESH_TOKEN_LIFETIME': timedelta(minutes=config('JWT_REFRESH_TOKEN_LIFETIME', default=1440, cast=int)),
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
@@ -170,8 +231,25 @@ SIMPLE_JWT = {
     'AUTH_HEADER_NAME': 'HTTP_AUTHORIZATION',
     'USER_ID_FIELD': 'id',
     'USER_ID_CLAIM': 'user_id',
+    'TOKEN_USER_CLASS': 'core.authentication.ClaimsTokenUser',
 }
 
+# Authenticated users are cached per process for a few seconds and in the default cache for longer;
+# both tiers are invalidated when the user or their employee profile is saved, but only in the worker
+# that saved it unless the default cache is shared. With the per-process LocMemCache the second tier
+# therefore defaults to the local tier's short timeout.
+JWT_USER_LOCAL_CACHE_TIMEOUT = config('JWT_USER_LOCAL_CACHE_TIMEOUT', default=5, cast=int)
+JWT_USER_CACHE_TIMEOUT = config(
+    'JWT_USER_CACHE_TIMEOUT',
+    default=JWT_USER_LOCAL_CACHE_TIMEOUT if CACHES['default']['BACKEND'].endswith('.LocMemCache') else 60,
+    cast=int
+)
+JWT_USER_LOCAL_CACHE_SIZE = config('JWT_USER_LOCAL_CACHE_SIZE', default=1024, cast=int)
+
+# Rotated refresh tokens are revoked in memory and shared between workers through this SQLite file.
+JWT_BLACKLIST_PATH = config('JWT_BLACKLIST_PATH', default=str(BASE_DIR / 'token_blacklist.sqlite3'))
+JWT_BLACKLIST_SYNC_INTERVAL = config('JWT_BLACKLIST_SYNC_INTERVAL', default=5, cast=float)
+
 SPECTACULAR_SETTINGS = {
     'TITLE': 'Employee Leave Management API',
     'DESCRIPTION': 'REST API for managing employees and leave requests',
@@ -181,6 +259,14 @@ SPECTACULAR_SETTINGS = {
     'SCHEMA_PATH_PREFIX': '/api/',
 }
 
+# Release identifier set by deploys (e.g. the git commit). The prebuilt OpenAPI schema is regenerated
+# whenever it, or any project source file, changes.
+APP_VERSION = config('APP_VERSION', default='')
+
+# /api/schema/ is served from this file, written by `manage.py build_openapi_schema`.
+OPENAPI_SCHEMA_PATH = config('OPENAPI_SCHEMA_PATH', default=str(BASE_DIR / 'openapi-schema.json'))
+OPENAPI_SCHEMA_MAX_AGE = config('OPENAPI_SCHEMA_MAX_AGE', default=86400, cast=int)
+
 CORS_ALLOWED_ORIGINS = config(
     'CORS_ALLOWED_ORIGINS',
     default='http://localhost:3000,http://localhost:8000',
@@ -201,6 +287,9 @@ if not DEBUG:
     SECURE_HSTS_INCLUDE_SUBDOMAINS = True
     SECURE_HSTS_PRELOAD = True
 
+# Handlers hand records to a background listener thread; records beyond the queue size are dropped.
+LOG_QUEUE_SIZE = config('LOG_QUEUE_SIZE', default=10000, cast=int)
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -210,14 +299,15 @@ LOGGING = {
             'style': '{',
         },
         'json': {
-            'format': '{levelname} {asctime} {module} {process:d} {thread:d} {message}',
-            'style': '{',
+            '()': 'core.log_handlers.JSONFormatter',
         },
     },
     'handlers': {
         'file': {
             'level': 'INFO',
-            'class': 'logging.handlers.RotatingFileHandler',
+            'class': 'core.log_handlers.QueuedHandler',
+            'target': 'logging.handlers.RotatingFileHandler',
+            'queue_size': LOG_QUEUE_SIZE,
             'filename': BASE_DIR / 'logs' / 'api.log',
             'maxBytes': 1024 * 1024 * 10,
             'backupCount': 5,
@@ -225,7 +315,9 @@ LOGGING = {
         },
         'sync_file': {
             'level': 'INFO',
-            'class': 'logging.handlers.RotatingFileHandler',
+            'class': 'core.log_handlers.QueuedHandler',
+            'target': 'logging.handlers.RotatingFileHandler',
+            'queue_size': LOG_QUEUE_SIZE,
             'filename': BASE_DIR / 'logs' / 'employee_sync.log',
             'maxBytes': 1024 * 1024 * 10,
             'backupCount': 5,
@@ -233,7 +325,9 @@ LOGGING = {
         },
         'error_file': {
             'level': 'ERROR',
-            'class': 'logging.handlers.RotatingFileHandler',
+            'class': 'core.log_handlers.QueuedHandler',
+            'target': 'logging.handlers.RotatingFileHandler',
+            'queue_size': LOG_QUEUE_SIZE,
             'filename': BASE_DIR / 'logs' / 'errors.log',
             'maxBytes': 1024 * 1024 * 10,
             'backupCount': 5,
@@ -241,7 +335,9 @@ LOGGING = {
         },
         'console': {
             'level': 'DEBUG' if DEBUG else 'INFO',
-            'class': 'logging.StreamHandler',
+            'class': 'core.log_handlers.QueuedHandler',
+            'target': 'logging.StreamHandler',
+            'queue_size': LOG_QUEUE_SIZE,
             'formatter': 'verbose',
         },
     },
@@ -261,6 +357,11 @@ LOGGING = {
             'level': 'ERROR',
             'propagate': False,
         },
+        'api': {
+            'handlers': ['file', 'console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
     },
 }
 
@@ -1,10 +1,11 @@
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
-from employees.views import EmployeeViewSet
+from drf_spectacular.views import SpectacularSwaggerView
+from employees.views import EmployeeViewSet, company_summary
 from leaves.views import LeaveRequestViewSet
-from core.views import health_check
+from core.views import health_check, health_live, metrics, slow_queries
+from core.schema import CachedSchemaView
 from core.jwt_views import ThrottledTokenObtainPairView, ThrottledTokenRefreshView
 
 router = DefaultRouter()
@@ -14,9 +15,14 @@ router.register(r'leaves', LeaveRequestViewSet, basename='leave')
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/health/', health_check, name='health_check'),
-    path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
+    path('api/health/live/', health_live, name='health_live'),
+    path('api/health/ready/', health_check, name='health_ready'),
+    path('api/metrics/', metrics, name='metrics'),
+    path('api/slow-queries/', slow_queries, name='slow-queries'),
+    path('api/schema/', CachedSchemaView.as_view(), name='schema'),
     path('api/docs/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
     path('api/token/', ThrottledTokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/token/refresh/', ThrottledTokenRefreshView.as_view(), name='token_refresh'),
+    path('api/companies/<int:company_id>/summary/', company_summary, name='company-summary'),
     path('api/', include(router.urls)),
 ]
@@ -0,0 +1,30 @@
+import pytest
+from django.test import override_settings
+
+
+@pytest.fixture(autouse=True, scope='session')
+def isolate_shared_state(tmp_path_factory):
+    # The throttle store, token blacklist and metrics registry are built from settings at import,
+    # before any fixture runs; point them at a scratch directory so tests never touch the real files.
+    from core.metrics import registry
+    from core.throttling import throttle_store
+    from core.token_blacklist import token_blacklist
+    directory = tmp_path_factory.mktemp('shared_state')
+    paths = {
+        'THROTTLE_STORE_PATH': str(directory / 'throttle.sqlite3'),
+        'JWT_BLACKLIST_PATH': str(directory / 'token_blacklist.sqlite3'),
+        'METRICS_DIR': str(directory / 'metrics'),
+    }
+    with override_settings(**paths):
+        throttle_store.path = paths['THROTTLE_STORE_PATH']
+        token_blacklist.path = paths['JWT_BLACKLIST_PATH']
+        registry.directory = paths['METRICS_DIR']
+        yield
+
+
+@pytest.fixture(autouse=True)
+def reset_throttles():
+    # Throttle counters live in a file shared across processes, so they outlive each test.
+    from core.throttling import throttle_store
+    throttle_store.reset()
+    yield
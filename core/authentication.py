@@ -0,0 +1,196 @@
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AbstractBaseUser
+from django.core.cache import cache
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+USER_CACHE_PREFIX = 'jwt-user'
+USER_VERSION_PREFIX = 'jwt-user-version'
+ROLE_CLAIM = 'role'
+EMPLOYEE_ID_CLAIM = 'employee_id'
+USER_VERSION_CLAIM = 'user_version'
+
+
+class LocalUserCache:
+    """Small per-process LRU in front of the shared cache; entries expire after a few seconds."""
+
+    def __init__(self, maxsize, timeout):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, payload = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return payload
+
+    def set(self, key, payload):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.timeout, payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+local_user_cache = LocalUserCache(settings.JWT_USER_LOCAL_CACHE_SIZE, settings.JWT_USER_LOCAL_CACHE_TIMEOUT)
+
+
+def _user_cache_key(user_id):
+    return f"{USER_CACHE_PREFIX}:{user_id}"
+
+
+def get_cached_user(user_id):
+    key = _user_cache_key(user_id)
+    payload = local_user_cache.get(key)
+    if payload is None:
+        payload = cache.get(key)
+        if payload is None:
+            return None
+        local_user_cache.set(key, payload)
+    # Every request gets its own copy, so nothing it sets on the user leaks into the next one.
+    return pickle.loads(payload)
+
+
+def cache_user(user):
+    key = _user_cache_key(user.pk)
+    payload = pickle.dumps(user, pickle.HIGHEST_PROTOCOL)
+    cache.set(key, payload, settings.JWT_USER_CACHE_TIMEOUT)
+    local_user_cache.set(key, payload)
+
+
+def invalidate_cached_user(user_id):
+    key = _user_cache_key(user_id)
+    local_user_cache.delete(key)
+    cache.delete(key)
+
+
+def _user_version_key(user_id):
+    return f"{USER_VERSION_PREFIX}:{user_id}"
+
+
+def get_user_version(user_id):
+    return cache.get(_user_version_key(user_id))
+
+
+def claims_are_stale(user_id, validated_token):
+    # Without a version (evicted, or set in another worker's cache) the claims are trusted.
+    version = get_user_version(user_id)
+    return version is not None and validated_token.get(USER_VERSION_CLAIM) != version
+
+
+def bump_user_version(user_id):
+    """Marks claims issued for the user so far as stale, after the user or their employee profile changed.
+
+    Stale claims tokens are checked against the user until they expire, so deactivation, role and
+    password changes and new or deleted employee profiles apply on the next request. The version
+    only has to outlive the access tokens stamped with the previous one.
+    """
+    timeout = int(api_settings.ACCESS_TOKEN_LIFETIME.total_seconds())
+    cache.set(_user_version_key(user_id), time.time_ns(), timeout)
+
+
+def load_user(user_id):
+    """Returns the user with its employee profile, from the cache when possible. Raises DoesNotExist."""
+    user = get_cached_user(user_id)
+    if user is None:
+        user = get_user_model().objects.select_related('employee_profile').get(
+            **{api_settings.USER_ID_FIELD: user_id}
+        )
+        cache_user(user)
+    return user
+
+
+def add_user_claims(token, user):
+    token[ROLE_CLAIM] = user.role
+    employee = getattr(user, 'employee_profile', None)
+    token[EMPLOYEE_ID_CLAIM] = employee.pk if employee is not None else None
+    token[USER_VERSION_CLAIM] = get_user_version(user.pk)
+    return token
+
+
+class ClaimsTokenUser(TokenUser):
+    """Token-backed user exposing the role and employee profile the permission code expects."""
+
+    @property
+    def is_hr(self):
+        return self.role == 'HR'
+
+    @property
+    def is_employee(self):
+        return self.role == 'EMPLOYEE'
+
+    @cached_property
+    def employee_profile(self):
+        employee_id = self.token.get(EMPLOYEE_ID_CLAIM)
+        if employee_id is None:
+            # Same exception as the reverse one-to-one descriptor, so hasattr() keeps working.
+            raise get_user_model().employee_profile.RelatedObjectDoesNotExist('User has no employee_profile.')
+        # Only the primary key is known; other fields load on first access.
+        return apps.get_model('employees', 'Employee').from_db(None, ['id'], [employee_id])
+
+    def __eq__(self, other):
+        if isinstance(other, (TokenUser, AbstractBaseUser)):
+            return self.pk == other.pk
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.pk)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that avoids per-request user queries.
+
+    Tokens carrying role claims resolve to a ClaimsTokenUser after one cache read, unless the user's
+    version moved on since the token was stamped. Those tokens, and tokens issued before the claims existed,
+    fall back to a user served, with its employee profile, from a two-tier cache.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        if ROLE_CLAIM in validated_token and not claims_are_stale(user_id, validated_token):
+            return ClaimsTokenUser(validated_token)
+
+        try:
+            user = load_user(user_id)
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return user
@@ -0,0 +1,202 @@
+import secrets
+import struct
+import zlib
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_string
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Random bytes in the gzip header mitigate BREACH, as in Django's GZipMiddleware. brotli and zstd
+# output carries no such padding, which is why they are opt-in through COMPRESSION_ENCODINGS.
+GZIP_MAX_RANDOM_BYTES = 100
+# Levels tuned for compressing on every request rather than for the smallest output.
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+ZSTD_LEVEL = 3
+# Streamed chunks are flushed to the client once this much input has accumulated; flushing every
+# small chunk would cost more in framing than compression saves.
+STREAM_FLUSH_SIZE = 4096
+
+
+def is_compressible(content_type):
+    mime = content_type.split(';', 1)[0].strip().lower()
+    return mime.startswith('text/') or mime.endswith(('json', 'xml', 'javascript', 'openapi', 'yaml'))
+
+
+def negotiate(accept_encoding, available):
+    """Returns the first of `available`, in server preference order, that Accept-Encoding allows."""
+    accepted = {}
+    for part in accept_encoding.split(','):
+        coding, _, params = part.partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        name, _, value = params.strip().partition('=')
+        if name.strip().lower() == 'q':
+            try:
+                quality = float(value)
+            except ValueError:
+                quality = 0.0
+        accepted[coding] = quality
+
+    wildcard = accepted.get('*', 0.0)
+    for coding in available:
+        if accepted.get(coding, wildcard) > 0:
+            return coding
+    return None
+
+
+class _GzipStream:
+    """A gzip member written incrementally; flushed output can be decoded as soon as it arrives."""
+
+    def __init__(self):
+        self.deflate = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, -zlib.MAX_WBITS)
+        self.crc = 0
+        self.size = 0
+        # FNAME header with a random-length name, like Django's compress_string().
+        self.header = (
+            b'\x1f\x8b\x08\x08\x00\x00\x00\x00\x00\xff'
+            + b'a' * secrets.randbelow(GZIP_MAX_RANDOM_BYTES) + b'\x00'
+        )
+
+    def process(self, chunk, flush):
+        self.crc = zlib.crc32(chunk, self.crc)
+        self.size += len(chunk)
+        data = self.header + self.deflate.compress(chunk)
+        if flush:
+            data += self.deflate.flush(zlib.Z_SYNC_FLUSH)
+        self.header = b''
+        return data
+
+    def finish(self):
+        return self.header + self.deflate.flush() + struct.pack('<II', self.crc, self.size & 0xffffffff)
+
+
+class _BrotliStream:
+    def __init__(self):
+        self.compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def process(self, chunk, flush):
+        data = self.compressor.process(chunk)
+        return data + self.compressor.flush() if flush else data
+
+    def finish(self):
+        return self.compressor.finish()
+
+
+class _ZstdStream:
+    def __init__(self):
+        self.compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+
+    def process(self, chunk, flush):
+        data = self.compressor.compress(chunk)
+        return data + self.compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK) if flush else data
+
+    def finish(self):
+        return self.compressor.flush()
+
+
+class _StreamState:
+    """Flushes the compressor once STREAM_FLUSH_SIZE bytes have gone in since the last flush."""
+
+    def __init__(self, stream_class):
+        self.compressor = stream_class()
+        self.pending = 0
+
+    def process(self, chunk):
+        self.pending += len(chunk)
+        flush = self.pending >= STREAM_FLUSH_SIZE
+        if flush:
+            self.pending = 0
+        return self.compressor.process(chunk, flush)
+
+
+class Encoding:
+    """Compresses whole bodies with `compress` and streams through a new `stream_class` per response."""
+
+    def __init__(self, compress, stream_class):
+        self.compress = compress
+        self.stream_class = stream_class
+
+    def stream(self, chunks):
+        state = _StreamState(self.stream_class)
+        for chunk in chunks:
+            data = state.process(chunk)
+            if data:
+                yield data
+        yield state.compressor.finish()
+
+    async def astream(self, chunks):
+        state = _StreamState(self.stream_class)
+        async for chunk in chunks:
+            data = state.process(chunk)
+            if data:
+                yield data
+        yield state.compressor.finish()
+
+
+ENCODINGS = {
+    'gzip': Encoding(lambda content: compress_string(content, max_random_bytes=GZIP_MAX_RANDOM_BYTES), _GzipStream),
+}
+if brotli is not None:
+    ENCODINGS['br'] = Encoding(lambda content: brotli.compress(content, quality=BROTLI_QUALITY), _BrotliStream)
+if zstandard is not None:
+    # ZstdCompressor instances are not thread-safe, so every response gets its own.
+    ENCODINGS['zstd'] = Encoding(lambda content: zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(content), _ZstdStream)
+
+
+class CompressionMiddleware:
+    """Compresses text and JSON responses with the best encoding the client accepts.
+
+    Responses smaller than COMPRESSION_MIN_SIZE are sent as they are, since compressing them costs
+    more than it saves; so are responses whose compressed form is not smaller. Streaming responses
+    are compressed chunk by chunk. brotli and zstd are used only when listed in COMPRESSION_ENCODINGS
+    and their packages are installed.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.encodings = [name for name in settings.COMPRESSION_ENCODINGS if name in ENCODINGS]
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if response.has_header('Content-Encoding') or not is_compressible(response.get('Content-Type', '')):
+            return response
+        if not response.streaming and len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        name = negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''), self.encodings)
+        if name is None:
+            return response
+
+        encoding = ENCODINGS[name]
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = encoding.astream(response.streaming_content)
+            else:
+                response.streaming_content = encoding.stream(response.streaming_content)
+            del response['Content-Length']
+        else:
+            compressed = encoding.compress(response.content)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+
+        # The compressed body differs from the original byte for byte, so a strong ETag becomes weak.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = name
+        return response
@@ -0,0 +1,95 @@
+import hashlib
+import random
+from contextvars import ContextVar
+from django.conf import settings
+from django.core.cache import cache
+
+PRIMARY = 'default'
+PIN_COOKIE = 'db_primary_pin'
+PIN_CACHE_PREFIX = 'db_primary_pin:'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_routing = ContextVar('db_routing', default=None)
+
+
+class _RequestRouting:
+    __slots__ = ('replica', 'wrote')
+
+    def __init__(self, replica):
+        self.replica = replica
+        self.wrote = False
+
+
+def _pin_key(request):
+    # Bearer clients never send the cookie back, so they are also pinned by their credentials.
+    authorization = request.META.get('HTTP_AUTHORIZATION')
+    if not authorization:
+        return None
+    return PIN_CACHE_PREFIX + hashlib.sha256(authorization.encode()).hexdigest()
+
+
+class PrimaryReplicaRouter:
+    """Sends reads from safe requests to one replica per request; everything else uses the primary.
+
+    Reads are only routed inside ReplicaRoutingMiddleware, so management commands, background sync
+    jobs and unsafe requests always read what they wrote. Routing a write pins the request to the
+    primary for the rest of its reads, including the rest of any transaction it opened.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _routing.get()
+        if state is None or state.replica is None or state.wrote:
+            return PRIMARY
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = _routing.get()
+        if state is not None:
+            state.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {PRIMARY, *settings.DATABASE_REPLICA_ALIASES}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """Enables replica reads for safe requests and keeps a client on the primary after it writes.
+
+    The pin covers replication lag: for DATABASE_REPLICA_PIN_SECONDS after a write, the same
+    client's reads go to the primary so it sees its own changes. Clients are recognised by a cookie
+    and, for token clients, by a cache entry keyed on their Authorization header; that entry only
+    reaches other workers when the default cache is shared.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        replicas = settings.DATABASE_REPLICA_ALIASES
+        pin_key = _pin_key(request) if replicas else None
+        replica = None
+        if replicas and request.method in SAFE_METHODS and PIN_COOKIE not in request.COOKIES:
+            if pin_key is None or cache.get(pin_key) is None:
+                replica = random.choice(replicas)
+
+        state = _RequestRouting(replica)
+        token = _routing.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _routing.reset(token)
+
+        if state.wrote and replicas:
+            response.set_cookie(
+                PIN_COOKIE,
+                '1',
+                max_age=settings.DATABASE_REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax'
+            )
+            if pin_key is not None:
+                cache.set(pin_key, 1, settings.DATABASE_REPLICA_PIN_SECONDS)
+        return response
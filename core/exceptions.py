@@ -180,7 +180,7 @@ def custom_exception_handler(exc, context):
                 custom_response_data['message'] = str(exc)
             status_code = response.status_code if response else status.HTTP_400_BAD_REQUEST
         
-        logger.error(f"Exception: {exc.__class__.__name__} - {custom_response_data['message']}", exc_info=True)
+        logger.error("Exception: %s - %s", exc.__class__.__name__, custom_response_data['message'], exc_info=True)
         
         return Response(custom_response_data, status=status_code)
     
@@ -196,7 +196,7 @@ def custom_exception_handler(exc, context):
         )
     
     if isinstance(exc, KeyError):
-        logger.error(f"KeyError: {str(exc)}", exc_info=True)
+        logger.error("KeyError: %s", exc, exc_info=True)
         return Response(
             {
                 'error': True,
@@ -207,7 +207,7 @@ def custom_exception_handler(exc, context):
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    logger.error(f"Unhandled exception: {exc.__class__.__name__} - {str(exc)}", exc_info=True)
+    logger.error("Unhandled exception: %s - %s", exc.__class__.__name__, exc, exc_info=True)
     
     return Response(
         {
@@ -0,0 +1,94 @@
+import logging
+import os
+import threading
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.utils import timezone
+
+logger = logging.getLogger('core')
+
+
+class HealthProber:
+    """Runs the database and cache checks on a background thread; probes only read the last result."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._result = None
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _check_database(self):
+        started = time.perf_counter()
+        try:
+            reused = connection.connection is not None
+            connection.close_if_unusable_or_obsolete()
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+        except Exception as e:
+            connection.close()
+            return {'status': 'unhealthy', 'connected': False, 'vendor': connection.vendor, 'error': str(e)}
+        return {
+            'status': 'healthy',
+            'connected': True,
+            'connection_reused': reused,
+            'vendor': connection.vendor,
+            'latency_ms': round((time.perf_counter() - started) * 1000, 3),
+        }
+
+    def _check_cache(self):
+        started = time.perf_counter()
+        try:
+            cache.set('health_check', 'ok', 30)
+            healthy = cache.get('health_check') == 'ok'
+        except Exception as e:
+            return {'status': 'unhealthy', 'error': str(e)}
+        return {
+            'status': 'healthy' if healthy else 'unhealthy',
+            'latency_ms': round((time.perf_counter() - started) * 1000, 3),
+        }
+
+    def probe(self):
+        result = {
+            'database': self._check_database(),
+            'cache': self._check_cache(),
+            'checked_at': timezone.now(),
+            'checked_monotonic': time.monotonic(),
+        }
+        self._result = result
+        return result
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.probe()
+            except Exception:
+                logger.error("Health probe failed", exc_info=True)
+
+    def _ensure_started(self):
+        # The thread does not survive a fork, so each worker process starts its own.
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self._thread = threading.Thread(target=self._run, name='health-prober', daemon=True)
+                self._thread.start()
+                self._pid = os.getpid()
+
+    def get_result(self):
+        self._ensure_started()
+        result = self._result
+        if result is None:
+            result = self.probe()
+        return result
+
+    def is_stale(self, result):
+        # A result much older than the interval means the prober thread has died.
+        return time.monotonic() - result['checked_monotonic'] > self.interval * 3
+
+
+health_prober = HealthProber(settings.HEALTH_CHECK_INTERVAL)
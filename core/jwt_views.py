@@ -1,12 +1,15 @@
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from rest_framework.throttling import AnonRateThrottle
 from core.throttling import AuthRateThrottle
+from core.serializers import ClaimsTokenObtainPairSerializer, ClaimsTokenRefreshSerializer
 
 
 class ThrottledTokenObtainPairView(TokenObtainPairView):
+    serializer_class = ClaimsTokenObtainPairSerializer
     throttle_classes = [AuthRateThrottle]
 
 
 class ThrottledTokenRefreshView(TokenRefreshView):
+    serializer_class = ClaimsTokenRefreshSerializer
     throttle_classes = [AuthRateThrottle]
 
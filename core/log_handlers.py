@@ -0,0 +1,106 @@
+import copy
+import json
+import logging
+import os
+import queue
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueListener
+from django.utils.module_loading import import_string
+
+RESERVED_RECORD_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class _DrainingQueueListener(QueueListener):
+    def enqueue_sentinel(self):
+        # Wait for room on shutdown instead of raising queue.Full; the listener is draining.
+        self.queue.put(self._sentinel)
+
+
+class QueuedHandler(logging.Handler):
+    """Hands records to a background QueueListener so callers never wait on the target handler.
+
+    Configured like the wrapped handler, e.g. ``'class': 'core.log_handlers.QueuedHandler',
+    'target': 'logging.handlers.RotatingFileHandler', 'filename': ...``. When the bounded
+    queue is full, records are dropped and counted instead of blocking the request thread.
+    """
+
+    def __init__(self, target, queue_size=10000, **target_kwargs):
+        super().__init__()
+        self.target = import_string(target)(**target_kwargs)
+        self.queue_size = queue_size
+        self.dropped = 0
+        self.queue = None
+        self.listener = None
+        self._pid = None
+        self._listener_lock = threading.Lock()
+
+    def setFormatter(self, fmt):
+        super().setFormatter(fmt)
+        self.target.setFormatter(fmt)
+
+    def _ensure_listener(self):
+        # The listener thread does not survive a fork, so each process starts its own.
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._listener_lock:
+            if self._pid != pid:
+                self.queue = queue.Queue(self.queue_size)
+                self.listener = _DrainingQueueListener(self.queue, self.target)
+                self.listener.start()
+                self._pid = pid
+
+    def prepare(self, record):
+        # Merge args and render the traceback now; they may not be safe to touch from another thread later.
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def emit(self, record):
+        try:
+            self._ensure_listener()
+            self.queue.put_nowait(self.prepare(record))
+        except queue.Full:
+            self.dropped += 1
+        except Exception:
+            self.handleError(record)
+
+    def close(self):
+        with self._listener_lock:
+            if self.listener is not None and self._pid == os.getpid():
+                self.listener.stop()
+            self.listener = None
+            self._pid = None
+        self.target.close()
+        super().close()
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record):
+        payload = {
+            'timestamp': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'module': record.module,
+            'process': record.process,
+            'thread': record.thread,
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            payload['exc_info'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload['exc_info'] = record.exc_text
+        if record.stack_info:
+            payload['stack_info'] = self.formatStack(record.stack_info)
+
+        for key, value in record.__dict__.items():
+            if key not in RESERVED_RECORD_ATTRS and not key.startswith('_'):
+                payload[key] = value
+
+        return json.dumps(payload, default=str)
@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+import logging
+import time
+from core.schema import build_schema, read_schema, schema_version, write_schema
+
+logger = logging.getLogger('api')
+
+
+class Command(BaseCommand):
+    help = 'Generate the OpenAPI schema served at /api/schema/ and store it at OPENAPI_SCHEMA_PATH'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--if-stale',
+            action='store_true',
+            help='Only generate when the stored schema was built from a different code version'
+        )
+
+    def handle(self, *args, **options):
+        path = settings.OPENAPI_SCHEMA_PATH
+        version = schema_version()
+        stored = read_schema(path)
+        if options['if_stale'] and stored is not None and stored.get('version') == version:
+            self.stdout.write(f'OpenAPI schema at {path} is already at version {version}.')
+            return
+
+        started = time.perf_counter()
+        write_schema(path, version, build_schema())
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(f'Wrote OpenAPI schema version {version} to {path} in {elapsed:.2f}s'))
+        logger.info("Built OpenAPI schema version %s at %s in %.2fs", version, path, elapsed)
@@ -0,0 +1,210 @@
+import atexit
+import bisect
+import glob
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import ExitStack
+from django.conf import settings
+from django.db import connections
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# A worker file not rewritten for this many flush intervals belongs to a dead or long-idle worker.
+STALE_FLUSH_INTERVALS = 4
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class MetricsRegistry:
+    """Per-process request metrics, periodically written to a per-process file for merging.
+
+    Each entry is keyed by (view, method, status) and holds the request count, latency sum,
+    latency histogram bucket counts, query count and database time. A worker removes its file at
+    exit; files left by workers that died, or that have not been rewritten for STALE_FLUSH_INTERVALS
+    flush intervals, are deleted when collected instead of being merged.
+    """
+
+    def __init__(self, directory, flush_interval):
+        self.directory = str(directory) if directory else None
+        self.flush_interval = flush_interval
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._pid = None
+        self._path = None
+
+    def record(self, view, method, status, seconds, queries, db_seconds):
+        key = (view, method, str(status))
+        bucket = bisect.bisect_left(LATENCY_BUCKETS, seconds)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = [0, 0.0, [0] * (len(LATENCY_BUCKETS) + 1), 0, 0.0]
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2][bucket] += 1
+            entry[3] += queries
+            entry[4] += db_seconds
+        if self.directory and time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def snapshot(self):
+        with self._lock:
+            return [[*key, entry[0], entry[1], list(entry[2]), entry[3], entry[4]] for key, entry in self._entries.items()]
+
+    def flush(self):
+        if not self.directory:
+            return
+        with self._flush_lock:
+            pid = os.getpid()
+            if self._pid != pid:
+                # A forked worker starts with its own counters and file.
+                with self._lock:
+                    if self._pid is not None:
+                        self._entries.clear()
+                if self._pid is None:
+                    atexit.register(self.remove)
+                self._pid = pid
+                self._path = os.path.join(self.directory, f'metrics-{pid}-{uuid.uuid4().hex[:8]}.json')
+            self._last_flush = time.monotonic()
+            os.makedirs(self.directory, exist_ok=True)
+            temporary = f'{self._path}.tmp'
+            with open(temporary, 'w') as f:
+                json.dump(self.snapshot(), f)
+            os.replace(temporary, self._path)
+
+    def remove(self):
+        """Deletes this process's file, so its counters stop being merged once it exits."""
+        with self._flush_lock:
+            if self._path is None or self._pid != os.getpid():
+                return
+            try:
+                os.unlink(self._path)
+            except OSError:
+                pass
+
+    def _is_stale(self, path):
+        try:
+            pid = int(os.path.basename(path).split('-')[1])
+            age = time.time() - os.path.getmtime(path)
+        except (IndexError, ValueError, OSError):
+            return True
+        return not _pid_alive(pid) or age > self.flush_interval * STALE_FLUSH_INTERVALS
+
+    def collect(self):
+        """Returns the entries of every worker that has flushed, merged by key."""
+        if not self.directory:
+            sources = [self.snapshot()]
+        else:
+            self.flush()
+            sources = []
+            for path in glob.glob(os.path.join(self.directory, 'metrics-*.json')):
+                if path != self._path and self._is_stale(path):
+                    try:
+                        os.unlink(path)
+                    except OSError:
+                        pass
+                    continue
+                try:
+                    with open(path) as f:
+                        sources.append(json.load(f))
+                except (OSError, ValueError):
+                    continue
+
+        merged = {}
+        for rows in sources:
+            for view, method, status, count, total, buckets, queries, db_seconds in rows:
+                entry = merged.setdefault((view, method, status), [0, 0.0, [0] * (len(LATENCY_BUCKETS) + 1), 0, 0.0])
+                entry[0] += count
+                entry[1] += total
+                entry[2] = [a + b for a, b in zip(entry[2], buckets)]
+                entry[3] += queries
+                entry[4] += db_seconds
+        return merged
+
+
+registry = MetricsRegistry(settings.METRICS_DIR, settings.METRICS_FLUSH_INTERVAL)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render_prometheus(merged):
+    lines = [
+        '# HELP http_request_duration_seconds Request latency by resolved URL name, method and status.',
+        '# TYPE http_request_duration_seconds histogram',
+    ]
+    for (view, method, status), (count, total, buckets, _, _) in sorted(merged.items()):
+        labels = f'view="{_escape(view)}",method="{_escape(method)}",status="{status}"'
+        cumulative = 0
+        for bound, bucket_count in zip(LATENCY_BUCKETS + (float('inf'),), buckets):
+            cumulative += bucket_count
+            le = '+Inf' if bound == float('inf') else repr(bound)
+            lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+        lines.append(f'http_request_duration_seconds_sum{{{labels}}} {total}')
+        lines.append(f'http_request_duration_seconds_count{{{labels}}} {count}')
+
+    lines += [
+        '# HELP http_request_db_queries_total Database queries executed while serving requests.',
+        '# TYPE http_request_db_queries_total counter',
+    ]
+    for (view, method, status), (_, _, _, queries, _) in sorted(merged.items()):
+        lines.append(
+            f'http_request_db_queries_total{{view="{_escape(view)}",method="{_escape(method)}",status="{status}"}} {queries}'
+        )
+
+    lines += [
+        '# HELP http_request_db_seconds_total Time spent in database queries while serving requests.',
+        '# TYPE http_request_db_seconds_total counter',
+    ]
+    for (view, method, status), (_, _, _, _, db_seconds) in sorted(merged.items()):
+        lines.append(
+            f'http_request_db_seconds_total{{view="{_escape(view)}",method="{_escape(method)}",status="{status}"}} {db_seconds}'
+        )
+
+    return '\n'.join(lines) + '\n'
+
+
+class _QueryTimer:
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.queries += 1
+
+
+class RequestMetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timer = _QueryTimer()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timer))
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        match = getattr(request, 'resolver_match', None)
+        view = (match.view_name if match else None) or 'unmatched'
+        registry.record(view, request.method, response.status_code, elapsed, timer.queries, timer.seconds)
+        return response
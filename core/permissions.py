@@ -1,3 +1,4 @@
+from django.conf import settings
 from rest_framework import permissions
 
 
@@ -6,18 +7,26 @@ class IsHRUser(permissions.BasePermission):
         return request.user and request.user.is_authenticated and request.user.is_hr
 
 
+class IsHRUserOrInternal(permissions.BasePermission):
+    def has_permission(self, request, view):
+        if request.META.get('REMOTE_ADDR') in settings.METRICS_ALLOWED_IPS:
+            return True
+        return bool(request.user and request.user.is_authenticated and request.user.is_hr)
+
+
 class IsOwnerOrHR(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         if request.user.is_hr:
             return True
-        if hasattr(obj, 'employee') and hasattr(obj.employee, 'user'):
-            return obj.employee.user == request.user
+        # Comparing ids avoids loading the employee's user row for every object checked.
+        if hasattr(obj, 'employee') and hasattr(obj.employee, 'user_id'):
+            return request.user.pk is not None and obj.employee.user_id == request.user.pk
         return False
 
 
 class IsEmployeeOwner(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
-        if hasattr(obj, 'user'):
-            return obj.user == request.user
+        if hasattr(obj, 'user_id'):
+            return request.user.pk is not None and obj.user_id == request.user.pk
         return False
 
@@ -0,0 +1,36 @@
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Compact UTF-8 with 'Z' for UTC, matching what DRF's encoder produces.
+ORJSON_OPTIONS = (orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+_encoder = JSONEncoder()
+
+
+def _default(obj):
+    # Types orjson does not know (Decimal, timedelta, lazy strings, querysets...) get DRF's conversions.
+    return _encoder.default(obj)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer that encodes with orjson when it is installed.
+
+    date, datetime, time and UUID are encoded natively; other types fall back to DRF's encoder
+    through `default`. Indented output, and anything orjson rejects (such as integers beyond 64
+    bits), is rendered by the stock stdlib renderer, as is everything when orjson is missing.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            return orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
@@ -0,0 +1,151 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from functools import lru_cache
+from pathlib import Path
+import drf_spectacular
+from django.apps import apps
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+from drf_spectacular.settings import spectacular_settings
+from drf_spectacular.views import SpectacularAPIView
+
+logger = logging.getLogger('api')
+
+RENDERERS = {'yaml': OpenApiYamlRenderer, 'json': OpenApiJsonRenderer}
+
+
+@lru_cache(maxsize=None)
+def schema_version():
+    """Identifies the code the schema is generated from, identically on every host running it.
+
+    Combines the drf-spectacular version with APP_VERSION when it is set, and otherwise with the
+    contents of every Python file in the project's own apps. Computed once per process.
+    """
+    digest = hashlib.sha256()
+    digest.update(f'{settings.APP_VERSION}\0{drf_spectacular.__version__}\0'.encode())
+    if settings.APP_VERSION:
+        return digest.hexdigest()[:16]
+    
+    base_dir = Path(settings.BASE_DIR)
+    directories = {Path(config.path) for config in apps.get_app_configs() if Path(config.path).is_relative_to(base_dir)}
+    # The project package holding settings and the URLconf.
+    directories.add(base_dir / settings.ROOT_URLCONF.split('.')[0])
+    for directory in sorted(directories):
+        for path in sorted(directory.rglob('*.py')):
+            content_hash = hashlib.sha256(path.read_bytes()).hexdigest()
+            digest.update(f'{path.relative_to(base_dir)}\0{content_hash}\n'.encode())
+    return digest.hexdigest()[:16]
+
+
+def build_schema():
+    """Generates the schema as SpectacularAPIView would, rendered in every served format."""
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    schema = generator.get_schema(request=None, public=True)
+    return {
+        name: renderer().render(schema, renderer_context={}).decode()
+        for name, renderer in RENDERERS.items()
+    }
+
+
+def write_schema(path, version, formats):
+    """Writes atomically, so workers reading the file never see a partial one."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {'version': version, 'generated_at': timezone.now().isoformat(), 'formats': formats}
+    descriptor, temporary = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.')
+    try:
+        with os.fdopen(descriptor, 'w') as handle:
+            json.dump(payload, handle)
+        os.chmod(temporary, 0o644)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def read_schema(path):
+    """Returns the stored payload, or None when the file is missing or unreadable."""
+    try:
+        with open(path) as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return None
+
+
+class SchemaCache:
+    """The prebuilt schema at OPENAPI_SCHEMA_PATH, held in memory once loaded.
+
+    A missing file, or one built for another schema_version(), is regenerated on first use, so a
+    deploy that skipped build_openapi_schema still serves a current schema.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entry = None
+
+    def get(self):
+        version = schema_version()
+        entry = self._entry
+        if entry is not None and entry['version'] == version:
+            return entry
+        with self._lock:
+            if self._entry is None or self._entry['version'] != version:
+                self._entry = self._load(version)
+            return self._entry
+
+    def clear(self):
+        with self._lock:
+            self._entry = None
+
+    def _load(self, version):
+        path = settings.OPENAPI_SCHEMA_PATH
+        payload = read_schema(path)
+        if payload is None or payload.get('version') != version:
+            logger.info("OpenAPI schema at %s is missing or stale, regenerating version %s", path, version)
+            formats = build_schema()
+            write_schema(path, version, formats)
+        else:
+            formats = payload['formats']
+
+        bodies = {name: formats[name].encode() for name in RENDERERS}
+        return {
+            'version': version,
+            'bodies': bodies,
+            'etags': {name: f'"{hashlib.sha256(body).hexdigest()[:32]}"' for name, body in bodies.items()},
+        }
+
+
+schema_cache = SchemaCache()
+
+
+class CachedSchemaView(SpectacularAPIView):
+    """Serves the prebuilt schema instead of introspecting every view on each request.
+
+    Format negotiation, authentication and permissions are SpectacularAPIView's. Responses carry a
+    content ETag and long-lived Cache-Control, and a matching If-None-Match gets a 304. Requests
+    for a specific ?version= or ?lang= are generated live.
+    """
+
+    def _get_schema_response(self, request):
+        if request.GET.get('version') or request.GET.get('lang') or self.api_version:
+            return super()._get_schema_response(request)
+
+        entry = schema_cache.get()
+        renderer = request.accepted_renderer
+        body = entry['bodies'][renderer.format]
+        etag = entry['etags'][renderer.format]
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(body, content_type=f'{renderer.media_type}; charset=utf-8')
+        response['ETag'] = etag
+        patch_cache_control(response, public=True, max_age=settings.OPENAPI_SCHEMA_MAX_AGE)
+        patch_vary_headers(response, ('Accept',))
+        return response
@@ -0,0 +1,46 @@
+from django.contrib.auth import get_user_model
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from .authentication import add_user_claims, load_user
+from .token_blacklist import token_blacklist
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        return add_user_claims(super().get_token(user), user)
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """Refreshes tokens with claims read from the current user, revoking the rotated refresh token."""
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        if token_blacklist.is_revoked(refresh[api_settings.JTI_CLAIM]):
+            raise InvalidToken(_("Token is blacklisted"))
+        
+        try:
+            user = load_user(refresh[api_settings.USER_ID_CLAIM])
+        except (KeyError, get_user_model().DoesNotExist):
+            raise exceptions.AuthenticationFailed(_("User not found"), code='user_not_found')
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(_("User is inactive"), code='user_inactive')
+        add_user_claims(refresh, user)
+        
+        data = {'access': str(refresh.access_token)}
+        
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            # A concurrent refresh of the same token may have revoked it since the check above.
+            if api_settings.BLACKLIST_AFTER_ROTATION and not token_blacklist.revoke_if_new(
+                refresh[api_settings.JTI_CLAIM], refresh['exp']
+            ):
+                raise InvalidToken(_("Token is blacklisted"))
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data['refresh'] = str(refresh)
+        
+        return data
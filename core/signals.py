@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .authentication import invalidate_cached_user, bump_user_version
+
+
+@receiver([post_save, post_delete], sender=settings.AUTH_USER_MODEL, dispatch_uid='core.invalidate_user_on_user_change')
+def invalidate_user_on_user_change(sender, instance, update_fields=None, **kwargs):
+    invalidate_cached_user(instance.pk)
+    # Logging in saves last_login right after the token is issued; that changes no claim.
+    if update_fields is None or set(update_fields) != {'last_login'}:
+        bump_user_version(instance.pk)
+
+
+@receiver([post_save, post_delete], sender='employees.Employee', dispatch_uid='core.invalidate_user_on_employee_change')
+def invalidate_user_on_employee_change(sender, instance, **kwargs):
+    if instance.user_id:
+        invalidate_cached_user(instance.user_id)
+        bump_user_version(instance.user_id)
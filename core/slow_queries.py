@@ -0,0 +1,96 @@
+import os
+import random
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils import timezone
+
+SQL_MAX_LENGTH = 2000
+
+_PROJECT_DIR = str(settings.BASE_DIR) + os.sep
+# Wrapper and middleware frames sit between the ORM call and the query; they are never the culprit.
+_IGNORED_FILES = {__file__, os.path.join(os.path.dirname(__file__), 'metrics.py')}
+
+
+class SlowQueryLog:
+    """Bounded ring buffer of sampled slow queries; the oldest entries are dropped first."""
+
+    def __init__(self, size):
+        self._entries = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, entry):
+        with self._lock:
+            self._entries.append(entry)
+
+    def entries(self):
+        with self._lock:
+            return list(reversed(self._entries))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+slow_query_log = SlowQueryLog(settings.SLOW_QUERY_BUFFER_SIZE)
+
+
+def _application_frame():
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(_PROJECT_DIR) and 'site-packages' not in filename and filename not in _IGNORED_FILES:
+            code = frame.f_code
+            return {
+                'function': getattr(code, 'co_qualname', code.co_name),
+                'location': f"{os.path.relpath(filename, _PROJECT_DIR)}:{frame.f_lineno}",
+            }
+        frame = frame.f_back
+    return {'function': None, 'location': None}
+
+
+class _SlowQueryRecorder:
+    def __init__(self, request, alias):
+        self.request = request
+        self.alias = alias
+        self.threshold = settings.SLOW_QUERY_THRESHOLD_MS / 1000
+        self.sample_rate = settings.SLOW_QUERY_SAMPLE_RATE
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            if elapsed >= self.threshold and random.random() < self.sample_rate:
+                match = getattr(self.request, 'resolver_match', None)
+                slow_query_log.record({
+                    'sql': sql[:SQL_MAX_LENGTH],
+                    'many': many,
+                    'duration_ms': round(elapsed * 1000, 3),
+                    'database': self.alias,
+                    'view': match.view_name if match else None,
+                    'path': self.request.path,
+                    'timestamp': timezone.now().isoformat(),
+                    **_application_frame(),
+                })
+
+
+class SlowQueryMiddleware:
+    """Opt-in (SLOW_QUERY_LOG_ENABLED); when disabled Django drops it from the stack entirely."""
+
+    def __init__(self, get_response):
+        if not settings.SLOW_QUERY_LOG_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(_SlowQueryRecorder(request, connection.alias)))
+            return self.get_response(request)
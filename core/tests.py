@@ -1,2 +1,515 @@
-from django.test import TestCase
+import io
+import json
+import logging
+import os
+import tempfile
+import time
+import zlib
+from datetime import date, datetime, timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock, skipIf
+from uuid import UUID
+from django.conf import settings
+from django.core.management import call_command
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connections
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from core.authentication import add_user_claims
+from core.compression import ENCODINGS, CompressionMiddleware, negotiate
+from core.db_router import PIN_COOKIE
+from core.log_handlers import JSONFormatter, QueuedHandler
+from core.token_blacklist import TokenBlacklist
+from core.throttling import SlidingWindowStore
+from core.metrics import LATENCY_BUCKETS, STALE_FLUSH_INTERVALS, MetricsRegistry, render_prometheus
+from core.parsers import FastJSONParser
+from core.schema import read_schema, schema_cache, schema_version, write_schema
+from core.renderers import FastJSONRenderer
+from employees.models import Employee
+from leaves.models import LeaveRequest
 
+
+class QueuedLoggingTest(SimpleTestCase):
+    def setUp(self):
+        self.logger = logging.getLogger('core.tests.queued')
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+
+    def _attach(self, formatter, **kwargs):
+        stream = io.StringIO()
+        handler = QueuedHandler('logging.StreamHandler', stream=stream, **kwargs)
+        handler.setFormatter(formatter)
+        self.logger.addHandler(handler)
+        self.addCleanup(self.logger.removeHandler, handler)
+        return handler, stream
+
+    def test_records_are_written_by_listener(self):
+        handler, stream = self._attach(logging.Formatter('%(levelname)s %(message)s'))
+
+        self.logger.info('Leave request approved: %s', 42)
+        handler.close()
+
+        self.assertEqual(stream.getvalue(), 'INFO Leave request approved: 42\n')
+
+    def test_exception_is_rendered_before_enqueue(self):
+        handler, stream = self._attach(logging.Formatter('%(message)s'))
+
+        try:
+            raise KeyError('leave_id')
+        except KeyError:
+            self.logger.error('KeyError: %s', 'leave_id', exc_info=True)
+        handler.close()
+
+        output = stream.getvalue()
+        self.assertIn('KeyError: leave_id', output)
+        self.assertIn('Traceback (most recent call last)', output)
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        handler, stream = self._attach(logging.Formatter('%(message)s'), queue_size=1)
+        handler._ensure_listener()
+        handler.listener.stop()
+
+        self.logger.info('first')
+        self.logger.info('second')
+
+        self.assertEqual(handler.dropped, 1)
+
+    def test_json_formatter_includes_extra_fields(self):
+        handler, stream = self._attach(JSONFormatter())
+
+        self.logger.info('Employee sync report: %s', 'ok', extra={'sync_report': {'total_seconds': 1.5}})
+        handler.close()
+
+        payload = json.loads(stream.getvalue())
+        self.assertEqual(payload['message'], 'Employee sync report: ok')
+        self.assertEqual(payload['level'], 'INFO')
+        self.assertEqual(payload['logger'], 'core.tests.queued')
+        self.assertEqual(payload['sync_report'], {'total_seconds': 1.5})
+
+
+class TokenBlacklistTest(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'blacklist.sqlite3')
+
+    def test_revoked_jti_is_shared_after_sync(self):
+        first = TokenBlacklist(self.path, sync_interval=60)
+        second = TokenBlacklist(self.path, sync_interval=60)
+        self.assertFalse(second.is_revoked('abc'))
+        
+        first.revoke('abc', time.time() + 60)
+        self.assertTrue(first.is_revoked('abc'))
+        self.assertFalse(second.is_revoked('abc'))
+        
+        first.flush()
+        second.flush()
+        self.assertTrue(second.is_revoked('abc'))
+
+    def test_revoke_if_new_succeeds_once_across_processes(self):
+        first = TokenBlacklist(self.path, sync_interval=60)
+        second = TokenBlacklist(self.path, sync_interval=60)
+        expires_at = time.time() + 60
+        
+        self.assertTrue(first.revoke_if_new('abc', expires_at))
+        self.assertFalse(first.revoke_if_new('abc', expires_at))
+        self.assertFalse(second.revoke_if_new('abc', expires_at))
+        self.assertTrue(second.is_revoked('abc'))
+
+    def test_expired_entries_are_pruned(self):
+        blacklist = TokenBlacklist(self.path, sync_interval=0)
+        blacklist.revoke('expired', time.time() - 1)
+        blacklist.revoke('live', time.time() + 60)
+        blacklist.flush()
+        
+        self.assertFalse(blacklist.is_revoked('expired'))
+        self.assertTrue(blacklist.is_revoked('live'))
+        self.assertEqual(len(blacklist), 1)
+        self.assertEqual(len(TokenBlacklist(self.path, sync_interval=0)._connect().execute(
+            "SELECT jti FROM revoked_tokens"
+        ).fetchall()), 1)
+
+
+class SlidingWindowStoreTest(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'throttle.sqlite3')
+
+    def test_limit_is_shared_between_stores(self):
+        first = SlidingWindowStore(self.path)
+        second = SlidingWindowStore(self.path)
+        
+        self.assertEqual(first.hit('user_1', 3, 60, 600.0), (True, None))
+        self.assertEqual(second.hit('user_1', 3, 60, 601.0), (True, None))
+        self.assertEqual(first.hit('user_1', 3, 60, 602.0), (True, None))
+        allowed, wait = second.hit('user_1', 3, 60, 603.0)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(wait, 57.0)
+        self.assertTrue(first.hit('user_2', 3, 60, 603.0)[0])
+
+    def test_unusable_store_allows_requests_and_logs_once(self):
+        store = SlidingWindowStore(os.path.join(self.path, 'missing', 'throttle.sqlite3'))
+        
+        with self.assertLogs('core', level='ERROR') as logs:
+            for second in range(5):
+                self.assertEqual(store.hit('user_1', 1, 60, 600.0 + second), (True, None))
+        self.assertEqual(len(logs.records), 1)
+
+    def test_previous_window_decays(self):
+        store = SlidingWindowStore(self.path)
+        for second in range(4):
+            store.hit('user_1', 4, 60, 600.0 + second)
+        
+        # A third into the next window the previous four requests still weigh 2.67
+        self.assertTrue(store.hit('user_1', 4, 60, 680.0)[0])
+        self.assertTrue(store.hit('user_1', 4, 60, 680.0)[0])
+        allowed, wait = store.hit('user_1', 4, 60, 680.0)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(wait, 10.0)
+        self.assertTrue(store.hit('user_1', 4, 60, 790.0)[0])
+
+
+class MetricsRegistryTest(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def test_workers_are_merged(self):
+        first = MetricsRegistry(self.directory, flush_interval=60)
+        second = MetricsRegistry(self.directory, flush_interval=60)
+        first.record('leave-list', 'GET', 200, 0.02, 2, 0.004)
+        second.record('leave-list', 'GET', 200, 0.3, 3, 0.1)
+        second.record('leave-approve', 'PATCH', 403, 0.001, 0, 0.0)
+        first.flush()
+        
+        merged = second.collect()
+        count, total, buckets, queries, db_seconds = merged[('leave-list', 'GET', '200')]
+        self.assertEqual(count, 2)
+        self.assertEqual(queries, 5)
+        self.assertAlmostEqual(db_seconds, 0.104)
+        self.assertEqual(sum(buckets), 2)
+        
+        output = render_prometheus(merged)
+        self.assertIn('http_request_duration_seconds_bucket{view="leave-list",method="GET",status="200",le="0.025"} 1', output)
+        self.assertIn('http_request_duration_seconds_bucket{view="leave-list",method="GET",status="200",le="+Inf"} 2', output)
+        self.assertIn('http_request_db_queries_total{view="leave-approve",method="PATCH",status="403"} 0', output)
+
+    def test_stale_worker_files_are_pruned(self):
+        registry = MetricsRegistry(self.directory, flush_interval=60)
+        registry.record('leave-list', 'GET', 200, 0.02, 1, 0.001)
+        row = ['leave-list', 'GET', '200', 5, 1.0, [5] + [0] * len(LATENCY_BUCKETS), 5, 0.1]
+        dead = os.path.join(self.directory, 'metrics-999999999-deadbeef.json')
+        idle = os.path.join(self.directory, f'metrics-{os.getpid()}-0ld0ld00.json')
+        for path in (dead, idle):
+            with open(path, 'w') as f:
+                json.dump([row], f)
+        old = time.time() - 60 * STALE_FLUSH_INTERVALS - 1
+        os.utime(idle, (old, old))
+        
+        merged = registry.collect()
+        self.assertEqual(merged[('leave-list', 'GET', '200')][0], 1)
+        self.assertFalse(os.path.exists(dead))
+        self.assertFalse(os.path.exists(idle))
+        
+        registry.remove()
+        self.assertEqual(os.listdir(self.directory), [])
+
+
+@skipIf(settings.USE_MYSQL, 'SQLite profile only applies without USE_MYSQL')
+class SQLiteProfileTest(SimpleTestCase):
+    def test_connections_apply_wal_and_pragmas(self):
+        default = connections['default']
+        directory = tempfile.mkdtemp()
+        wrapper = default.__class__(
+            {**default.settings_dict, 'NAME': os.path.join(directory, 'profile.sqlite3')},
+            alias='sqlite_profile'
+        )
+        self.addCleanup(wrapper.close)
+        
+        with wrapper.cursor() as cursor:
+            pragmas = {}
+            for name in ('journal_mode', 'busy_timeout', 'mmap_size'):
+                cursor.execute(f'PRAGMA {name}')
+                pragmas[name] = cursor.fetchone()[0]
+        
+        self.assertEqual(pragmas['journal_mode'], settings.SQLITE_PRAGMAS['journal_mode'].lower())
+        self.assertEqual(pragmas['busy_timeout'], settings.SQLITE_PRAGMAS['busy_timeout'])
+        self.assertEqual(pragmas['mmap_size'], settings.SQLITE_PRAGMAS['mmap_size'])
+        self.assertEqual(wrapper.transaction_mode, 'IMMEDIATE')
+        self.assertTrue(default.settings_dict['CONN_HEALTH_CHECKS'])
+
+
+class FastJSONTest(SimpleTestCase):
+    payload = {
+        'id': 7,
+        'name': 'Zoë',
+        'start_date': date(2030, 1, 2),
+        'approval_date': datetime(2030, 1, 2, 9, 30, 15, 123456, tzinfo=dt_timezone.utc),
+        'days': Decimal('2.5'),
+        'uuid': UUID('12345678-1234-5678-1234-567812345678'),
+        'results': [{'status': 'pending', 'tags': ('a', 'b')}, None],
+    }
+
+    def test_renders_same_bytes_as_stdlib_renderer(self):
+        self.assertEqual(FastJSONRenderer().render(self.payload), JSONRenderer().render(self.payload))
+
+    def test_falls_back_to_stdlib_without_orjson(self):
+        with mock.patch('core.renderers.orjson', None):
+            rendered = FastJSONRenderer().render(self.payload)
+        
+        self.assertEqual(rendered, JSONRenderer().render(self.payload))
+
+    def test_falls_back_to_stdlib_for_values_orjson_rejects(self):
+        self.assertEqual(FastJSONRenderer().render({'big': 2 ** 70}), b'{"big":1180591620717411303424}')
+
+    def test_indented_output_uses_stdlib_renderer(self):
+        rendered = FastJSONRenderer().render({'id': 1}, 'application/json; indent=2')
+        
+        self.assertEqual(rendered, b'{\n  "id": 1\n}')
+
+    def test_parses_with_and_without_orjson(self):
+        body = '{"name": "Zoë", "days": [1, 2.5]}'.encode()
+        expected = {'name': 'Zoë', 'days': [1, 2.5]}
+        
+        self.assertEqual(FastJSONParser().parse(io.BytesIO(body)), expected)
+        with mock.patch('core.parsers.orjson', None):
+            self.assertEqual(FastJSONParser().parse(io.BytesIO(body)), expected)
+
+    def test_invalid_json_raises_parse_error(self):
+        for body in (b'{"name": ', b'{"days": NaN}'):
+            with self.assertRaises(ParseError):
+                FastJSONParser().parse(io.BytesIO(body))
+
+
+class CompressionMiddlewareTest(SimpleTestCase):
+    rows = [{'id': index, 'name': f'Employee {index}', 'status': 'approved'} for index in range(200)]
+
+    def respond(self, response, accept_encoding='gzip, deflate'):
+        middleware = CompressionMiddleware(lambda request: response)
+        return middleware(RequestFactory().get('/api/employees/', HTTP_ACCEPT_ENCODING=accept_encoding))
+
+    def test_large_json_is_gzipped(self):
+        original = JsonResponse({'results': self.rows})
+        content = original.content
+        original['ETag'] = '"abc"'
+        response = self.respond(original)
+        
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(response['ETag'], 'W/"abc"')
+        self.assertEqual(int(response['Content-Length']), len(response.content))
+        self.assertEqual(zlib.decompress(response.content, 31), content)
+        self.assertLess(len(response.content), len(content) / 4)
+
+    def test_small_responses_are_not_compressed(self):
+        response = self.respond(JsonResponse({'status': 'ok'}))
+        
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertFalse(response.has_header('Vary'))
+
+    def test_refused_encodings_are_not_used(self):
+        for accept_encoding in ('', 'identity', 'gzip;q=0', '*;q=0', 'compress'):
+            response = self.respond(JsonResponse({'results': self.rows}), accept_encoding)
+            
+            self.assertFalse(response.has_header('Content-Encoding'), accept_encoding)
+            self.assertEqual(response['Vary'], 'Accept-Encoding')
+
+    def test_binary_content_types_are_not_compressed(self):
+        response = self.respond(HttpResponse(b'x' * 5000, content_type='image/png'))
+        
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_streaming_response_is_compressed_chunk_by_chunk(self):
+        chunks = [json.dumps(self.rows).encode() + b'\n' for _ in range(20)]
+        produced = []
+        
+        def export():
+            for chunk in chunks:
+                produced.append(chunk)
+                yield chunk
+        
+        response = self.respond(StreamingHttpResponse(export(), content_type='application/x-ndjson'))
+        
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertFalse(response.has_header('Content-Length'))
+        decompressor = zlib.decompressobj(31)
+        stream = iter(response.streaming_content)
+        received = b''
+        while len(received) < len(chunks[0]):
+            received += decompressor.decompress(next(stream))
+        # The first chunk is readable before the rest of the body has been produced.
+        self.assertEqual(received, chunks[0])
+        self.assertEqual(len(produced), 1)
+        received += b''.join(decompressor.decompress(chunk) for chunk in stream)
+        self.assertEqual(received, b''.join(chunks))
+
+    def test_negotiate_prefers_server_order_among_accepted_encodings(self):
+        available = ['zstd', 'br', 'gzip']
+        
+        self.assertEqual(negotiate('gzip, br', available), 'br')
+        self.assertEqual(negotiate('gzip;q=0.5, br;q=0', available), 'gzip')
+        self.assertEqual(negotiate('*', available), 'zstd')
+        self.assertEqual(negotiate('*, zstd;q=0', available), 'br')
+        self.assertIsNone(negotiate('deflate', available))
+
+    @skipIf('br' not in ENCODINGS, 'brotli is not installed')
+    @override_settings(COMPRESSION_ENCODINGS=['br', 'gzip'])
+    def test_brotli_when_enabled_and_installed(self):
+        import brotli
+        
+        response = self.respond(JsonResponse({'results': self.rows}), 'gzip, br')
+        
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(response.content), JsonResponse({'results': self.rows}).content)
+
+
+class CachedSchemaTest(SimpleTestCase):
+    def setUp(self):
+        path = os.path.join(tempfile.mkdtemp(), 'openapi-schema.json')
+        override = override_settings(OPENAPI_SCHEMA_PATH=path)
+        override.enable()
+        self.addCleanup(override.disable)
+        schema_cache.clear()
+        self.addCleanup(schema_cache.clear)
+        self.path = path
+
+    def test_command_writes_schema_for_current_version(self):
+        call_command('build_openapi_schema', stdout=io.StringIO(), stderr=io.StringIO())
+        payload = read_schema(self.path)
+        
+        self.assertEqual(payload['version'], schema_version())
+        self.assertIn('/api/leaves/', json.loads(payload['formats']['json'])['paths'])
+        self.assertTrue(payload['formats']['yaml'].startswith('openapi: 3'))
+
+    def test_schema_is_served_from_file_with_etag_and_cache_headers(self):
+        call_command('build_openapi_schema', stdout=io.StringIO(), stderr=io.StringIO())
+        stored = json.loads(read_schema(self.path)['formats']['json'])
+        
+        with mock.patch('core.schema.build_schema') as build_schema:
+            response = self.client.get('/api/schema/', {'format': 'json'})
+            cached = self.client.get('/api/schema/', {'format': 'json'}, HTTP_IF_NONE_MATCH=response['ETag'])
+        
+        build_schema.assert_not_called()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content), stored)
+        self.assertIn('max-age=%d' % settings.OPENAPI_SCHEMA_MAX_AGE, response['Cache-Control'])
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached['ETag'], response['ETag'])
+        self.assertEqual(self.client.get('/api/schema/')['Content-Type'], 'application/vnd.oai.openapi; charset=utf-8')
+
+    def test_schema_is_regenerated_when_version_changes(self):
+        write_schema(self.path, 'previous-release', {'yaml': 'openapi: 3.0.3', 'json': '{}'})
+        
+        response = self.client.get('/api/schema/', {'format': 'json'})
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('/api/leaves/', json.loads(response.content)['paths'])
+        self.assertEqual(read_schema(self.path)['version'], schema_version())
+
+    def test_version_depends_on_file_contents_not_timestamps(self):
+        base_dir = tempfile.mkdtemp()
+        os.makedirs(os.path.join(base_dir, 'project'))
+        source = os.path.join(base_dir, 'project', 'urls.py')
+        with open(source, 'w') as f:
+            f.write('urlpatterns = []\n')
+        
+        def version():
+            schema_version.cache_clear()
+            with override_settings(BASE_DIR=base_dir, ROOT_URLCONF='project.urls', APP_VERSION=''):
+                return schema_version()
+        
+        self.addCleanup(schema_version.cache_clear)
+        original = version()
+        os.utime(source, (0, 0))
+        self.assertEqual(version(), original)
+        with open(source, 'a') as f:
+            f.write('# changed\n')
+        self.assertNotEqual(version(), original)
+
+
+REPLICAS = ['replica_a', 'replica_b']
+
+
+@override_settings(DATABASE_REPLICA_ALIASES=REPLICAS)
+class ReplicaRoutingTest(TestCase):
+    """Two SQLite files stand in for replicas; each holds a row the primary does not have."""
+
+    databases = {'default', *REPLICAS}
+
+    @classmethod
+    def setUpClass(cls):
+        directory = tempfile.mkdtemp()
+        default = connections['default']
+        for alias in REPLICAS:
+            path = os.path.join(directory, f'{alias}.sqlite3')
+            # Snapshot the migrated test schema before the test transaction opens.
+            with default.cursor() as cursor:
+                cursor.execute('VACUUM INTO %s', [path])
+            connections.settings[alias] = {**default.settings_dict, 'NAME': path}
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        for alias in REPLICAS:
+            connections[alias].close()
+            del connections[alias]
+            del connections.settings[alias]
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.hr_user = User.objects.create_user(username='hr', email='hr@example.com', password='pass12345', role='HR')
+        cls.employee = Employee.objects.create(name='Primary Employee', email='primary@example.com', company_id=1)
+        cls.leave = LeaveRequest.objects.create(
+            employee=cls.employee, leave_type='annual', start_date='2030-01-01', end_date='2030-01-02'
+        )
+        for alias in REPLICAS:
+            Employee.objects.using(alias).create(name=f'Only on {alias}', email=f'{alias}@example.com', company_id=1)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        token = add_user_claims(RefreshToken.for_user(self.hr_user), self.hr_user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token.access_token}')
+
+    def employee_names(self):
+        response = self.client.get('/api/employees/')
+        self.assertEqual(response.status_code, 200)
+        return {employee['name'] for employee in response.data['results']}
+
+    def test_safe_request_reads_from_one_replica(self):
+        names = self.employee_names()
+        
+        self.assertEqual(len(names), 1)
+        self.assertIn(names.pop(), {f'Only on {alias}' for alias in REPLICAS})
+
+    def test_client_is_pinned_to_primary_after_writing(self):
+        response = self.client.patch(f'/api/leaves/{self.leave.pk}/approve/')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.cookies[PIN_COOKIE]['max-age'], settings.DATABASE_REPLICA_PIN_SECONDS)
+        self.assertEqual(self.employee_names(), {'Primary Employee'})
+
+    def test_token_client_is_pinned_without_the_cookie(self):
+        response = self.client.patch(f'/api/leaves/{self.leave.pk}/approve/')
+        self.assertEqual(response.status_code, 200)
+        
+        self.client.cookies.pop(PIN_COOKIE, None)
+        self.assertEqual(self.employee_names(), {'Primary Employee'})
+        
+        other = APIClient()
+        token = add_user_claims(RefreshToken.for_user(self.hr_user), self.hr_user)
+        other.credentials(HTTP_AUTHORIZATION=f'Bearer {token.access_token}')
+        response = other.get('/api/employees/')
+        self.assertNotIn('Primary Employee', {employee['name'] for employee in response.data['results']})
+
+    def test_reads_outside_requests_use_primary(self):
+        self.assertEqual(Employee.objects.all().db, 'default')
@@ -1,13 +1,142 @@
+import logging
+import math
+import os
+import sqlite3
+import threading
+from django.conf import settings
 from rest_framework.throttling import UserRateThrottle
 
+logger = logging.getLogger('core')
 
-class AuthRateThrottle(UserRateThrottle):
+
+class SlidingWindowStore:
+    """Sliding-window counters shared between worker processes through a SQLite file.
+
+    Each key keeps only the window index and the counts of the current and previous
+    windows, so a hit is one indexed read and one upsert whatever the rate. When the file cannot be
+    used (locked past the busy timeout, unwritable or corrupt) requests are allowed rather than
+    failed, and the error is logged once until the store works again.
+    """
+
+    PRUNE_EVERY = 1000
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._connection = None
+        self._pid = None
+        self._hits = 0
+        self._failing = False
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        # SQLite connections must not be shared with a forked child.
+        if self._pid != os.getpid():
+            self._connection = sqlite3.connect(self.path, timeout=5, check_same_thread=False, isolation_level=None)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            # Counters are disposable; losing the last writes on power failure is acceptable.
+            self._connection.execute("PRAGMA synchronous=OFF")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS throttle_windows ("
+                "key TEXT PRIMARY KEY, window INTEGER NOT NULL, current INTEGER NOT NULL, "
+                "previous INTEGER NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._pid = os.getpid()
+        return self._connection
+
+    def hit(self, key, limit, duration, now):
+        """Records a request for ``key`` if allowed. Returns ``(allowed, wait_seconds)``."""
+        with self._lock:
+            try:
+                result = self._hit(key, limit, duration, now)
+            except sqlite3.Error as e:
+                if not self._failing:
+                    self._failing = True
+                    logger.error("Throttle store %s unavailable, allowing requests: %s", self.path, e)
+                return True, None
+            self._failing = False
+        return result
+
+    def _hit(self, key, limit, duration, now):
+        window = math.floor(now / duration)
+        elapsed = now - window * duration
+
+        connection = self._connect()
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            row = connection.execute(
+                "SELECT window, current, previous FROM throttle_windows WHERE key = ?", (key,)
+            ).fetchone()
+            current, previous = 0, 0
+            if row is not None:
+                if row[0] == window:
+                    current, previous = row[1], row[2]
+                elif row[0] == window - 1:
+                    previous = row[1]
+
+            estimate = previous * (1 - elapsed / duration) + current
+            if estimate >= limit:
+                return False, self._wait(limit, duration, elapsed, current, previous)
+
+            connection.execute(
+                "INSERT INTO throttle_windows (key, window, current, previous, expires_at) "
+                "VALUES (?, ?, ?, ?, ?) ON CONFLICT (key) DO UPDATE SET "
+                "window = excluded.window, current = excluded.current, "
+                "previous = excluded.previous, expires_at = excluded.expires_at",
+                (key, window, current + 1, previous, (window + 2) * duration)
+            )
+
+        self._hits += 1
+        if self._hits % self.PRUNE_EVERY == 0:
+            connection.execute("DELETE FROM throttle_windows WHERE expires_at <= ?", (now,))
+        return True, None
+
+    @staticmethod
+    def _wait(limit, duration, elapsed, current, previous):
+        if current < limit:
+            # The previous window's weight has to fall until one more request fits.
+            return max(duration * (1 - (limit - current) / previous) - elapsed, 0.0)
+        # Nothing fits before this window ends; then its count becomes the decaying previous one.
+        return (duration - elapsed) + duration * (1 - limit / current)
+
+    def reset(self):
+        with self._lock:
+            self._connect().execute("DELETE FROM throttle_windows")
+
+
+throttle_store = SlidingWindowStore(settings.THROTTLE_STORE_PATH)
+
+
+class SharedUserRateThrottle(UserRateThrottle):
+    """UserRateThrottle backed by the shared sliding-window store instead of per-process history lists."""
+
+    store = throttle_store
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        allowed, self.wait_seconds = self.store.hit(self.key, self.num_requests, self.duration, self.timer())
+        return allowed
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class AuthRateThrottle(SharedUserRateThrottle):
     scope = 'auth'
 
 
-class EmployeeSyncRateThrottle(UserRateThrottle):
+class EmployeeSyncRateThrottle(SharedUserRateThrottle):
     scope = 'employee_sync'
 
 
-class CreateLeaveRateThrottle(UserRateThrottle):
+class CreateLeaveRateThrottle(SharedUserRateThrottle):
     scope = 'create_leave'
+
+
+class EmployeeImportRateThrottle(SharedUserRateThrottle):
+    scope = 'employee_import'
@@ -0,0 +1,117 @@
+import atexit
+import logging
+import os
+import sqlite3
+import threading
+import time
+from django.conf import settings
+
+logger = logging.getLogger('core')
+
+
+class TokenBlacklist:
+    """Revoked refresh-token jtis held in memory and shared through a small SQLite file.
+
+    Lookups are dict hits. Every ``sync_interval`` seconds a process writes the jtis it revoked,
+    loads the ones other processes revoked (rows are append-only, so only ids past the last
+    one seen are read) and drops entries whose token has expired anyway.
+    """
+
+    def __init__(self, path, sync_interval=5):
+        self.path = str(path)
+        self.sync_interval = sync_interval
+        self._revoked = {}
+        self._pending = []
+        self._last_id = 0
+        self._last_sync = 0.0
+        self._connection = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        # SQLite connections must not be shared with a forked child.
+        if self._pid != os.getpid():
+            self._connection = sqlite3.connect(self.path, timeout=5, check_same_thread=False, isolation_level=None)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS revoked_tokens ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, jti TEXT NOT NULL UNIQUE, expires_at INTEGER NOT NULL)"
+            )
+            self._pid = os.getpid()
+            self._last_id = 0
+        return self._connection
+
+    def _sync(self, force=False):
+        now = time.time()
+        if not force and now - self._last_sync < self.sync_interval and self._pid == os.getpid():
+            return
+        self._last_sync = now
+        pending = self._pending
+        try:
+            connection = self._connect()
+            self._pending = []
+            with connection:
+                connection.execute("BEGIN IMMEDIATE")
+                if pending:
+                    connection.executemany(
+                        "INSERT OR IGNORE INTO revoked_tokens (jti, expires_at) VALUES (?, ?)", pending
+                    )
+                connection.execute("DELETE FROM revoked_tokens WHERE expires_at <= ?", (int(now),))
+                rows = connection.execute(
+                    "SELECT id, jti, expires_at FROM revoked_tokens WHERE id > ?", (self._last_id,)
+                ).fetchall()
+        except sqlite3.Error as e:
+            # Keep serving from memory; the pending jtis are written on the next successful sync.
+            self._pending = pending + self._pending
+            logger.error("Token blacklist sync failed: %s", e)
+            return
+        for row_id, jti, expires_at in rows:
+            self._revoked[jti] = expires_at
+            self._last_id = max(self._last_id, row_id)
+        self._revoked = {jti: expires_at for jti, expires_at in self._revoked.items() if expires_at > now}
+
+    def revoke(self, jti, expires_at):
+        with self._lock:
+            self._sync()
+            self._revoked[jti] = int(expires_at)
+            self._pending.append((jti, int(expires_at)))
+
+    def revoke_if_new(self, jti, expires_at):
+        """Revokes `jti` unless it already was, in this process or any other; returns whether it was new.
+
+        The check and the record happen under the lock and as one INSERT OR IGNORE on the shared
+        file, so two concurrent refreshes of the same token cannot both succeed.
+        """
+        with self._lock:
+            self._sync()
+            expires_at = int(expires_at)
+            if self._revoked.get(jti, 0) > time.time():
+                return False
+            try:
+                inserted = self._connect().execute(
+                    "INSERT OR IGNORE INTO revoked_tokens (jti, expires_at) VALUES (?, ?)", (jti, expires_at)
+                ).rowcount
+            except sqlite3.Error as e:
+                # Fall back to this process's view; the jti is written on the next successful sync.
+                logger.error("Token blacklist write failed: %s", e)
+                self._pending.append((jti, expires_at))
+                inserted = 1
+            self._revoked[jti] = expires_at
+            return bool(inserted)
+
+    def is_revoked(self, jti):
+        with self._lock:
+            self._sync()
+            expires_at = self._revoked.get(jti)
+        return expires_at is not None and expires_at > time.time()
+
+    def flush(self):
+        with self._lock:
+            self._sync(force=True)
+
+    def __len__(self):
+        return len(self._revoked)
+
+
+token_blacklist = TokenBlacklist(settings.JWT_BLACKLIST_PATH, settings.JWT_BLACKLIST_SYNC_INTERVAL)
+atexit.register(token_blacklist.flush)
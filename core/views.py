@@ -1,38 +1,77 @@
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny
+from rest_framework.decorators import api_view, authentication_classes, permission_classes, throttle_classes
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
-from django.db import connection
-from django.core.cache import cache
+from django.conf import settings
+from django.http import HttpResponse
 from django.utils import timezone
+from .health import health_prober
+from .metrics import registry, render_prometheus
+from .permissions import IsHRUser, IsHRUserOrInternal
+from .slow_queries import slow_query_log
 
 
 @api_view(['GET'])
+@authentication_classes([])
 @permission_classes([AllowAny])
+@throttle_classes([])
+def health_live(request):
+    return Response({'status': 'alive', 'timestamp': timezone.now().isoformat()})
+
+
+@api_view(['GET'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+@throttle_classes([])
 def health_check(request):
-    try:
-        with connection.cursor() as cursor:
-            cursor.execute("SELECT 1")
-            db_status = 'healthy'
-    except Exception:
-        db_status = 'unhealthy'
+    result = health_prober.get_result()
+    db_status = result['database']['status']
+    cache_status = result['cache']['status']
+    stale = health_prober.is_stale(result)
     
-    cache_status = 'healthy'
-    try:
-        cache.set('health_check', 'ok', 1)
-        if cache.get('health_check') != 'ok':
-            cache_status = 'unhealthy'
-    except Exception:
-        cache_status = 'unhealthy'
-    
-    overall_status = 'healthy' if db_status == 'healthy' and cache_status == 'healthy' else 'degraded'
+    overall_status = 'healthy' if db_status == 'healthy' and cache_status == 'healthy' and not stale else 'degraded'
     
     return Response(
         {
             'status': overall_status,
             'database': db_status,
             'cache': cache_status,
-            'timestamp': timezone.now().isoformat()
+            'timestamp': timezone.now().isoformat(),
+            'checked_at': result['checked_at'].isoformat(),
+            'stale': stale,
+            'details': {
+                'database': result['database'],
+                'cache': result['cache'],
+            }
         },
         status=status.HTTP_200_OK if overall_status == 'healthy' else status.HTTP_503_SERVICE_UNAVAILABLE
     )
+
+
+@api_view(['GET'])
+@permission_classes([IsHRUserOrInternal])
+@throttle_classes([])
+def metrics(request):
+    return HttpResponse(
+        render_prometheus(registry.collect()),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsHRUser])
+def slow_queries(request):
+    entries = slow_query_log.entries()
+    
+    return Response(
+        {
+            'error': False,
+            'message': f'{len(entries)} slow queries recorded.',
+            'data': {
+                'enabled': settings.SLOW_QUERY_LOG_ENABLED,
+                'threshold_ms': settings.SLOW_QUERY_THRESHOLD_MS,
+                'sample_rate': settings.SLOW_QUERY_SAMPLE_RATE,
+                'entries': entries,
+            }
+        }
+    )
@@ -1,10 +1,10 @@
 from django.contrib import admin
-from .models import Employee
+from .models import Employee, EmployeeSyncState, EmployeeSyncJob
 
 
 class EmployeeAdmin(admin.ModelAdmin):
-    list_display = ['name', 'email', 'company_id', 'joining_date', 'created_at']
-    list_filter = ['company_id', 'joining_date', 'created_at']
+    list_display = ['name', 'email', 'company_id', 'joining_date', 'is_active', 'created_at']
+    list_filter = ['is_active', 'company_id', 'joining_date', 'created_at']
     search_fields = ['name', 'email', 'company_id']
     readonly_fields = ['created_at', 'updated_at']
     fieldsets = (
@@ -12,7 +12,7 @@ class EmployeeAdmin(admin.ModelAdmin):
             'fields': ('user', 'name', 'email', 'company_id')
         }),
         ('Additional Information', {
-            'fields': ('joining_date',)
+            'fields': ('joining_date', 'is_active')
         }),
         ('Timestamps', {
             'fields': ('created_at', 'updated_at'),
@@ -22,3 +22,21 @@ class EmployeeAdmin(admin.ModelAdmin):
 
 
 admin.site.register(Employee, EmployeeAdmin)
+
+
+class EmployeeSyncStateAdmin(admin.ModelAdmin):
+    list_display = ['source_url', 'etag', 'last_modified', 'last_synced_at']
+    search_fields = ['source_url']
+    readonly_fields = ['created_at', 'updated_at']
+
+
+admin.site.register(EmployeeSyncState, EmployeeSyncStateAdmin)
+
+
+class EmployeeSyncJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'status', 'api_url', 'new_employees', 'updated_employees', 'total_processed', 'created_at']
+    list_filter = ['status', 'created_at']
+    readonly_fields = ['created_at', 'started_at', 'finished_at']
+
+
+admin.site.register(EmployeeSyncJob, EmployeeSyncJobAdmin)
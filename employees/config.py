@@ -5,3 +5,23 @@ EXTERNAL_EMPLOYEE_API_URL = config(
     default='https://jsonplaceholder.typicode.com/users'
 )
 
+# none | page | offset | cursor
+EXTERNAL_EMPLOYEE_API_PAGINATION = config('EXTERNAL_EMPLOYEE_API_PAGINATION', default='none')
+EXTERNAL_EMPLOYEE_API_PAGE_SIZE = config('EXTERNAL_EMPLOYEE_API_PAGE_SIZE', default=100, cast=int)
+EXTERNAL_EMPLOYEE_API_CONCURRENCY = config('EXTERNAL_EMPLOYEE_API_CONCURRENCY', default=5, cast=int)
+EXTERNAL_EMPLOYEE_API_MAX_RETRIES = config('EXTERNAL_EMPLOYEE_API_MAX_RETRIES', default=3, cast=int)
+EXTERNAL_EMPLOYEE_API_RETRY_BACKOFF = config('EXTERNAL_EMPLOYEE_API_RETRY_BACKOFF', default=0.5, cast=float)
+EXTERNAL_EMPLOYEE_API_TIMEOUT = config('EXTERNAL_EMPLOYEE_API_TIMEOUT', default=30, cast=int)
+
+EMPLOYEE_SYNC_BATCH_SIZE = config('EMPLOYEE_SYNC_BATCH_SIZE', default=500, cast=int)
+EMPLOYEE_SYNC_TRACE_MEMORY = config('EMPLOYEE_SYNC_TRACE_MEMORY', default=True, cast=bool)
+# Background jobs share the web process, where tracemalloc would slow every request thread.
+EMPLOYEE_SYNC_JOB_TRACE_MEMORY = config('EMPLOYEE_SYNC_JOB_TRACE_MEMORY', default=False, cast=bool)
+EMPLOYEE_SYNC_JOB_WORKERS = config('EMPLOYEE_SYNC_JOB_WORKERS', default=2, cast=int)
+# Jobs run on an in-process executor and are lost when their worker exits; past this many seconds
+# pending or running, a job is reported as failed.
+EMPLOYEE_SYNC_JOB_TIMEOUT = config('EMPLOYEE_SYNC_JOB_TIMEOUT', default=3600, cast=int)
+EMPLOYEE_IMPORT_CHUNK_SIZE = config('EMPLOYEE_IMPORT_CHUNK_SIZE', default=500, cast=int)
+# Invalidation only reaches the worker that saw the change unless the default cache is shared, so
+# the timeout bounds how stale another worker's summary can be.
+COMPANY_SUMMARY_CACHE_TIMEOUT = config('COMPANY_SUMMARY_CACHE_TIMEOUT', default=30, cast=int)
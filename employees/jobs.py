@@ -0,0 +1,165 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+from .models import EmployeeSyncJob
+from .config import EMPLOYEE_SYNC_JOB_WORKERS, EMPLOYEE_SYNC_JOB_TRACE_MEMORY, EMPLOYEE_SYNC_JOB_TIMEOUT
+from .services import EmployeeSyncService
+from .profiling import SyncReport
+from core.exceptions import BaseAPIException
+
+logger = logging.getLogger('employees')
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=EMPLOYEE_SYNC_JOB_WORKERS,
+                thread_name_prefix='employee-sync'
+            )
+        return _executor
+
+
+def enqueue_sync_job(job):
+    job_id = job.pk
+    transaction.on_commit(lambda: get_executor().submit(_run_in_worker, job_id))
+
+
+def _run_in_worker(job_id):
+    close_old_connections()
+    try:
+        run_sync_job(job_id)
+    finally:
+        connection.close()
+
+
+def _update_job(job_id, **fields):
+    EmployeeSyncJob.objects.filter(pk=job_id).update(**fields)
+
+
+def _finish_job(job_id, **fields):
+    # A job reported abandoned while it ran keeps that result rather than flipping to another one.
+    if EmployeeSyncJob.objects.filter(pk=job_id, status='running').update(**fields):
+        return True
+    logger.warning("Employee sync job %s finished after it was marked abandoned", job_id)
+    return False
+
+
+def fail_if_abandoned(job):
+    """Marks `job` failed when it has been pending or running for over EMPLOYEE_SYNC_JOB_TIMEOUT.
+
+    The executor lives in the web process, so a job whose worker exited or restarted is never
+    resumed and would otherwise stay pending or running forever. Returns the job, updated.
+    """
+    if job.status not in ('pending', 'running'):
+        return job
+    now = timezone.now()
+    if now - (job.started_at or job.created_at) < timedelta(seconds=EMPLOYEE_SYNC_JOB_TIMEOUT):
+        return job
+
+    fields = {
+        'status': 'failed',
+        'error_code': 'job_abandoned',
+        'error_message': 'The sync job did not finish; its worker may have restarted. Start a new sync.',
+        'finished_at': now
+    }
+    # Only if no worker finished it in the meantime.
+    if EmployeeSyncJob.objects.filter(pk=job.pk, status=job.status).update(**fields):
+        logger.error("Employee sync job %s abandoned while %s", job.pk, job.status)
+        for name, value in fields.items():
+            setattr(job, name, value)
+    else:
+        job.refresh_from_db()
+    return job
+
+
+def run_sync_job(job_id):
+    try:
+        job = EmployeeSyncJob.objects.get(pk=job_id)
+    except EmployeeSyncJob.DoesNotExist:
+        logger.error("Employee sync job not found: %s", job_id)
+        return
+
+    if not EmployeeSyncJob.objects.filter(pk=job_id, status='pending').update(
+        status='running', started_at=timezone.now()
+    ):
+        logger.warning("Employee sync job %s is no longer pending, not running it", job_id)
+        return
+
+    def report_progress(new_count, updated_count, processed):
+        _update_job(
+            job_id,
+            new_employees=new_count,
+            updated_employees=updated_count,
+            total_processed=processed
+        )
+
+    report = SyncReport(trace_memory=EMPLOYEE_SYNC_JOB_TRACE_MEMORY)
+
+    try:
+        with report:
+            # Reconciliation needs the complete feed, so it never sends conditional headers.
+            sync_state = None if job.reconcile_mode else EmployeeSyncService.get_sync_state(job.api_url)
+            with report.phase('fetch'):
+                employees_data = asyncio.run(
+                    EmployeeSyncService.fetch_employees(job.api_url, sync_state=sync_state, report=report)
+                )
+            report.add_rows('fetch', len(employees_data) if employees_data else 0)
+            _update_job(
+                job_id,
+                total_records=len(employees_data) if employees_data else 0,
+                not_modified=employees_data is None
+            )
+
+            new_count, updated_count = EmployeeSyncService.sync_employees(
+                employees_data,
+                progress_callback=report_progress,
+                report=report,
+                source=job.api_url
+            )
+            if job.reconcile_mode:
+                reconciliation = EmployeeSyncService.reconcile_employees(
+                    employees_data, mode=job.reconcile_mode, sources=[job.api_url]
+                )
+                _update_job(
+                    job_id,
+                    missing_employees=reconciliation['missing_employees'],
+                    missing_emails=reconciliation['missing_emails']
+                )
+            else:
+                EmployeeSyncService.save_sync_state(sync_state)
+
+        report_data = EmployeeSyncService.log_report(report, job_id=str(job_id), api_url=job.api_url)
+        if _finish_job(job_id, status='completed', report=report_data, finished_at=timezone.now()):
+            logger.info(
+                "Employee sync job %s completed. New: %d, Updated: %d", job_id, new_count, updated_count
+            )
+
+    except BaseAPIException as e:
+        _finish_job(
+            job_id,
+            status='failed',
+            error_code=e.default_code,
+            error_message=str(e.detail),
+            report=report.as_dict(),
+            finished_at=timezone.now()
+        )
+        logger.error("Employee sync job %s failed: %s", job_id, e.detail)
+    except Exception as e:
+        _finish_job(
+            job_id,
+            status='failed',
+            error_code='internal_error',
+            error_message='An unexpected error occurred during the sync.',
+            report=report.as_dict(),
+            finished_at=timezone.now()
+        )
+        logger.error("Employee sync job %s failed: %s", job_id, e, exc_info=True)
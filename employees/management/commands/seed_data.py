@@ -0,0 +1,233 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+from contextlib import ExitStack, contextmanager
+from datetime import date, datetime, time as dt_time
+import logging
+import random
+import time
+from employees.models import Employee
+from employees.services import CompanySummaryService
+from leaves.models import LeaveRequest
+
+logger = logging.getLogger('employees')
+
+LEAVE_TYPES = ('annual', 'sick', 'casual')
+# Weighted so most leave history is settled while a realistic share is still pending.
+LEAVE_STATUSES = ('approved', 'approved', 'approved', 'rejected', 'pending')
+FIRST_NAMES = ('Aisha', 'Ben', 'Chen', 'Diego', 'Elena', 'Farah', 'Gustav', 'Hana', 'Ivan', 'Jade',
+               'Kofi', 'Lena', 'Mateo', 'Nadia', 'Omar', 'Priya', 'Quinn', 'Rafael', 'Sara', 'Tomas')
+LAST_NAMES = ('Ahmed', 'Brown', 'Costa', 'Dubois', 'Evans', 'Fischer', 'Garcia', 'Hassan', 'Ito', 'Jensen',
+              'Khan', 'Lopez', 'Moreau', 'Nguyen', 'Okafor', 'Patel', 'Rossi', 'Silva', 'Tanaka', 'Weber')
+EMPLOYEE_FIELDS = ('id', 'name', 'email', 'company_id', 'joining_date', 'is_active', 'content_hash',
+                   'sync_source', 'created_at', 'updated_at')
+LEAVE_FIELDS = ('employee', 'leave_type', 'start_date', 'end_date', 'status', 'approval_date',
+                'created_at', 'updated_at')
+DECISION_TIME = dt_time(9)
+
+
+def _insert(cursor, model, fields, rows):
+    table = connection.ops.quote_name(model._meta.db_table)
+    columns = ', '.join(connection.ops.quote_name(model._meta.get_field(field).column) for field in fields)
+    placeholders = ', '.join(['%s'] * len(fields))
+    cursor.executemany(f'INSERT INTO {table} ({columns}) VALUES ({placeholders})', rows)
+
+
+class _DateStrings(dict):
+    def __missing__(self, ordinal):
+        value = self[ordinal] = date.fromordinal(ordinal).isoformat()
+        return value
+
+
+class _DecisionStrings(dict):
+    def __missing__(self, ordinal):
+        value = self[ordinal] = connection.ops.adapt_datetimefield_value(
+            timezone.make_aware(datetime.combine(date.fromordinal(ordinal), DECISION_TIME))
+        )
+        return value
+
+
+# Per-process caches of rendered dates, keyed by ordinal.
+_dates = _DateStrings()
+_decisions = _DecisionStrings()
+
+
+def generate_chunk(start, stop, leaves_per_employee, companies, email_domain, seed):
+    """Builds the rows for employees with ids [start, stop) and their leaves.
+
+    Each employee's leaves are laid end to end with random gaps, so no two of them ever overlap.
+    Employee ids are assigned here so the leaves can reference them without reading anything back.
+    Dates are handled as ordinals and rendered once per distinct day.
+    """
+    rng = random.Random(seed * 1_000_003 + start)
+    random_value = rng.random
+    today = timezone.localdate().toordinal()
+    earliest = today - 730
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    employees = []
+    leaves = []
+
+    for employee_id in range(start, stop):
+        name = f'{FIRST_NAMES[employee_id % len(FIRST_NAMES)]} {LAST_NAMES[employee_id // len(FIRST_NAMES) % len(LAST_NAMES)]} {employee_id}'
+        company_id = int(random_value() * companies) + 1
+        joining_date = today - int(random_value() * 3650)
+        employees.append((
+            employee_id, name, f'seed{employee_id}@{email_domain}', company_id, _dates[joining_date], True,
+            Employee.compute_content_hash(name, company_id), '', now, now,
+        ))
+
+        start_date = max(joining_date, earliest) + 1 + int(random_value() * 29)
+        for _ in range(leaves_per_employee):
+            end_date = start_date + 1 + int(random_value() * 5)
+            if start_date > today:
+                leave_status, approval_date = 'pending', None
+            else:
+                leave_status = LEAVE_STATUSES[int(random_value() * len(LEAVE_STATUSES))]
+                approval_date = None if leave_status == 'pending' else _decisions[min(start_date - 1, today)]
+            leaves.append((
+                employee_id, LEAVE_TYPES[int(random_value() * len(LEAVE_TYPES))], _dates[start_date],
+                _dates[end_date], leave_status, approval_date, now, now,
+            ))
+            start_date = end_date + 1 + int(random_value() * 59)
+
+    return employees, leaves
+
+
+@contextmanager
+def deferred_indexes(models):
+    """Drops the secondary indexes of `models` on SQLite and rebuilds them on exit.
+
+    Building an index once over the loaded table is several times cheaper than updating a dozen
+    of them row by row. Unique and primary key indexes stay, so constraints are still enforced.
+    If the process is killed before the rebuild, the indexes stay dropped; their DDL is logged
+    first so they can be recreated by hand. Other backends keep their indexes.
+    """
+    if connection.vendor != 'sqlite':
+        yield
+        return
+    tables = [model._meta.db_table for model in models]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT name, sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL "
+            f"AND tbl_name IN ({', '.join(['%s'] * len(tables))})",
+            tables
+        )
+        indexes = cursor.fetchall()
+        for name, sql in indexes:
+            logger.info("Dropping index %s for the seed load; recreate it with: %s;", name, sql)
+            cursor.execute(f'DROP INDEX {connection.ops.quote_name(name)}')
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            for _, sql in indexes:
+                cursor.execute(sql)
+
+
+class Command(BaseCommand):
+    help = 'Bulk-generate synthetic employees and non-overlapping leave requests for load testing'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--employees',
+            type=int,
+            required=True,
+            help='Number of employees to create'
+        )
+        parser.add_argument(
+            '--leaves-per-employee',
+            type=int,
+            default=5,
+            help='Leave requests created for every employee'
+        )
+        parser.add_argument(
+            '--companies',
+            type=int,
+            default=50,
+            help='Employees are spread over company ids 1..N'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Employees (with their leaves) generated and inserted per transaction'
+        )
+        parser.add_argument(
+            '--defer-indexes',
+            action='store_true',
+            help='Drop SQLite secondary indexes for the load and rebuild them at the end; a crash '
+                 'before the rebuild leaves them dropped (their DDL is logged)'
+        )
+        parser.add_argument(
+            '--email-domain',
+            default='seed.example.com',
+            help='Domain of the generated employee emails'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Random seed; the same seed and arguments generate the same data'
+        )
+
+    def handle(self, *args, **options):
+        total = options['employees']
+        batch_size = options['batch_size']
+        if total <= 0 or options['leaves_per_employee'] < 0 or options['companies'] <= 0:
+            raise CommandError('--employees and --companies must be positive and --leaves-per-employee not negative.')
+        if batch_size <= 0:
+            raise CommandError('--batch-size must be positive.')
+
+        # Ids (and the emails derived from them) continue after the highest existing id, so repeated
+        # runs never collide.
+        offset = (Employee.objects.aggregate(last=Max('id'))['last'] or 0) + 1
+        chunks = [
+            (start, min(start + batch_size, offset + total), options['leaves_per_employee'],
+             options['companies'], options['email_domain'], options['seed'])
+            for start in range(offset, offset + total, batch_size)
+        ]
+
+        self.stdout.write(
+            f"Seeding {total} employees with {options['leaves_per_employee']} leave requests each..."
+        )
+        started = time.perf_counter()
+        employees_created = leaves_created = 0
+
+        with ExitStack() as stack:
+            with connection.cursor() as cursor:
+                if connection.vendor == 'sqlite' and not connection.in_atomic_block:
+                    # Seeded data is disposable: skip fsync and keep index pages and sorts in memory.
+                    # SQLite refuses to change the safety level inside a transaction.
+                    cursor.execute('PRAGMA synchronous=OFF')
+                    cursor.execute('PRAGMA cache_size=-262144')
+                    cursor.execute('PRAGMA temp_store=MEMORY')
+                if options['defer_indexes']:
+                    stack.enter_context(deferred_indexes([Employee, LeaveRequest]))
+                for chunk in chunks:
+                    employees, leaves = generate_chunk(*chunk)
+                    with transaction.atomic():
+                        _insert(cursor, Employee, EMPLOYEE_FIELDS, employees)
+                        _insert(cursor, LeaveRequest, LEAVE_FIELDS, leaves)
+                    employees_created += len(employees)
+                    leaves_created += len(leaves)
+
+        # Explicit ids do not advance backends that use sequences (PostgreSQL); SQLite needs nothing.
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), [Employee]):
+                cursor.execute(sql)
+        # Raw inserts send no post_save signals, so cached summaries are dropped here.
+        CompanySummaryService.invalidate_all()
+
+        elapsed = time.perf_counter() - started
+        rows = employees_created + leaves_created
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Created {employees_created} employees and {leaves_created} leave requests '
+                f'in {elapsed:.2f}s ({rows / elapsed:,.0f} rows/s)'
+            )
+        )
+        logger.info(
+            "Seeded %d employees and %d leave requests in %.2fs", employees_created, leaves_created, elapsed
+        )
@@ -1,8 +1,9 @@
 from django.core.management.base import BaseCommand
 import asyncio
 import logging
-from employees.config import EXTERNAL_EMPLOYEE_API_URL
-from employees.services import EmployeeSyncService
+from employees.config import EXTERNAL_EMPLOYEE_API_URL, EMPLOYEE_SYNC_TRACE_MEMORY
+from employees.profiling import SyncReport
+from employees.services import EmployeeSyncService, PAGINATION_STYLES, RECONCILE_MODES
 from core.exceptions import NetworkError, InvalidURLError, TimeoutError, InvalidDataError
 
 logger = logging.getLogger('employees')
@@ -15,34 +16,144 @@ class Command(BaseCommand):
         parser.add_argument(
             '--api-url',
             type=str,
-            default=EXTERNAL_EMPLOYEE_API_URL,
-            help='External API URL to fetch employees from'
+            action='append',
+            dest='api_urls',
+            default=None,
+            help='External API URL to fetch employees from. Repeat to sync several sources; '
+                 'on conflicting emails the source listed first wins'
+        )
+        parser.add_argument(
+            '--pagination',
+            choices=PAGINATION_STYLES,
+            default=None,
+            help='Pagination style of the external API (defaults to EXTERNAL_EMPLOYEE_API_PAGINATION)'
+        )
+        parser.add_argument(
+            '--page-size',
+            type=int,
+            default=None,
+            help='Number of employees requested per page'
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=None,
+            help='Maximum number of pages fetched at the same time'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Employees written per upsert chunk (defaults to EMPLOYEE_SYNC_BATCH_SIZE)'
+        )
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Ignore the stored ETag/Last-Modified and fetch the whole feed'
+        )
+        parser.add_argument(
+            '--reconcile',
+            nargs='?',
+            const='report',
+            choices=RECONCILE_MODES,
+            default=None,
+            help='Detect active employees missing upstream and report (default) or deactivate them'
+        )
+        parser.add_argument(
+            '--no-trace-memory',
+            action='store_true',
+            help='Skip tracemalloc peak memory tracking in the sync report'
         )
 
     def handle(self, *args, **options):
-        api_url = options['api_url']
+        api_urls = list(dict.fromkeys(options['api_urls'] or [EXTERNAL_EMPLOYEE_API_URL]))
+        reconcile_mode = options['reconcile']
+        full_fetch = options['full'] or reconcile_mode
+        report = SyncReport(trace_memory=EMPLOYEE_SYNC_TRACE_MEMORY and not options['no_trace_memory'])
         
-        self.stdout.write(self.style.SUCCESS(f'Starting employee sync from: {api_url}'))
+        self.stdout.write(self.style.SUCCESS(f"Starting employee sync from: {', '.join(api_urls)}"))
         
         try:
-            employees_data = asyncio.run(EmployeeSyncService.fetch_employees(api_url))
-            new_count, updated_count = EmployeeSyncService.sync_employees(employees_data)
-            
-            self.stdout.write(
-                self.style.SUCCESS(
-                    f'\nSync completed successfully!\n'
-                    f'New employees: {new_count}\n'
-                    f'Updated employees: {updated_count}\n'
-                    f'Total processed: {len(employees_data) if employees_data else 0}'
-                )
-            )
-            
-            logger.info(f"Employee sync completed. New: {new_count}, Updated: {updated_count}")
+            with report:
+                self._sync(api_urls, options, reconcile_mode, full_fetch, report)
+            self._write_report(EmployeeSyncService.log_report(report, sources=api_urls))
         
         except (NetworkError, InvalidURLError, TimeoutError, InvalidDataError) as e:
             self.stdout.write(self.style.ERROR(f'Sync failed: {e.detail}'))
-            logger.error(f"Employee sync failed: {e.detail}", exc_info=True)
+            logger.error("Employee sync failed: %s", e.detail, exc_info=True)
         except Exception as e:
             self.stdout.write(self.style.ERROR(f'Sync failed: {str(e)}'))
-            logger.error(f"Employee sync failed: {str(e)}", exc_info=True)
+            logger.error("Employee sync failed: %s", e, exc_info=True)
+
+    def _sync(self, api_urls, options, reconcile_mode, full_fetch, report):
+        sync_states = {} if full_fetch else {
+            url: EmployeeSyncService.get_sync_state(url) for url in api_urls
+        }
+        with report.phase('fetch'):
+            results = asyncio.run(EmployeeSyncService.fetch_from_sources(
+                api_urls,
+                sync_states=sync_states,
+                pagination=options['pagination'],
+                page_size=options['page_size'],
+                concurrency=options['concurrency'],
+                report=report,
+            ))
+        
+        for result in results:
+            fetched = 'not modified' if result['employees'] is None else f"{len(result['employees'])} employees"
+            self.stdout.write(f"  {result['url']}: {fetched} in {result['seconds']:.2f}s")
+            report.add_rows('fetch', len(result['employees'] or []))
+        
+        if all(result['employees'] is None for result in results):
+            self.stdout.write(self.style.SUCCESS('External feeds not modified since the last sync.'))
+            for sync_state in sync_states.values():
+                EmployeeSyncService.save_sync_state(sync_state)
+            return
+        
+        employees_data, conflicts = EmployeeSyncService.merge_sources(results)
+        if conflicts:
+            self.stdout.write(
+                self.style.WARNING(f'{conflicts} conflicting employee(s) resolved by source order')
+            )
+        
+        new_count, updated_count = EmployeeSyncService.sync_employees(
+            employees_data,
+            batch_size=options['batch_size'],
+            report=report,
+            source=EmployeeSyncService.source_by_email(results)
+        )
+        for sync_state in sync_states.values():
+            EmployeeSyncService.save_sync_state(sync_state)
+        
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'\nSync completed successfully!\n'
+                f'New employees: {new_count}\n'
+                f'Updated employees: {updated_count}\n'
+                f'Total processed: {len(employees_data)}'
+            )
+        )
+        
+        logger.info("Employee sync completed. New: %d, Updated: %d", new_count, updated_count)
+        
+        if reconcile_mode:
+            reconciliation = EmployeeSyncService.reconcile_employees(
+                employees_data, mode=reconcile_mode, sources=api_urls
+            )
+            action = 'Deactivated' if reconcile_mode == 'deactivate' else 'Missing upstream'
+            self.stdout.write(
+                self.style.WARNING(f"{action}: {reconciliation['missing_employees']} employee(s)")
+            )
+            for email in reconciliation['missing_emails']:
+                self.stdout.write(f'  {email}')
+            if reconciliation['missing_employees'] > len(reconciliation['missing_emails']):
+                self.stdout.write(
+                    f"  ... and {reconciliation['missing_employees'] - len(reconciliation['missing_emails'])} more"
+                )
 
+    def _write_report(self, report_data):
+        self.stdout.write(f"\n{'phase':<8} {'seconds':>9} {'rows':>10} {'peak memory':>13}")
+        for name, entry in report_data['phases'].items():
+            peak = f"{entry['peak_memory_bytes'] / 1024 / 1024:.1f} MiB" if report_data['memory_traced'] else '-'
+            self.stdout.write(f"{name:<8} {entry['seconds']:>9.3f} {entry['rows']:>10} {peak:>13}")
+        self.stdout.write(f"{'total':<8} {report_data['total_seconds']:>9.3f}")
@@ -0,0 +1,57 @@
+# Generated by Django 5.2 on 2026-10-19 02:52
+
+import hashlib
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_content_hashes(apps, schema_editor):
+    Employee = apps.get_model('employees', 'Employee')
+    batch = []
+    for employee in Employee.objects.only('id', 'name', 'company_id').iterator(chunk_size=1000):
+        employee.content_hash = hashlib.sha256(
+            f"{employee.name}\x1f{employee.company_id}".encode('utf-8')
+        ).hexdigest()
+        batch.append(employee)
+        if len(batch) >= 1000:
+            Employee.objects.bulk_update(batch, ['content_hash'])
+            batch = []
+    if batch:
+        Employee.objects.bulk_update(batch, ['content_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmployeeSyncState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_url', models.URLField(max_length=500, unique=True)),
+                ('etag', models.CharField(blank=True, default='', max_length=255)),
+                ('last_modified', models.CharField(blank=True, default='', max_length=64)),
+                ('last_synced_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'employee_sync_states',
+            },
+        ),
+        migrations.AddField(
+            model_name='employee',
+            name='content_hash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(fields=['email', 'content_hash'], name='employees_email_00424c_idx'),
+        ),
+        migrations.RunPython(backfill_content_hashes, migrations.RunPython.noop),
+    ]
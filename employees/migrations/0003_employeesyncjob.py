@@ -0,0 +1,40 @@
+# Generated by Django 5.2 on 2026-10-19 02:54
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0002_employee_content_hash'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmployeeSyncJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('api_url', models.URLField(max_length=500)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], db_index=True, default='pending', max_length=20)),
+                ('total_records', models.IntegerField(blank=True, null=True)),
+                ('new_employees', models.IntegerField(default=0)),
+                ('updated_employees', models.IntegerField(default=0)),
+                ('total_processed', models.IntegerField(default=0)),
+                ('not_modified', models.BooleanField(default=False)),
+                ('error_code', models.CharField(blank=True, default='', max_length=50)),
+                ('error_message', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='employee_sync_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'employee_sync_jobs',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
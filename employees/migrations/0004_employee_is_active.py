@@ -0,0 +1,33 @@
+# Generated by Django 5.2 on 2026-10-19 03:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0003_employeesyncjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='employee',
+            name='is_active',
+            field=models.BooleanField(db_index=True, default=True),
+        ),
+        migrations.AddField(
+            model_name='employeesyncjob',
+            name='missing_emails',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='employeesyncjob',
+            name='missing_employees',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='employeesyncjob',
+            name='reconcile_mode',
+            field=models.CharField(blank=True, choices=[('report', 'Report'), ('deactivate', 'Deactivate')], default='', max_length=20),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-19 03:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0004_employee_is_active'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='employeesyncjob',
+            name='report',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-19 04:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0005_employeesyncjob_report'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='employee',
+            name='sync_source',
+            field=models.CharField(blank=True, default='', editable=False, max_length=500),
+        ),
+    ]
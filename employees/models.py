@@ -1,6 +1,8 @@
 from django.db import models
 from django.core.validators import EmailValidator
 from datetime import date
+import hashlib
+import uuid
 from accounts.models import User
 
 
@@ -20,6 +22,10 @@ class Employee(models.Model):
     )
     company_id = models.IntegerField(db_index=True)
     joining_date = models.DateField(null=True, blank=True)
+    is_active = models.BooleanField(default=True, db_index=True)
+    # Feed URL that last wrote this employee; empty for employees created through the API or CSV import.
+    sync_source = models.CharField(max_length=500, blank=True, default='', editable=False)
+    content_hash = models.CharField(max_length=64, blank=True, default='', editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -29,17 +35,94 @@ class Employee(models.Model):
             models.Index(fields=['email']),
             models.Index(fields=['company_id']),
             models.Index(fields=['name']),
+            models.Index(fields=['email', 'content_hash']),
         ]
         ordering = ['-created_at']
 
     def __str__(self):
         return f"{self.name} ({self.email})"
 
+    @staticmethod
+    def compute_content_hash(name, company_id):
+        return hashlib.sha256(f"{name}\x1f{company_id}".encode('utf-8')).hexdigest()
+
     def clean(self):
         from django.core.exceptions import ValidationError
         if self.joining_date and self.joining_date > date.today():
             raise ValidationError({'joining_date': 'Joining date cannot be in the future.'})
 
     def save(self, *args, **kwargs):
+        self.content_hash = self.compute_content_hash(self.name, self.company_id)
         self.full_clean()
         super().save(*args, **kwargs)
+
+
+class EmployeeSyncState(models.Model):
+    source_url = models.URLField(max_length=500, unique=True)
+    etag = models.CharField(max_length=255, blank=True, default='')
+    last_modified = models.CharField(max_length=64, blank=True, default='')
+    last_synced_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'employee_sync_states'
+
+    def __str__(self):
+        return self.source_url
+
+
+class EmployeeSyncJob(models.Model):
+    RECONCILE_MODE_CHOICES = [
+        ('report', 'Report'),
+        ('deactivate', 'Deactivate'),
+    ]
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    api_url = models.URLField(max_length=500)
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='pending',
+        db_index=True
+    )
+    requested_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        related_name='employee_sync_jobs',
+        null=True,
+        blank=True
+    )
+    total_records = models.IntegerField(null=True, blank=True)
+    new_employees = models.IntegerField(default=0)
+    updated_employees = models.IntegerField(default=0)
+    total_processed = models.IntegerField(default=0)
+    not_modified = models.BooleanField(default=False)
+    reconcile_mode = models.CharField(
+        max_length=20,
+        choices=RECONCILE_MODE_CHOICES,
+        blank=True,
+        default=''
+    )
+    missing_employees = models.IntegerField(null=True, blank=True)
+    missing_emails = models.JSONField(default=list, blank=True)
+    report = models.JSONField(null=True, blank=True)
+    error_code = models.CharField(max_length=50, blank=True, default='')
+    error_message = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'employee_sync_jobs'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Sync job {self.id} ({self.status})"
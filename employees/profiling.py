@@ -0,0 +1,106 @@
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+SYNC_PHASES = ('fetch', 'decode', 'diff', 'write')
+
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_owns_tracing = False
+# tracemalloc and reset_peak() are process-wide, so traced reports run one at a time; otherwise
+# concurrent syncs would reset each other's peaks.
+_traced_report_lock = threading.Lock()
+
+
+def _start_tracing():
+    global _tracing_users, _owns_tracing
+    with _tracing_lock:
+        if _tracing_users == 0:
+            # Tracing may already be owned by someone else (e.g. python -X tracemalloc).
+            _owns_tracing = not tracemalloc.is_tracing()
+            if _owns_tracing:
+                tracemalloc.start()
+        _tracing_users += 1
+
+
+def _stop_tracing():
+    global _tracing_users
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0 and _owns_tracing:
+            tracemalloc.stop()
+
+
+def phase(report, name):
+    return report.phase(name) if report is not None else nullcontext()
+
+
+class SyncReport:
+    """Wall time, row counts and, with `trace_memory`, peak traced memory per sync phase.
+
+    Peaks are process-wide: they include allocations made by other threads during the phase, such
+    as request handling in a web worker. Traced reports are serialized, so a second traced sync in
+    the same process waits for the first to finish.
+    """
+
+    def __init__(self, trace_memory=True):
+        self.trace_memory = trace_memory
+        self.phases = {name: {'seconds': 0.0, 'rows': 0, 'peak_memory_bytes': 0} for name in SYNC_PHASES}
+        self.total_seconds = 0.0
+        self._active = []
+        self._started = None
+
+    def __enter__(self):
+        if self.trace_memory:
+            _traced_report_lock.acquire()
+            _start_tracing()
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.total_seconds += time.perf_counter() - self._started
+        if self.trace_memory:
+            _stop_tracing()
+            _traced_report_lock.release()
+
+    def _fold_peak(self):
+        # reset_peak() is global, so active outer phases record the peak reached so far first.
+        peak = tracemalloc.get_traced_memory()[1]
+        for entry, baseline in self._active:
+            entry['peak_memory_bytes'] = max(entry['peak_memory_bytes'], peak - baseline)
+
+    @contextmanager
+    def phase(self, name):
+        entry = self.phases.setdefault(name, {'seconds': 0.0, 'rows': 0, 'peak_memory_bytes': 0})
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        if tracing:
+            self._fold_peak()
+            active = (entry, tracemalloc.get_traced_memory()[0])
+            tracemalloc.reset_peak()
+            self._active.append(active)
+        started = time.perf_counter()
+        try:
+            yield entry
+        finally:
+            entry['seconds'] += time.perf_counter() - started
+            if tracing:
+                self._fold_peak()
+                self._active.remove(active)
+
+    def add_rows(self, name, rows):
+        self.phases[name]['rows'] += rows
+
+    def as_dict(self):
+        return {
+            'total_seconds': round(self.total_seconds, 4),
+            'memory_traced': self.trace_memory,
+            'phases': {
+                name: {
+                    'seconds': round(entry['seconds'], 4),
+                    'rows': entry['rows'],
+                    'peak_memory_bytes': entry['peak_memory_bytes'],
+                }
+                for name, entry in self.phases.items()
+            },
+        }
@@ -1,13 +1,15 @@
 from rest_framework import serializers
-from .models import Employee
+from .models import Employee, EmployeeSyncJob
 from accounts.models import User
 
 
 class EmployeeSerializer(serializers.ModelSerializer):
     class Meta:
         model = Employee
-        fields = ['id', 'name', 'email', 'company_id', 'joining_date', 'created_at', 'updated_at']
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        fields = ['id', 'name', 'email', 'company_id', 'joining_date', 'is_active', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'is_active', 'created_at', 'updated_at']
+        # validate_email() already checks uniqueness; the generated UniqueValidator would repeat the query.
+        extra_kwargs = {'email': {'validators': []}}
 
     def validate_email(self, value):
         if Employee.objects.filter(email=value).exclude(pk=self.instance.pk if self.instance else None).exists():
@@ -25,6 +27,7 @@ class EmployeeCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Employee
         fields = ['name', 'email', 'company_id', 'joining_date']
+        extra_kwargs = {'email': {'validators': []}}
     
     def validate_name(self, value):
         if not value or not value.strip():
@@ -58,6 +61,7 @@ class EmployeeUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Employee
         fields = ['name', 'email', 'company_id', 'joining_date']
+        extra_kwargs = {'email': {'validators': []}}
     
     def validate_name(self, value):
         if value is not None:
@@ -86,3 +90,43 @@ class EmployeeUpdateSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Joining date cannot be in the future.")
         return value
 
+
+class EmployeeSyncJobSerializer(serializers.ModelSerializer):
+    job_id = serializers.UUIDField(source='id', read_only=True)
+
+    class Meta:
+        model = EmployeeSyncJob
+        fields = [
+            'job_id', 'status', 'api_url', 'total_records',
+            'new_employees', 'updated_employees', 'total_processed',
+            'not_modified', 'reconcile_mode', 'missing_employees', 'missing_emails',
+            'report', 'error_code', 'error_message',
+            'created_at', 'started_at', 'finished_at'
+        ]
+        read_only_fields = fields
+
+
+class EmployeeImportRowSerializer(serializers.Serializer):
+    name = serializers.CharField(max_length=255)
+    email = serializers.EmailField()
+    company_id = serializers.IntegerField()
+    joining_date = serializers.DateField(required=False, allow_null=True)
+
+    def validate_name(self, value):
+        if len(value.strip()) < 2:
+            raise serializers.ValidationError("Name must be at least 2 characters long.")
+        return value.strip()
+
+    def validate_email(self, value):
+        return value.lower().strip()
+
+    def validate_company_id(self, value):
+        if value <= 0:
+            raise serializers.ValidationError("Company ID must be a positive number.")
+        return value
+
+    def validate_joining_date(self, value):
+        from datetime import date
+        if value and value > date.today():
+            raise serializers.ValidationError("Joining date cannot be in the future.")
+        return value
@@ -1,14 +1,231 @@
+import csv
+import io
+import json
 import logging
+import math
+import time
 import aiohttp
 import asyncio
+from datetime import date
 from urllib.parse import urlparse
-from django.db import transaction
-from .models import Employee
-from .config import EXTERNAL_EMPLOYEE_API_URL
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Q, Sum, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Greatest, Least
+from django.utils import timezone
+from .models import Employee, EmployeeSyncState
+from .serializers import EmployeeImportRowSerializer
+from .profiling import phase
+from .config import (
+    EXTERNAL_EMPLOYEE_API_URL,
+    EXTERNAL_EMPLOYEE_API_PAGINATION,
+    EXTERNAL_EMPLOYEE_API_PAGE_SIZE,
+    EXTERNAL_EMPLOYEE_API_CONCURRENCY,
+    EXTERNAL_EMPLOYEE_API_MAX_RETRIES,
+    EXTERNAL_EMPLOYEE_API_RETRY_BACKOFF,
+    EXTERNAL_EMPLOYEE_API_TIMEOUT,
+    EMPLOYEE_SYNC_BATCH_SIZE,
+    EMPLOYEE_IMPORT_CHUNK_SIZE,
+    COMPANY_SUMMARY_CACHE_TIMEOUT,
+)
 from core.exceptions import NetworkError, InvalidURLError, TimeoutError, InvalidDataError
 
 logger = logging.getLogger('employees')
 
+PAGINATION_STYLES = ('none', 'page', 'offset', 'cursor')
+PAGE_RESULT_KEYS = ('results', 'data', 'items', 'employees')
+PAGE_TOTAL_KEYS = ('count', 'total')
+UPSERT_UPDATE_FIELDS = ['name', 'company_id', 'content_hash', 'is_active', 'sync_source', 'updated_at']
+RECONCILE_MODES = ('report', 'deactivate')
+RECONCILE_STAGING_TABLE = 'employee_sync_upstream_emails'
+RECONCILE_REPORT_LIMIT = 100
+IMPORT_REQUIRED_COLUMNS = ('name', 'email', 'company_id')
+COMPANY_SUMMARY_VERSION_KEY = 'company-summary:version'
+
+
+def _extract_page(payload):
+    if isinstance(payload, list):
+        return payload, {}
+    if isinstance(payload, dict):
+        for key in PAGE_RESULT_KEYS:
+            if isinstance(payload.get(key), list):
+                return payload[key], payload
+    raise InvalidDataError("Unexpected paginated response format from external API.")
+
+
+def _extract_total(payload):
+    for key in PAGE_TOTAL_KEYS:
+        value = payload.get(key)
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value
+    return None
+
+
+class _FeedNotModified(Exception):
+    pass
+
+
+async def _gather_ordered(coros):
+    tasks = [asyncio.ensure_future(coro) for coro in coros]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+class EmployeePageFetcher:
+    def __init__(self, session, url, page_size, concurrency, max_retries, retry_backoff, sync_state=None, report=None):
+        self.session = session
+        self.url = url
+        self.page_size = page_size
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.sync_state = sync_state
+        self.report = report
+        self.validators = {}
+        self.semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch_all(self, pagination):
+        try:
+            if pagination == 'none':
+                return await self._fetch_conditional()
+            if pagination == 'cursor':
+                return await self._fetch_cursor_pages()
+            return await self._fetch_numbered_pages(pagination)
+        except _FeedNotModified:
+            return None
+
+    async def _fetch_conditional(self):
+        # Only unpaginated feeds are fetched conditionally: the validators of one page say nothing
+        # about the others, so paginated feeds are always fetched in full and diffed by content hash.
+        headers = {}
+        if self.sync_state is not None:
+            if self.sync_state.etag:
+                headers['If-None-Match'] = self.sync_state.etag
+            if self.sync_state.last_modified:
+                headers['If-Modified-Since'] = self.sync_state.last_modified
+        return await self.fetch_page(headers=headers, capture_validators=True)
+
+    async def fetch_page(self, params=None, url=None, missing_ok=False, headers=None, capture_validators=False):
+        url = url or self.url
+        last_error = None
+        
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                delay = self.retry_backoff * 2 ** (attempt - 1)
+                logger.warning(
+                    "Retrying %s %s in %.2fs (attempt %d): %s", url, params or '', delay, attempt + 1, last_error.detail
+                )
+                await asyncio.sleep(delay)
+            
+            try:
+                async with self.semaphore:
+                    async with self.session.get(url, params=params, headers=headers) as response:
+                        if response.status == 200:
+                            if capture_validators:
+                                self.validators = {
+                                    'etag': response.headers.get('ETag', ''),
+                                    'last_modified': response.headers.get('Last-Modified', ''),
+                                }
+                            body = await response.read()
+                            try:
+                                with phase(self.report, 'decode'):
+                                    return json.loads(body)
+                            except Exception as e:
+                                logger.error("Failed to parse JSON response: %s", e)
+                                raise InvalidDataError("Invalid response format from external API.")
+                        elif response.status == 304 and headers:
+                            raise _FeedNotModified()
+                        elif response.status == 404:
+                            if missing_ok:
+                                return []
+                            raise InvalidURLError("The requested resource was not found. Please check the URL.")
+                        elif response.status >= 500 or response.status == 429:
+                            last_error = NetworkError("External service is currently unavailable. Please try again later.")
+                        else:
+                            raise NetworkError(f"External API returned an error (status {response.status}).")
+            except asyncio.TimeoutError:
+                last_error = TimeoutError("Request timed out. Please try again later.")
+            except aiohttp.ClientError as e:
+                logger.error("Network error: %s", e)
+                last_error = NetworkError("Unable to connect to external service. Please check your internet connection and try again.")
+        
+        raise last_error
+
+    def _page_params(self, pagination, index, step):
+        if pagination == 'page':
+            return {'page': index + 1, 'page_size': self.page_size}
+        return {'offset': index * step, 'limit': self.page_size}
+
+    async def _fetch_page_items(self, pagination, index, step, missing_ok=False):
+        payload = await self.fetch_page(self._page_params(pagination, index, step), missing_ok=missing_ok)
+        items, _ = _extract_page(payload)
+        return items
+
+    async def _fetch_numbered_pages(self, pagination):
+        first_params = self._page_params(pagination, 0, self.page_size)
+        first_items, first_payload = _extract_page(await self.fetch_page(first_params))
+        pages = [first_items]
+        total = _extract_total(first_payload)
+        # APIs may cap the page size (e.g. DRF's max_page_size), so the first page tells how many
+        # rows a page really holds; later pages and offsets are computed from that.
+        step = len(first_items)
+        
+        if not step:
+            return []
+        if total is not None:
+            page_count = math.ceil(total / step)
+            pages.extend(await _gather_ordered(
+                self._fetch_page_items(pagination, index, step) for index in range(1, page_count)
+            ))
+        else:
+            # Without a total we fetch windows of `concurrency` pages until one comes back empty;
+            # a short page only means the API capped it.
+            index = 1
+            while pages[-1]:
+                window = await _gather_ordered(
+                    self._fetch_page_items(pagination, i, step, missing_ok=True)
+                    for i in range(index, index + self.concurrency)
+                )
+                index += self.concurrency
+                for items in window:
+                    pages.append(items)
+                    if not items:
+                        break
+        
+        return [item for page in pages for item in page]
+
+    async def _fetch_cursor_pages(self):
+        # Each cursor is only known once the previous page arrives, so these pages are sequential.
+        employees = []
+        params = {'limit': self.page_size}
+        url = None
+        seen_cursors = set()
+        
+        while True:
+            payload = await self.fetch_page(params, url=url)
+            items, payload = _extract_page(payload)
+            employees.extend(items)
+            
+            cursor = payload.get('next_cursor')
+            next_url = payload.get('next')
+            if cursor and cursor not in seen_cursors:
+                seen_cursors.add(cursor)
+                params = {'cursor': cursor, 'limit': self.page_size}
+                url = None
+            elif next_url and next_url not in seen_cursors:
+                seen_cursors.add(next_url)
+                params = None
+                url = next_url
+            else:
+                return employees
+
+
 
 class EmployeeSyncService:
     @staticmethod
@@ -25,91 +242,482 @@ class EmployeeSyncService:
             raise InvalidURLError("Invalid URL provided.")
     
     @staticmethod
-    async def fetch_employees(url):
+    def get_sync_state(url):
         EmployeeSyncService._validate_url(url)
+        sync_state, _ = EmployeeSyncState.objects.get_or_create(source_url=url)
+        return sync_state
+
+    @staticmethod
+    def save_sync_state(sync_state):
+        sync_state.last_synced_at = timezone.now()
+        sync_state.save()
+
+    @staticmethod
+    def create_session(limit):
+        return aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=limit),
+            timeout=aiohttp.ClientTimeout(total=EXTERNAL_EMPLOYEE_API_TIMEOUT)
+        )
+
+    @staticmethod
+    async def fetch_employees(url, pagination=None, page_size=None, concurrency=None,
+                              max_retries=None, retry_backoff=None, sync_state=None, session=None, report=None):
+        EmployeeSyncService._validate_url(url)
+        
+        pagination = pagination or EXTERNAL_EMPLOYEE_API_PAGINATION
+        if pagination not in PAGINATION_STYLES:
+            raise InvalidDataError(
+                f"Unsupported pagination style '{pagination}'. Use one of: {', '.join(PAGINATION_STYLES)}."
+            )
+        
+        page_size = page_size or EXTERNAL_EMPLOYEE_API_PAGE_SIZE
+        concurrency = concurrency or EXTERNAL_EMPLOYEE_API_CONCURRENCY
+        if page_size <= 0 or concurrency <= 0:
+            raise InvalidDataError("Page size and concurrency must be positive numbers.")
         
         try:
-            async with aiohttp.ClientSession() as session:
-                try:
-                    async with session.get(url, timeout=aiohttp.ClientTimeout(total=30)) as response:
-                        if response.status == 200:
-                            try:
-                                return await response.json()
-                            except Exception as e:
-                                logger.error(f"Failed to parse JSON response: {str(e)}")
-                                raise InvalidDataError("Invalid response format from external API.")
-                        elif response.status == 404:
-                            raise InvalidURLError("The requested resource was not found. Please check the URL.")
-                        elif response.status >= 500:
-                            raise NetworkError("External service is currently unavailable. Please try again later.")
-                        else:
-                            raise NetworkError(f"External API returned an error (status {response.status}).")
-                except asyncio.TimeoutError:
-                    raise TimeoutError("Request timed out. Please try again later.")
-                except aiohttp.ClientError as e:
-                    logger.error(f"Network error: {str(e)}")
-                    raise NetworkError("Unable to connect to external service. Please check your internet connection and try again.")
+            if session is None:
+                async with EmployeeSyncService.create_session(concurrency) as session:
+                    return await EmployeeSyncService.fetch_employees(
+                        url, pagination, page_size, concurrency, max_retries, retry_backoff, sync_state, session, report
+                    )
+            
+            fetcher = EmployeePageFetcher(
+                session,
+                url,
+                page_size=page_size,
+                concurrency=concurrency,
+                max_retries=EXTERNAL_EMPLOYEE_API_MAX_RETRIES if max_retries is None else max_retries,
+                retry_backoff=EXTERNAL_EMPLOYEE_API_RETRY_BACKOFF if retry_backoff is None else retry_backoff,
+                sync_state=sync_state,
+                report=report,
+            )
+            employees_data = await fetcher.fetch_all(pagination)
         except (NetworkError, InvalidURLError, TimeoutError, InvalidDataError):
             raise
         except Exception as e:
-            logger.error(f"Unexpected error in fetch_employees: {str(e)}", exc_info=True)
+            logger.error("Unexpected error in fetch_employees: %s", e, exc_info=True)
             raise NetworkError("An unexpected error occurred while fetching data. Please try again later.")
+        
+        if employees_data is None:
+            logger.info("External employee feed not modified: %s", url)
+        else:
+            if report is not None:
+                report.add_rows('decode', len(employees_data))
+            if sync_state is not None:
+                sync_state.etag = fetcher.validators.get('etag', '')
+                sync_state.last_modified = fetcher.validators.get('last_modified', '')
+        
+        return employees_data
+
+    @staticmethod
+    async def fetch_from_sources(urls, sync_states=None, concurrency=None, report=None, **fetch_options):
+        for url in urls:
+            EmployeeSyncService._validate_url(url)
+        
+        sync_states = sync_states or {}
+        concurrency = concurrency or EXTERNAL_EMPLOYEE_API_CONCURRENCY
+        
+        async with EmployeeSyncService.create_session(concurrency * len(urls)) as session:
+            async def fetch_source(url, sync_state):
+                started = time.perf_counter()
+                employees_data = await EmployeeSyncService.fetch_employees(
+                    url, sync_state=sync_state, concurrency=concurrency, session=session, report=report,
+                    **fetch_options
+                )
+                return {'url': url, 'employees': employees_data, 'seconds': time.perf_counter() - started}
+            
+            results = await _gather_ordered(fetch_source(url, sync_states.get(url)) for url in urls)
+            
+            # Conflicts are resolved by source order, so a partially unchanged set of sources
+            # is fetched again in full rather than merged without its higher-priority rows.
+            unchanged = [result for result in results if result['employees'] is None]
+            if unchanged and len(unchanged) < len(results):
+                refetched = await _gather_ordered(fetch_source(result['url'], None) for result in unchanged)
+                for result, fresh in zip(unchanged, refetched):
+                    result['employees'] = fresh['employees']
+                    result['seconds'] += fresh['seconds']
+        
+        return results
 
     @staticmethod
-    def sync_employees(employees_data):
+    def merge_sources(results):
+        merged = {}
+        conflicts = 0
+        
+        # Earlier sources win; within a source the last row for an email wins.
+        for result in results:
+            source_rows = {}
+            for emp_data in result['employees'] or []:
+                email = emp_data.get('email')
+                if email:
+                    source_rows[email] = emp_data
+            
+            for email, emp_data in source_rows.items():
+                if email in merged:
+                    conflicts += 1
+                    continue
+                merged[email] = emp_data
+        
+        return list(merged.values()), conflicts
+
+    @staticmethod
+    def source_by_email(results):
+        """Maps each email to the source whose row merge_sources() kept."""
+        sources = {}
+        for result in results:
+            for emp_data in result['employees'] or []:
+                email = emp_data.get('email')
+                if email:
+                    sources.setdefault(email, result['url'])
+        return sources
+
+    @staticmethod
+    def sync_employees(employees_data, progress_callback=None, batch_size=None, report=None, source=''):
+        """Upserts the feed in chunks. `source` is the feed URL, or a dict of email to URL for merged feeds."""
         if not employees_data:
             return 0, 0
         
-        emails = [emp.get('email') for emp in employees_data if emp.get('email')]
-        if not emails:
-            return 0, 0
+        batch_size = batch_size or EMPLOYEE_SYNC_BATCH_SIZE
+        new_count = 0
+        updated_count = 0
+        processed = 0
+        chunks = 0
         
-        existing_employees = {
-            emp.email: emp for emp in Employee.objects.filter(email__in=emails)
-        }
+        for start in range(0, len(employees_data), batch_size):
+            chunk = employees_data[start:start + batch_size]
+            chunk_new, chunk_updated = EmployeeSyncService._upsert_chunk(chunk, report, source)
+            new_count += chunk_new
+            updated_count += chunk_updated
+            processed += len(chunk)
+            chunks += 1
+            
+            if progress_callback is not None:
+                progress_callback(new_count, updated_count, processed)
+        
+        if new_count or updated_count:
+            CompanySummaryService.invalidate_all()
+        
+        logger.info(
+            "Employee sync wrote %d chunk(s) of up to %d: %d new, %d updated, %d unchanged or skipped",
+            chunks, batch_size, new_count, updated_count, processed - new_count - updated_count
+        )
         
-        employees_to_create = []
-        employees_to_update = []
+        return new_count, updated_count
+
+    @staticmethod
+    def _upsert_chunk(employees_data, report=None, source=''):
+        with phase(report, 'diff'):
+            changed, new_count, updated_count, emails_by_source = EmployeeSyncService._diff_chunk(
+                employees_data, source
+            )
+        if report is not None:
+            report.add_rows('diff', len(employees_data))
+        if not emails_by_source:
+            return 0, 0
         
+        with phase(report, 'write'), transaction.atomic():
+            if changed:
+                Employee.objects.bulk_create(
+                    changed,
+                    update_conflicts=True,
+                    unique_fields=['email'],
+                    update_fields=UPSERT_UPDATE_FIELDS
+                )
+            claimed = EmployeeSyncService._claim_chunk(emails_by_source)
+        updated_count += claimed
+        if report is not None:
+            report.add_rows('write', len(changed) + claimed)
+        logger.debug("Employee sync chunk upserted: %d new, %d updated", new_count, updated_count)
+        
+        return new_count, updated_count
+
+    @staticmethod
+    def _claim_chunk(emails_by_source):
+        """Reactivates, and moves to the feed, listed employees the hash diff saw as unchanged.
+
+        Deactivated employees that reappear upstream and employees owned by another source (or none,
+        like those created before sync sources were recorded) are updated in place; one UPDATE per
+        source, which matches no rows once the feed owns all its employees.
+        """
+        claimed = 0
+        now = timezone.now()
+        for row_source, emails in emails_by_source.items():
+            claimed += Employee.objects.filter(email__in=emails).exclude(
+                is_active=True, sync_source=row_source
+            ).update(is_active=True, sync_source=row_source, updated_at=now)
+        return claimed
+
+    @staticmethod
+    def _diff_chunk(employees_data, source=''):
+        rows = {}
+        emails_by_source = {}
         for emp_data in employees_data:
             email = emp_data.get('email')
             if not email:
                 continue
-            
-            employee_data = {
-                'name': emp_data.get('name', ''),
-                'company_id': emp_data.get('id', 0),
-                'joining_date': None
-            }
-            
-            if email in existing_employees:
-                employee = existing_employees[email]
-                needs_update = (
-                    employee.name != employee_data['name'] or
-                    employee.company_id != employee_data['company_id']
-                )
-                if needs_update:
-                    employee.name = employee_data['name']
-                    employee.company_id = employee_data['company_id']
-                    employees_to_update.append(employee)
-            else:
-                employees_to_create.append(Employee(email=email, **employee_data))
+            name = emp_data.get('name', '')
+            company_id = emp_data.get('id', 0)
+            row_source = source.get(email, '') if isinstance(source, dict) else source
+            rows[email] = (name, company_id, Employee.compute_content_hash(name, company_id), row_source)
+            emails_by_source.setdefault(row_source, []).append(email)
+        
+        if not rows:
+            return [], 0, 0, {}
+        
+        # Only (email, content_hash) pairs are read, served by the (email, content_hash) index.
+        # Activity and ownership are left to _claim_chunk.
+        existing_hashes = dict(
+            Employee.objects.filter(email__in=list(rows)).order_by().values_list('email', 'content_hash')
+        )
         
+        changed = []
         new_count = 0
         updated_count = 0
         
+        for email, (name, company_id, content_hash, row_source) in rows.items():
+            if email not in existing_hashes:
+                new_count += 1
+            elif existing_hashes[email] != content_hash:
+                updated_count += 1
+            else:
+                continue
+            changed.append(Employee(
+                email=email, name=name, company_id=company_id, content_hash=content_hash, sync_source=row_source
+            ))
+        
+        return changed, new_count, updated_count, emails_by_source
+
+    @staticmethod
+    def log_report(report, **context):
+        data = dict(context, **report.as_dict())
+        logger.info("Employee sync report: %s", json.dumps(data, sort_keys=True), extra={'sync_report': data})
+        return data
+
+    @staticmethod
+    def reconcile_employees(employees_data, mode='report', sources=None):
+        """Finds active employees owned by `sources` (feed URLs) that are missing from the feed.
+
+        Only employees a listed source last wrote are considered, so employees created through the
+        API or CSV import, and those of other feeds, are never reported or deactivated.
+        """
+        if mode not in RECONCILE_MODES:
+            raise InvalidDataError(
+                f"Unsupported reconcile mode '{mode}'. Use one of: {', '.join(RECONCILE_MODES)}."
+            )
+        
+        emails = {emp.get('email') for emp in employees_data or [] if emp.get('email')}
+        if not emails:
+            raise InvalidDataError("Refusing to reconcile against an empty employee feed.")
+        sources = [source for source in sources or [] if source]
+        if not sources:
+            raise InvalidDataError("Refusing to reconcile without the feed source(s) that own the employees.")
+        
+        table = connection.ops.quote_name(RECONCILE_STAGING_TABLE)
+        temporary = 'TEMP' if connection.vendor == 'sqlite' else 'TEMPORARY'
+        
         with transaction.atomic():
-            if employees_to_create:
-                Employee.objects.bulk_create(employees_to_create)
-                new_count = len(employees_to_create)
-                for emp in employees_to_create:
-                    logger.info(f"New employee synced: {emp.email}")
+            with connection.cursor() as cursor:
+                cursor.execute(f"DROP TABLE IF EXISTS {table}")
+                cursor.execute(f"CREATE {temporary} TABLE {table} (email VARCHAR(254) PRIMARY KEY)")
+                try:
+                    cursor.executemany(
+                        f"INSERT INTO {table} (email) VALUES (%s)",
+                        [(email,) for email in emails]
+                    )
+                    
+                    missing = Employee.objects.filter(is_active=True, sync_source__in=sources).exclude(
+                        email__in=RawSQL(f"SELECT email FROM {table}", [])
+                    )
+                    missing_emails = list(missing.values_list('email', flat=True)[:RECONCILE_REPORT_LIMIT])
+                    
+                    if mode == 'deactivate':
+                        missing_count = missing.update(is_active=False, updated_at=timezone.now())
+                        if missing_count:
+                            CompanySummaryService.invalidate_all()
+                    elif len(missing_emails) < RECONCILE_REPORT_LIMIT:
+                        missing_count = len(missing_emails)
+                    else:
+                        missing_count = missing.count()
+                finally:
+                    cursor.execute(f"DROP TABLE IF EXISTS {table}")
+        
+        logger.info("Employee reconciliation (%s): %d active employee(s) missing upstream", mode, missing_count)
+        
+        return {
+            'mode': mode,
+            'missing_employees': missing_count,
+            'missing_emails': missing_emails,
+        }
+
+
+class EmployeeImportService:
+    @staticmethod
+    def import_csv(file_obj, chunk_size=None):
+        chunk_size = chunk_size or EMPLOYEE_IMPORT_CHUNK_SIZE
+        reader = csv.DictReader(io.TextIOWrapper(file_obj, encoding='utf-8-sig', newline=''))
+        
+        try:
+            columns = [column.strip() for column in reader.fieldnames or []]
+        except UnicodeDecodeError:
+            raise InvalidDataError("CSV file must be UTF-8 encoded.")
+        missing_columns = [column for column in IMPORT_REQUIRED_COLUMNS if column not in columns]
+        if missing_columns:
+            raise InvalidDataError(f"CSV file is missing required column(s): {', '.join(missing_columns)}.")
+        reader.fieldnames = columns
+        
+        report = {'total_rows': 0, 'created': 0, 'failed': 0, 'errors': []}
+        seen_emails = set()
+        chunk = []
+        
+        try:
+            for row_number, row in enumerate(reader, start=2):
+                chunk.append((row_number, row))
+                if len(chunk) >= chunk_size:
+                    EmployeeImportService._import_chunk(chunk, seen_emails, report)
+                    chunk = []
+            if chunk:
+                EmployeeImportService._import_chunk(chunk, seen_emails, report)
+        except UnicodeDecodeError:
+            raise InvalidDataError("CSV file must be UTF-8 encoded.")
+        except csv.Error as e:
+            raise InvalidDataError(f"Malformed CSV file: {str(e)}")
+        
+        report['errors'].sort(key=lambda error: error['row'])
+        report['failed'] = len(report['errors'])
+        if report['created']:
+            CompanySummaryService.invalidate_all()
+        logger.info(
+            "Employee CSV import finished: %d created, %d failed of %d rows",
+            report['created'], report['failed'], report['total_rows']
+        )
+        return report
+
+    @staticmethod
+    def _import_chunk(chunk, seen_emails, report):
+        valid_rows = []
+        
+        for row_number, row in chunk:
+            report['total_rows'] += 1
+            data = {
+                key: value.strip()
+                for key, value in row.items()
+                if key in EmployeeImportRowSerializer._declared_fields and value and value.strip()
+            }
+            serializer = EmployeeImportRowSerializer(data=data)
+            if not serializer.is_valid():
+                report['errors'].append({'row': row_number, 'errors': serializer.errors})
+                continue
             
-            if employees_to_update:
-                Employee.objects.bulk_update(employees_to_update, ['name', 'company_id'])
-                updated_count = len(employees_to_update)
-                for emp in employees_to_update:
-                    logger.info(f"Employee updated: {emp.email}")
+            email = serializer.validated_data['email']
+            if email in seen_emails:
+                report['errors'].append({
+                    'row': row_number,
+                    'errors': {'email': ['Duplicate email in the uploaded file.']}
+                })
+                continue
+            seen_emails.add(email)
+            valid_rows.append((row_number, serializer.validated_data))
         
-        return new_count, updated_count
+        if not valid_rows:
+            return
+        
+        existing_emails = set(
+            Employee.objects.filter(
+                email__in=[data['email'] for _, data in valid_rows]
+            ).order_by().values_list('email', flat=True)
+        )
+        
+        employees = []
+        row_numbers = []
+        for row_number, data in valid_rows:
+            if data['email'] in existing_emails:
+                report['errors'].append({
+                    'row': row_number,
+                    'errors': {'email': ['An employee with this email already exists.']}
+                })
+                continue
+            employees.append(Employee(
+                content_hash=Employee.compute_content_hash(data['name'], data['company_id']),
+                **data
+            ))
+            row_numbers.append(row_number)
+        
+        if not employees:
+            return
+        
+        try:
+            with transaction.atomic():
+                Employee.objects.bulk_create(employees)
+        except IntegrityError:
+            for row_number in row_numbers:
+                report['errors'].append({
+                    'row': row_number,
+                    'errors': {'email': ['An employee with this email was created while importing. Please retry.']}
+                })
+            return
+        
+        report['created'] += len(employees)
+
 
+class CompanySummaryService:
+    @staticmethod
+    def _cache_key(company_id, day):
+        # Bulk writes bypass model signals, so they bump the version instead of deleting keys one by one.
+        version = cache.get(COMPANY_SUMMARY_VERSION_KEY, 0)
+        return f"company-summary:{version}:{company_id}:{day.isoformat()}"
+
+    @staticmethod
+    def invalidate(company_id):
+        cache.delete(CompanySummaryService._cache_key(company_id, timezone.localdate()))
+
+    @staticmethod
+    def invalidate_all():
+        cache.set(COMPANY_SUMMARY_VERSION_KEY, time.time_ns(), None)
+
+    @staticmethod
+    def get_summary(company_id):
+        today = timezone.localdate()
+        key = CompanySummaryService._cache_key(company_id, today)
+        summary = cache.get(key)
+        if summary is None:
+            summary = CompanySummaryService._compute_summary(company_id, today)
+            if summary is not None:
+                cache.set(key, summary, COMPANY_SUMMARY_CACHE_TIMEOUT)
+        return summary
+
+    @staticmethod
+    def _compute_summary(company_id, today):
+        year_start = date(today.year, 1, 1)
+        year_end = date(today.year, 12, 31)
+        active = Q(is_active=True)
+        approved = Q(leave_requests__status='approved')
+        on_leave_today = approved & Q(leave_requests__start_date__lte=today, leave_requests__end_date__gte=today)
+        in_year = approved & Q(leave_requests__start_date__lte=year_end, leave_requests__end_date__gte=year_start)
+        # Span of each approved leave clipped to the calendar year; one day is added per leave below.
+        span_in_year = ExpressionWrapper(
+            Least(F('leave_requests__end_date'), Value(year_end))
+            - Greatest(F('leave_requests__start_date'), Value(year_start)),
+            output_field=DurationField()
+        )
+        
+        totals = Employee.objects.filter(company_id=company_id).order_by().aggregate(
+            employees=Count('id', distinct=True),
+            headcount=Count('id', distinct=True, filter=active),
+            on_leave_today=Count('id', distinct=True, filter=active & on_leave_today),
+            pending_approvals=Count('leave_requests', filter=active & Q(leave_requests__status='pending')),
+            leaves_in_year=Count('leave_requests', filter=active & in_year),
+            span_in_year=Sum(span_in_year, filter=active & in_year),
+        )
+        if not totals['employees']:
+            return None
+        
+        span = totals['span_in_year']
+        return {
+            'company_id': company_id,
+            'date': today.isoformat(),
+            'headcount': totals['headcount'],
+            'on_leave_today': totals['on_leave_today'],
+            'pending_approvals': totals['pending_approvals'],
+            'leave_days_used_this_year': (span.days if span else 0) + totals['leaves_in_year'],
+        }
@@ -0,0 +1,10 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import Employee
+from .services import CompanySummaryService
+
+
+@receiver([post_save, post_delete], sender=Employee, dispatch_uid='employees.invalidate_company_summaries')
+def invalidate_company_summaries(sender, instance, **kwargs):
+    # An update may move the employee to another company, so every summary is dropped.
+    CompanySummaryService.invalidate_all()
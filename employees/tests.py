@@ -1,8 +1,22 @@
-from django.test import TestCase
+from django.test import TestCase, SimpleTestCase
+from django.core.management import call_command
 from django.core.exceptions import ValidationError
 from datetime import date, timedelta
-from employees.models import Employee
+from aiohttp import web, test_utils
+import asyncio
+import io
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import tracemalloc
+from unittest.mock import patch
+from employees.jobs import run_sync_job
+from employees.models import Employee, EmployeeSyncJob, EmployeeSyncState
+from employees.services import EmployeeSyncService
+from employees.profiling import SyncReport
 from accounts.models import User
+from core.exceptions import NetworkError, InvalidDataError
 
 
 class EmployeeModelTest(TestCase):
@@ -47,3 +61,432 @@ class EmployeeModelTest(TestCase):
 
     def test_employee_str(self):
         self.assertEqual(str(self.employee), 'Test Employee (employee@example.com)')
+
+
+class EmployeeFetchTest(SimpleTestCase):
+    def setUp(self):
+        self.employees = [
+            {'id': i, 'name': f'Employee {i}', 'email': f'employee{i}@example.com'}
+            for i in range(1, 251)
+        ]
+
+    def _run_against_stub(self, handler, **kwargs):
+        async def runner():
+            app = web.Application()
+            app.router.add_get('/employees', handler)
+            async with test_utils.TestServer(app) as server:
+                url = str(server.make_url('/employees'))
+                return await EmployeeSyncService.fetch_employees(url, retry_backoff=0, **kwargs)
+        return asyncio.run(runner())
+
+    def test_page_pagination_with_total(self):
+        async def handler(request):
+            page = int(request.query['page'])
+            size = int(request.query['page_size'])
+            return web.json_response({
+                'count': len(self.employees),
+                'results': self.employees[(page - 1) * size:page * size]
+            })
+
+        result = self._run_against_stub(handler, pagination='page', page_size=100, concurrency=3)
+        self.assertEqual(result, self.employees)
+
+    def test_offset_pagination_without_total(self):
+        async def handler(request):
+            offset = int(request.query['offset'])
+            limit = int(request.query['limit'])
+            return web.json_response(self.employees[offset:offset + limit])
+
+        result = self._run_against_stub(handler, pagination='offset', page_size=40, concurrency=2)
+        self.assertEqual(result, self.employees)
+
+    def test_cursor_pagination(self):
+        async def handler(request):
+            start = int(request.query.get('cursor', 0))
+            limit = int(request.query['limit'])
+            end = start + limit
+            return web.json_response({
+                'data': self.employees[start:end],
+                'next_cursor': str(end) if end < len(self.employees) else None
+            })
+
+        result = self._run_against_stub(handler, pagination='cursor', page_size=60)
+        self.assertEqual(result, self.employees)
+
+    def test_server_capped_page_size(self):
+        # Like DRF's max_page_size: the server returns at most 30 rows whatever is requested.
+        async def page_handler(request):
+            page = int(request.query['page'])
+            size = min(int(request.query['page_size']), 30)
+            return web.json_response({
+                'count': len(self.employees),
+                'results': self.employees[(page - 1) * size:page * size]
+            })
+
+        async def offset_handler(request):
+            offset = int(request.query['offset'])
+            limit = min(int(request.query['limit']), 30)
+            return web.json_response(self.employees[offset:offset + limit])
+
+        for handler, pagination in ((page_handler, 'page'), (offset_handler, 'offset')):
+            with self.subTest(pagination=pagination):
+                result = self._run_against_stub(handler, pagination=pagination, page_size=100, concurrency=3)
+                self.assertEqual(result, self.employees)
+
+    def test_paginated_feeds_are_never_fetched_conditionally(self):
+        seen_headers = []
+
+        async def handler(request):
+            seen_headers.append(request.headers.get('If-None-Match'))
+            if request.headers.get('If-None-Match'):
+                return web.Response(status=304)
+            page = int(request.query['page'])
+            return web.json_response(
+                {'count': len(self.employees), 'results': self.employees[(page - 1) * 100:page * 100]},
+                headers={'ETag': f'"page-{page}"'}
+            )
+
+        sync_state = EmployeeSyncState(source_url='http://127.0.0.1/employees', etag='"page-1"')
+        result = self._run_against_stub(handler, pagination='page', page_size=100, sync_state=sync_state)
+        self.assertEqual(result, self.employees)
+        self.assertEqual(seen_headers, [None, None, None])
+        self.assertEqual(sync_state.etag, '')
+
+    def test_failed_page_is_retried(self):
+        attempts = {}
+
+        async def handler(request):
+            page = int(request.query['page'])
+            attempts[page] = attempts.get(page, 0) + 1
+            if page == 2 and attempts[page] == 1:
+                return web.json_response({'error': 'unavailable'}, status=503)
+            size = int(request.query['page_size'])
+            return web.json_response({
+                'count': len(self.employees),
+                'results': self.employees[(page - 1) * size:page * size]
+            })
+
+        result = self._run_against_stub(handler, pagination='page', page_size=100, max_retries=2)
+        self.assertEqual(result, self.employees)
+        self.assertEqual(attempts[2], 2)
+
+    def test_retries_exhausted_raises_network_error(self):
+        async def handler(request):
+            return web.json_response({'error': 'unavailable'}, status=503)
+
+        with self.assertRaises(NetworkError):
+            self._run_against_stub(handler, pagination='page', max_retries=1)
+
+
+class EmployeeIncrementalSyncTest(TestCase):
+    def setUp(self):
+        self.employee = Employee.objects.create(
+            name='Existing Employee',
+            email='existing@example.com',
+            company_id=1
+        )
+
+    def test_content_hash_set_on_save(self):
+        self.assertEqual(
+            self.employee.content_hash,
+            Employee.compute_content_hash('Existing Employee', 1)
+        )
+
+    def test_unchanged_employees_are_skipped(self):
+        employees_data = [
+            {'id': 1, 'name': 'Existing Employee', 'email': 'existing@example.com'},
+            {'id': 2, 'name': 'New Employee', 'email': 'new@example.com'},
+        ]
+        self.assertEqual(EmployeeSyncService.sync_employees(employees_data), (1, 0))
+        self.assertEqual(EmployeeSyncService.sync_employees(employees_data), (0, 0))
+
+        employees_data[0]['name'] = 'Renamed Employee'
+        self.assertEqual(EmployeeSyncService.sync_employees(employees_data), (0, 1))
+        self.employee.refresh_from_db()
+        self.assertEqual(self.employee.name, 'Renamed Employee')
+        self.assertEqual(self.employee.content_hash, Employee.compute_content_hash('Renamed Employee', 1))
+
+    def test_sync_upserts_in_chunks(self):
+        created_at = self.employee.created_at
+        employees_data = [
+            {'id': 2, 'name': 'Existing Employee', 'email': 'existing@example.com'},
+            {'id': 3, 'name': 'First', 'email': 'first@example.com'},
+            {'id': 3, 'name': 'First Again', 'email': 'first@example.com'},
+            {'id': 4, 'name': 'Second', 'email': 'second@example.com'},
+            {'id': 5, 'name': 'No Email'},
+        ]
+        progress = []
+        counts = EmployeeSyncService.sync_employees(
+            employees_data,
+            batch_size=3,
+            progress_callback=lambda *args: progress.append(args)
+        )
+        self.assertEqual(counts, (2, 1))
+        self.assertEqual(progress, [(1, 1, 3), (2, 1, 5)])
+        self.assertEqual(Employee.objects.get(email='first@example.com').name, 'First Again')
+        self.employee.refresh_from_db()
+        self.assertEqual(self.employee.company_id, 2)
+        self.assertEqual(self.employee.created_at, created_at)
+
+    def test_sync_report_records_phases(self):
+        employees_data = [
+            {'id': 1, 'name': 'Existing Employee', 'email': 'existing@example.com'},
+            {'id': 2, 'name': 'New Employee', 'email': 'new@example.com'},
+        ]
+        with SyncReport() as report:
+            EmployeeSyncService.sync_employees(employees_data, report=report)
+        data = report.as_dict()
+        self.assertEqual(data['phases']['diff']['rows'], 2)
+        self.assertEqual(data['phases']['write']['rows'], 1)
+        self.assertGreater(data['phases']['diff']['peak_memory_bytes'], 0)
+        self.assertGreaterEqual(data['total_seconds'], data['phases']['write']['seconds'])
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_traced_reports_run_one_at_a_time(self):
+        order = []
+        first_entered = threading.Event()
+        release_first = threading.Event()
+
+        def first():
+            with SyncReport():
+                order.append('first entered')
+                first_entered.set()
+                release_first.wait(5)
+                order.append('first exited')
+
+        def second():
+            first_entered.wait(5)
+            with SyncReport():
+                order.append('second entered')
+
+        threads = [threading.Thread(target=first), threading.Thread(target=second)]
+        for thread in threads:
+            thread.start()
+        first_entered.wait(5)
+        time.sleep(0.05)
+        release_first.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(order, ['first entered', 'first exited', 'second entered'])
+        self.assertFalse(tracemalloc.is_tracing())
+        with SyncReport(trace_memory=False):
+            with SyncReport(trace_memory=False):
+                pass
+
+    def test_conditional_fetch_returns_none_when_not_modified(self):
+        employees = [{'id': 1, 'name': 'Existing Employee', 'email': 'existing@example.com'}]
+        seen_headers = []
+
+        async def handler(request):
+            seen_headers.append(request.headers.get('If-None-Match'))
+            if request.headers.get('If-None-Match') == '"v1"':
+                return web.Response(status=304)
+            return web.json_response(employees, headers={'ETag': '"v1"'})
+
+        async def runner(sync_state):
+            app = web.Application()
+            app.router.add_get('/employees', handler)
+            async with test_utils.TestServer(app) as server:
+                return await EmployeeSyncService.fetch_employees(
+                    str(server.make_url('/employees')), sync_state=sync_state
+                )
+
+        sync_state = EmployeeSyncState(source_url='http://127.0.0.1/employees')
+        self.assertEqual(asyncio.run(runner(sync_state)), employees)
+        self.assertEqual(sync_state.etag, '"v1"')
+        self.assertIsNone(asyncio.run(runner(sync_state)))
+        self.assertEqual(seen_headers, [None, '"v1"'])
+
+
+class EmployeeSyncJobConditionalTest(TestCase):
+    def setUp(self):
+        employees = [{'id': 1, 'name': 'Feed Employee', 'email': 'feed@example.com'}]
+        self.seen_headers = seen_headers = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                seen_headers.append(self.headers.get('If-None-Match'))
+                if self.headers.get('If-None-Match') == '"v1"':
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                body = json.dumps(employees).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('ETag', '"v1"')
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.url = f'http://127.0.0.1:{server.server_port}/employees'
+
+    def test_second_job_sends_stored_etag_and_gets_not_modified(self):
+        first = EmployeeSyncJob.objects.create(api_url=self.url)
+        run_sync_job(first.pk)
+        self.assertEqual(EmployeeSyncState.objects.get(source_url=self.url).etag, '"v1"')
+
+        second = EmployeeSyncJob.objects.create(api_url=self.url)
+        run_sync_job(second.pk)
+        second.refresh_from_db()
+
+        self.assertEqual(self.seen_headers, [None, '"v1"'])
+        self.assertEqual(second.status, 'completed')
+        self.assertTrue(second.not_modified)
+
+
+class EmployeeReconcileTest(TestCase):
+    source = 'https://feed.example.com/users'
+
+    def setUp(self):
+        for email in ['kept@example.com', 'gone@example.com', 'also-gone@example.com']:
+            Employee.objects.create(name='Employee', email=email, company_id=1, sync_source=self.source)
+        Employee.objects.create(name='Manual', email='manual@example.com', company_id=1)
+        Employee.objects.create(
+            name='Other Feed', email='other@example.com', company_id=2, sync_source='https://other.example.com/users'
+        )
+        self.employees_data = [{'id': 1, 'name': 'Employee', 'email': 'kept@example.com'}]
+
+    def test_report_lists_missing_employees(self):
+        result = EmployeeSyncService.reconcile_employees(self.employees_data, mode='report', sources=[self.source])
+        self.assertEqual(result['missing_employees'], 2)
+        self.assertEqual(sorted(result['missing_emails']), ['also-gone@example.com', 'gone@example.com'])
+        self.assertEqual(Employee.objects.filter(is_active=True).count(), 5)
+
+    def test_deactivate_missing_employees(self):
+        result = EmployeeSyncService.reconcile_employees(
+            self.employees_data, mode='deactivate', sources=[self.source]
+        )
+        self.assertEqual(result['missing_employees'], 2)
+        self.assertEqual(
+            sorted(Employee.objects.filter(is_active=True).values_list('email', flat=True)),
+            ['kept@example.com', 'manual@example.com', 'other@example.com']
+        )
+
+        employees_data = self.employees_data + [{'id': 1, 'name': 'Employee', 'email': 'gone@example.com'}]
+        self.assertEqual(EmployeeSyncService.sync_employees(employees_data, source=self.source), (0, 1))
+        self.assertTrue(Employee.objects.get(email='gone@example.com').is_active)
+
+    def test_sync_takes_ownership_of_employees_in_the_feed(self):
+        employees_data = [{'id': 1, 'name': 'Manual', 'email': 'manual@example.com'}]
+        self.assertEqual(EmployeeSyncService.sync_employees(employees_data, source=self.source), (0, 1))
+        self.assertEqual(Employee.objects.get(email='manual@example.com').sync_source, self.source)
+        self.assertEqual(EmployeeSyncService.sync_employees(employees_data, source=self.source), (0, 0))
+
+    def test_unscoped_or_empty_reconcile_is_rejected(self):
+        with self.assertRaises(InvalidDataError):
+            EmployeeSyncService.reconcile_employees([], mode='deactivate', sources=[self.source])
+        with self.assertRaises(InvalidDataError):
+            EmployeeSyncService.reconcile_employees(self.employees_data, mode='deactivate')
+        self.assertEqual(Employee.objects.filter(is_active=True).count(), 5)
+
+
+class EmployeeMultiSourceSyncTest(TestCase):
+    def test_sources_fetched_over_one_session(self):
+        async def first(request):
+            return web.json_response([{'id': 1, 'name': 'First', 'email': 'shared@example.com'}])
+
+        async def second(request):
+            return web.json_response([
+                {'id': 2, 'name': 'Second', 'email': 'shared@example.com'},
+                {'id': 2, 'name': 'Only Second', 'email': 'second@example.com'},
+            ])
+
+        async def runner():
+            app = web.Application()
+            app.router.add_get('/first', first)
+            app.router.add_get('/second', second)
+            async with test_utils.TestServer(app) as server:
+                return await EmployeeSyncService.fetch_from_sources(
+                    [str(server.make_url('/first')), str(server.make_url('/second'))]
+                )
+
+        results = asyncio.run(runner())
+        self.assertEqual([len(result['employees']) for result in results], [1, 2])
+        self.assertTrue(all(result['seconds'] >= 0 for result in results))
+
+        employees_data, conflicts = EmployeeSyncService.merge_sources(results)
+        self.assertEqual(conflicts, 1)
+        self.assertEqual(
+            [(emp['email'], emp['name']) for emp in employees_data],
+            [('shared@example.com', 'First'), ('second@example.com', 'Only Second')]
+        )
+
+    def test_command_merges_multiple_sources(self):
+        feeds = {
+            'https://a.example.com/users': [{'id': 1, 'name': 'From A', 'email': 'shared@example.com'}],
+            'https://b.example.com/users': [
+                {'id': 2, 'name': 'From B', 'email': 'shared@example.com'},
+                {'id': 2, 'name': 'Only B', 'email': 'b@example.com'},
+            ],
+        }
+
+        async def fake_fetch(url, **kwargs):
+            return feeds[url]
+
+        out = io.StringIO()
+        with patch.object(EmployeeSyncService, 'fetch_employees', side_effect=fake_fetch):
+            call_command(
+                'sync_employees',
+                '--api-url', 'https://a.example.com/users',
+                '--api-url', 'https://b.example.com/users',
+                stdout=out
+            )
+
+        self.assertEqual(Employee.objects.get(email='shared@example.com').name, 'From A')
+        self.assertEqual(Employee.objects.get(email='shared@example.com').sync_source, 'https://a.example.com/users')
+        self.assertEqual(Employee.objects.get(email='b@example.com').sync_source, 'https://b.example.com/users')
+        self.assertTrue(Employee.objects.filter(email='b@example.com').exists())
+        self.assertIn('https://b.example.com/users: 2 employees', out.getvalue())
+        self.assertIn('1 conflicting employee(s)', out.getvalue())
+        self.assertIn('write', out.getvalue())
+
+
+class SeedDataCommandTest(TestCase):
+    def _index_names(self):
+        from django.db import connection
+        with connection.cursor() as cursor:
+            return {
+                name for name, in cursor.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name IN ('employees', 'leave_requests')"
+                )
+            }
+
+    def test_seeds_employees_with_non_overlapping_leaves(self):
+        from leaves.models import LeaveRequest
+        indexes = self._index_names()
+        
+        out = io.StringIO()
+        call_command(
+            'seed_data', '--employees', '30', '--leaves-per-employee', '4', '--batch-size', '7', '--defer-indexes',
+            stdout=out
+        )
+        
+        self.assertEqual(Employee.objects.count(), 30)
+        self.assertEqual(LeaveRequest.objects.count(), 120)
+        self.assertIn('Created 30 employees and 120 leave requests', out.getvalue())
+        self.assertEqual(self._index_names(), indexes)
+        
+        employee = Employee.objects.get(pk=5)
+        self.assertEqual(employee.content_hash, Employee.compute_content_hash(employee.name, employee.company_id))
+        for employee_id in Employee.objects.values_list('id', flat=True):
+            leaves = list(LeaveRequest.objects.filter(employee_id=employee_id).order_by('start_date'))
+            for earlier, later in zip(leaves, leaves[1:]):
+                self.assertLess(earlier.end_date, later.start_date)
+        self.assertFalse(LeaveRequest.objects.filter(status='pending', approval_date__isnull=False).exists())
+        self.assertFalse(LeaveRequest.objects.exclude(status='pending').filter(approval_date__isnull=True).exists())
+        self.assertFalse(LeaveRequest.objects.exclude(status='pending').filter(start_date__gt=date.today()).exists())
+
+    def test_repeated_runs_continue_after_existing_ids(self):
+        call_command('seed_data', '--employees', '5', '--leaves-per-employee', '0', stdout=io.StringIO())
+        call_command('seed_data', '--employees', '5', '--leaves-per-employee', '0', stdout=io.StringIO())
+        
+        self.assertEqual(Employee.objects.count(), 10)
+        self.assertEqual(Employee.objects.create(name='After Seed', email='after@example.com', company_id=1).pk, 11)
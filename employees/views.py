@@ -1,25 +1,29 @@
 from rest_framework import viewsets, status, filters
-from rest_framework.decorators import action
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.exceptions import NotFound
+from rest_framework.parsers import MultiPartParser, FormParser
 from django_filters.rest_framework import DjangoFilterBackend
 from django.core.cache import cache
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.urls import reverse
 from django.utils.decorators import method_decorator
 from django.views.decorators.cache import cache_page
 from django.views.decorators.vary import vary_on_headers
 import logging
-import asyncio
-from .models import Employee
+from .models import Employee, EmployeeSyncJob
 from .serializers import (
     EmployeeSerializer,
     EmployeeCreateSerializer,
-    EmployeeUpdateSerializer
+    EmployeeUpdateSerializer,
+    EmployeeSyncJobSerializer
 )
 from .config import EXTERNAL_EMPLOYEE_API_URL
-from .services import EmployeeSyncService
+from .services import EmployeeSyncService, EmployeeImportService, CompanySummaryService, RECONCILE_MODES
+from .jobs import enqueue_sync_job, fail_if_abandoned
 from core.permissions import IsHRUser
-from core.exceptions import NetworkError, InvalidURLError, TimeoutError, InvalidDataError
-from core.throttling import EmployeeSyncRateThrottle
+from core.throttling import EmployeeSyncRateThrottle, EmployeeImportRateThrottle
 
 logger = logging.getLogger('employees')
 
@@ -28,7 +32,7 @@ class EmployeeViewSet(viewsets.ModelViewSet):
     queryset = Employee.objects.all()
     permission_classes = [IsAuthenticated, IsHRUser]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['company_id']
+    filterset_fields = ['company_id', 'is_active']
     search_fields = ['name', 'email']
     ordering_fields = ['name', 'email', 'created_at']
     ordering = ['-created_at']
@@ -51,7 +55,7 @@ class EmployeeViewSet(viewsets.ModelViewSet):
         self.perform_create(serializer)
         headers = self.get_success_headers(serializer.data)
         
-        logger.info(f"Employee created: {serializer.data['id']}")
+        logger.info("Employee created: %s", serializer.instance.pk)
         
         return Response(
             {
@@ -63,6 +67,50 @@ class EmployeeViewSet(viewsets.ModelViewSet):
             headers=headers
         )
 
+    @action(
+        detail=False,
+        methods=['post'],
+        url_path='import',
+        url_name='import',
+        parser_classes=[MultiPartParser, FormParser],
+        throttle_classes=[EmployeeImportRateThrottle]
+    )
+    def import_csv(self, request):
+        upload = request.FILES.get('file')
+        
+        if not upload:
+            return Response(
+                {
+                    'error': True,
+                    'message': 'A CSV file is required.',
+                    'details': {'file': 'This field is required.'},
+                    'code': 'validation_error'
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        report = EmployeeImportService.import_csv(upload.file)
+        
+        if report['failed'] and not report['created']:
+            return Response(
+                {
+                    'error': True,
+                    'message': 'No employees were imported.',
+                    'details': report,
+                    'code': 'import_failed'
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        return Response(
+            {
+                'error': False,
+                'message': f"Imported {report['created']} of {report['total_rows']} employees.",
+                'data': report
+            },
+            status=status.HTTP_201_CREATED
+        )
+
     @action(detail=False, methods=['post'], throttle_classes=[EmployeeSyncRateThrottle])
     def sync(self, request):
         external_api_url = request.data.get('api_url', EXTERNAL_EMPLOYEE_API_URL)
@@ -78,27 +126,72 @@ class EmployeeViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        try:
-            employees_data = asyncio.run(EmployeeSyncService.fetch_employees(external_api_url))
-            new_count, updated_count = EmployeeSyncService.sync_employees(employees_data)
-            
-            logger.info(f"Employee sync completed. New: {new_count}, Updated: {updated_count}")
-            
+        reconcile_mode = request.data.get('reconcile') or ''
+        if reconcile_mode and reconcile_mode not in RECONCILE_MODES:
             return Response(
                 {
-                    'error': False,
-                    'message': 'Employees synced successfully.',
-                    'data': {
-                        'new_employees': new_count,
-                        'updated_employees': updated_count,
-                        'total_processed': len(employees_data) if employees_data else 0
-                    }
+                    'error': True,
+                    'message': f"Reconcile mode must be one of: {', '.join(RECONCILE_MODES)}.",
+                    'details': {'reconcile': f"Must be one of: {', '.join(RECONCILE_MODES)}."},
+                    'code': 'validation_error'
                 },
-                status=status.HTTP_200_OK
+                status=status.HTTP_400_BAD_REQUEST
             )
         
-        except (NetworkError, InvalidURLError, TimeoutError, InvalidDataError) as e:
-            raise
-        except Exception as e:
-            logger.error(f"Employee sync failed: {str(e)}", exc_info=True)
-            raise
+        EmployeeSyncService._validate_url(external_api_url)
+        
+        job = EmployeeSyncJob.objects.create(
+            api_url=external_api_url,
+            reconcile_mode=reconcile_mode,
+            requested_by_id=request.user.pk
+        )
+        enqueue_sync_job(job)
+        
+        logger.info("Employee sync job queued: %s", job.id)
+        
+        return Response(
+            {
+                'error': False,
+                'message': 'Employee sync job queued.',
+                'data': {
+                    'job_id': str(job.id),
+                    'status': job.status,
+                    'status_url': request.build_absolute_uri(
+                        reverse('employee-sync-status', kwargs={'job_id': job.id})
+                    )
+                }
+            },
+            status=status.HTTP_202_ACCEPTED
+        )
+
+    @action(detail=False, methods=['get'], url_path=r'sync/(?P<job_id>[0-9a-f-]+)', url_name='sync-status')
+    def sync_status(self, request, job_id=None):
+        try:
+            job = EmployeeSyncJob.objects.get(pk=job_id)
+        except (EmployeeSyncJob.DoesNotExist, DjangoValidationError):
+            raise NotFound('Sync job not found.')
+        job = fail_if_abandoned(job)
+        
+        return Response(
+            {
+                'error': False,
+                'message': f'Sync job is {job.status}.',
+                'data': EmployeeSyncJobSerializer(job).data
+            }
+        )
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsHRUser])
+def company_summary(request, company_id):
+    summary = CompanySummaryService.get_summary(company_id)
+    if summary is None:
+        raise NotFound('Company not found.')
+    
+    return Response(
+        {
+            'error': False,
+            'message': 'Company summary retrieved successfully.',
+            'data': summary
+        }
+    )
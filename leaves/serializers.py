@@ -66,7 +66,7 @@ class LeaveRequestSerializer(serializers.ModelSerializer):
 
 class LeaveRequestCreateSerializer(serializers.ModelSerializer):
     employee = serializers.PrimaryKeyRelatedField(
-        queryset=Employee.objects.only('id', 'email'),
+        queryset=Employee.objects.only('id', 'user_id', 'name', 'email', 'company_id'),
         required=False,
         allow_null=True
     )
@@ -118,7 +118,16 @@ class LeaveRequestCreateSerializer(serializers.ModelSerializer):
             return employee
         
         if hasattr(request.user, 'employee_profile'):
-            return request.user.employee_profile
+            employee = request.user.employee_profile
+            if employee.get_deferred_fields():
+                # Token users carry only the employee id; load the row once rather than field by field.
+                try:
+                    employee = Employee.objects.get(pk=employee.pk)
+                except Employee.DoesNotExist:
+                    raise serializers.ValidationError({
+                        'employee': 'Employee profile not found. Please create an employee profile first.'
+                    })
+            return employee
         
         raise serializers.ValidationError({
             'employee': 'Employee profile not found. Please create an employee profile first.'
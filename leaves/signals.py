@@ -0,0 +1,19 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from employees.services import CompanySummaryService
+from .models import LeaveRequest
+
+
+@receiver(post_save, sender=LeaveRequest, dispatch_uid='leaves.invalidate_company_summary')
+def invalidate_company_summary(sender, instance, **kwargs):
+    CompanySummaryService.invalidate(instance.employee.company_id)
+
+
+@receiver(post_delete, sender=LeaveRequest, dispatch_uid='leaves.invalidate_company_summary_on_delete')
+def invalidate_company_summary_on_delete(sender, instance, origin=None, **kwargs):
+    # Cascades from an employee and queryset deletes fire once per leave; bumping the version costs
+    # no query, where looking up each leave's employee would cost one per leave.
+    if origin is not instance:
+        CompanySummaryService.invalidate_all()
+        return
+    CompanySummaryService.invalidate(instance.employee.company_id)
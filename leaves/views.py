@@ -85,7 +85,7 @@ class LeaveRequestViewSet(viewsets.ModelViewSet):
         self.perform_create(serializer)
         
         leave_id = serializer.instance.id if serializer.instance else None
-        logger.info(f"Leave request created: {leave_id}")
+        logger.info("Leave request created: %s", leave_id)
         
         response_serializer = LeaveRequestSerializer(serializer.instance)
         headers = self.get_success_headers(response_serializer.data)
@@ -124,7 +124,7 @@ class LeaveRequestViewSet(viewsets.ModelViewSet):
             else:
                 raise DRFValidationError({'non_field_errors': [str(e)]})
         
-        logger.info(f"Leave request updated: {instance.id} - Status: {serializer.data.get('status')}")
+        logger.info("Leave request updated: %s - Status: %s", instance.id, instance.status)
         
         return Response(
             {
@@ -153,7 +153,7 @@ class LeaveRequestViewSet(viewsets.ModelViewSet):
             else:
                 raise DRFValidationError({'non_field_errors': [str(e)]})
         
-        logger.info(f"Leave request approved: {instance.id}")
+        logger.info("Leave request approved: %s", instance.id)
         
         return Response(
             {
@@ -182,7 +182,7 @@ class LeaveRequestViewSet(viewsets.ModelViewSet):
             else:
                 raise DRFValidationError({'non_field_errors': [str(e)]})
         
-        logger.info(f"Leave request rejected: {instance.id}")
+        logger.info("Leave request rejected: %s", instance.id)
         
         return Response(
             {
@@ -2,9 +2,21 @@ from django.test import TestCase
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from rest_framework import status
+from django.core.cache import cache
+from django.test import override_settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.utils import timezone
 from datetime import date, timedelta
-from employees.models import Employee
+from unittest.mock import patch, AsyncMock
+from employees.models import Employee, EmployeeSyncJob
+from employees.services import EmployeeSyncService
+from employees.config import EMPLOYEE_SYNC_JOB_TIMEOUT
+from employees.jobs import run_sync_job
 from leaves.models import LeaveRequest
+from core.authentication import local_user_cache
+from core.health import health_prober
+from core.slow_queries import slow_query_log
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
 
 User = get_user_model()
 
@@ -129,6 +141,434 @@ class EmployeeAPITest(TestCase):
             'api_url': 'https://jsonplaceholder.typicode.com/users'
         }
         response = self.client.post('/api/employees/sync/', data, format='json')
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
         self.assertFalse(response.data['error'])
+        self.assertTrue(EmployeeSyncJob.objects.filter(pk=response.data['data']['job_id']).exists())
+
+    def test_sync_job_status_reports_progress(self):
+        self.client.force_authenticate(user=self.hr_user)
+        employees_data = [
+            {'id': 1, 'name': 'Synced Employee', 'email': 'synced@example.com'},
+            {'id': 2, 'name': 'Another Employee', 'email': 'another@example.com'},
+        ]
+        response = self.client.post(
+            '/api/employees/sync/',
+            {'api_url': 'https://example.com/users'},
+            format='json'
+        )
+        job_id = response.data['data']['job_id']
+        
+        with patch.object(EmployeeSyncService, 'fetch_employees', AsyncMock(return_value=employees_data)):
+            run_sync_job(job_id)
+        
+        response = self.client.get(f'/api/employees/sync/{job_id}/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['data']['status'], 'completed')
+        self.assertEqual(response.data['data']['new_employees'], 2)
+        self.assertEqual(response.data['data']['updated_employees'], 0)
+        self.assertEqual(response.data['data']['total_processed'], 2)
+        report = response.data['data']['report']
+        self.assertEqual(set(report['phases']), {'fetch', 'decode', 'diff', 'write'})
+        self.assertEqual(report['phases']['write']['rows'], 2)
+
+    def test_abandoned_sync_job_is_reported_failed(self):
+        self.client.force_authenticate(user=self.hr_user)
+        job = EmployeeSyncJob.objects.create(
+            api_url='https://example.com/users',
+            status='running',
+            started_at=timezone.now() - timedelta(seconds=EMPLOYEE_SYNC_JOB_TIMEOUT + 1)
+        )
+        
+        response = self.client.get(f'/api/employees/sync/{job.pk}/')
+        self.assertEqual(response.data['data']['status'], 'failed')
+        self.assertEqual(response.data['data']['error_code'], 'job_abandoned')
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+        self.assertIsNotNone(job.finished_at)
+
+    def test_abandoned_sync_job_stays_failed_when_it_finishes(self):
+        job = EmployeeSyncJob.objects.create(api_url='https://example.com/users')
+        
+        employees_data = [{'id': 1, 'name': 'Late Employee', 'email': 'late@example.com'}]
+        
+        def sync_after_abandoning(*args, **kwargs):
+            EmployeeSyncJob.objects.filter(pk=job.pk).update(status='failed', error_code='job_abandoned')
+            return 1, 0
+        
+        with patch.object(EmployeeSyncService, 'fetch_employees', AsyncMock(return_value=employees_data)):
+            with patch.object(EmployeeSyncService, 'sync_employees', side_effect=sync_after_abandoning):
+                run_sync_job(job.pk)
+        
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+        self.assertEqual(job.error_code, 'job_abandoned')
+
+    def test_sync_job_status_not_found(self):
+        self.client.force_authenticate(user=self.hr_user)
+        response = self.client.get('/api/employees/sync/00000000-0000-0000-0000-000000000000/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class EmployeeImportAPITest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.hr_user = User.objects.create_user(
+            username='hruser',
+            email='hr@example.com',
+            password='hrpass123',
+            role='HR'
+        )
+        Employee.objects.create(name='Existing', email='existing@example.com', company_id=1)
+
+    def _upload(self, content):
+        upload = SimpleUploadedFile('employees.csv', content.encode('utf-8'), content_type='text/csv')
+        return self.client.post('/api/employees/import/', {'file': upload}, format='multipart')
+
+    def test_import_csv_reports_row_errors(self):
+        self.client.force_authenticate(user=self.hr_user)
+        content = (
+            'name,email,company_id,joining_date\n'
+            'First Employee,first@example.com,10,2024-01-15\n'
+            'Second Employee,Second@Example.com,10,\n'
+            'Duplicate,first@example.com,10,\n'
+            'Existing Again,existing@example.com,1,\n'
+            'X,bad-email,-1,\n'
+        )
+        # One existence query and one INSERT (inside a savepoint) for the whole chunk
+        with self.assertNumQueries(4):
+            response = self._upload(content)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        report = response.data['data']
+        self.assertEqual(report['total_rows'], 5)
+        self.assertEqual(report['created'], 2)
+        self.assertEqual([error['row'] for error in report['errors']], [4, 5, 6])
+        self.assertEqual(set(report['errors'][2]['errors']), {'name', 'email', 'company_id'})
+        self.assertTrue(Employee.objects.filter(email='second@example.com').exists())
+
+    def test_import_csv_missing_columns(self):
+        self.client.force_authenticate(user=self.hr_user)
+        response = self._upload('name,email\nFirst Employee,first@example.com\n')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['code'], 'invalid_data')
+
+
+class CompanySummaryAPITest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.hr_user = User.objects.create_user(
+            username='hruser',
+            email='hr@example.com',
+            password='hrpass123',
+            role='HR'
+        )
+        self.first = Employee.objects.create(name='First', email='first@example.com', company_id=7)
+        self.second = Employee.objects.create(name='Second', email='second@example.com', company_id=7)
+        self.former = Employee.objects.create(
+            name='Former', email='former@example.com', company_id=7, is_active=False
+        )
+        self.other = Employee.objects.create(name='Other', email='other@example.com', company_id=8)
+        self.today = timezone.localdate()
+
+    def _leave(self, employee, start_date, end_date, leave_status):
+        LeaveRequest(
+            employee=employee,
+            leave_type='annual',
+            start_date=start_date,
+            end_date=end_date,
+            status=leave_status
+        ).save(skip_date_validation=True)
+
+    def test_company_summary_aggregates(self):
+        year_start = date(self.today.year, 1, 1)
+        tomorrow = self.today + timedelta(days=1)
+        self._leave(self.first, self.today, tomorrow, 'approved')
+        self._leave(self.second, year_start - timedelta(days=2), year_start + timedelta(days=1), 'approved')
+        self._leave(self.second, self.today + timedelta(days=400), self.today + timedelta(days=401), 'pending')
+        # Deactivated employees count nowhere.
+        self._leave(self.former, self.today, tomorrow, 'approved')
+        self._leave(self.former, self.today + timedelta(days=10), self.today + timedelta(days=11), 'pending')
+        self._leave(self.second, self.today, tomorrow, 'rejected')
+        self._leave(self.other, self.today, self.today + timedelta(days=3), 'pending')
+        
+        self.client.force_authenticate(user=self.hr_user)
+        response = self.client.get('/api/companies/7/summary/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        summary = response.data['data']
+        self.assertEqual(summary['headcount'], 2)
+        self.assertEqual(summary['on_leave_today'], 1)
+        self.assertEqual(summary['pending_approvals'], 1)
+        # Two days in the year for the approved leave (one on 31 December), plus two clipped from last year
+        days_this_year = 2 if tomorrow.year == self.today.year else 1
+        self.assertEqual(summary['leave_days_used_this_year'], days_this_year + 2)
+
+    def test_company_summary_is_cached_until_leaves_change(self):
+        self.client.force_authenticate(user=self.hr_user)
+        self.client.get('/api/companies/7/summary/')
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/companies/7/summary/')
+        self.assertEqual(response.data['data']['pending_approvals'], 0)
+        
+        self._leave(self.first, self.today + timedelta(days=1), self.today + timedelta(days=2), 'pending')
+        response = self.client.get('/api/companies/7/summary/')
+        self.assertEqual(response.data['data']['pending_approvals'], 1)
+
+    def test_company_summary_not_found_and_hr_only(self):
+        self.client.force_authenticate(user=self.hr_user)
+        response = self.client.get('/api/companies/999/summary/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        
+        employee_user = User.objects.create_user(
+            username='employee',
+            email='emp@example.com',
+            password='emppass123',
+            role='EMPLOYEE'
+        )
+        self.client.force_authenticate(user=employee_user)
+        response = self.client.get('/api/companies/7/summary/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class CachedJWTAuthenticationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        local_user_cache.clear()
+        self.client = APIClient()
+        self.employee_user = User.objects.create_user(
+            username='employee',
+            email='emp@example.com',
+            password='emppass123',
+            role='EMPLOYEE'
+        )
+        self.employee = Employee.objects.create(
+            user=self.employee_user,
+            name='Test Employee',
+            email='employee@example.com',
+            company_id=123
+        )
+        # Tokens without role claims, as issued before claims were added, resolve through the user cache
+        token = RefreshToken.for_user(self.employee_user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_cached_user_needs_no_extra_queries(self):
+        self.client.get('/api/leaves/?status=approved')
+        # Only the count query of the (empty) list itself
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/leaves/?status=pending')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_user_change_invalidates_cache(self):
+        self.client.get('/api/leaves/?status=approved')
+        self.employee_user.is_active = False
+        self.employee_user.save()
+        
+        response = self.client.get('/api/leaves/?status=pending')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class TokenClaimsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        local_user_cache.clear()
+        self.client = APIClient()
+        self.employee_user = User.objects.create_user(
+            username='employee',
+            email='emp@example.com',
+            password='emppass123',
+            role='EMPLOYEE'
+        )
+        self.employee = Employee.objects.create(
+            user=self.employee_user,
+            name='Test Employee',
+            email='employee@example.com',
+            company_id=123
+        )
+        self.leave_request = LeaveRequest.objects.create(
+            employee=self.employee,
+            leave_type='annual',
+            start_date=date.today() + timedelta(days=1),
+            end_date=date.today() + timedelta(days=5)
+        )
+
+    def _obtain(self, username='employee', password='emppass123'):
+        return self.client.post('/api/token/', {'username': username, 'password': password}, format='json').data
+
+    def test_tokens_carry_role_and_employee_claims(self):
+        access = AccessToken(self._obtain()['access'])
+        self.assertEqual(access['role'], 'EMPLOYEE')
+        self.assertEqual(access['employee_id'], self.employee.pk)
+
+    def test_claims_user_is_scoped_without_user_queries(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self._obtain()['access']}")
+        # Count and page of the employee's own leave requests
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/leaves/')
+        self.assertEqual(response.data['count'], 1)
+        
+        response = self.client.get(f'/api/leaves/{self.leave_request.id}/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.patch(f'/api/leaves/{self.leave_request.id}/approve/', format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_user_change_applies_to_issued_claims_tokens(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self._obtain()['access']}")
+        self.assertEqual(self.client.get('/api/leaves/').status_code, status.HTTP_200_OK)
+        
+        self.employee_user.is_active = False
+        self.employee_user.save()
+        response = self.client.get('/api/leaves/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
 
+    def test_leave_for_deleted_employee_profile_is_rejected(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self._obtain()['access']}")
+        data = {
+            'leave_type': 'sick',
+            'start_date': (date.today() + timedelta(days=10)).isoformat(),
+            'end_date': (date.today() + timedelta(days=11)).isoformat()
+        }
+        self.employee.delete()
+        
+        response = self.client.post('/api/leaves/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        
+        # Without the version bump (another worker's cache), the stale claim is caught on lookup.
+        cache.clear()
+        response = self.client.post('/api/leaves/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('employee', response.data['details'])
+
+    def test_refresh_restamps_claims_from_user(self):
+        refresh = self._obtain()['refresh']
+        self.employee_user.role = 'HR'
+        self.employee_user.save()
+        
+        response = self.client.post('/api/token/refresh/', {'refresh': refresh}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(AccessToken(response.data['access'])['role'], 'HR')
+        
+        self.employee_user.is_active = False
+        self.employee_user.save()
+        response = self.client.post('/api/token/refresh/', {'refresh': response.data['refresh']}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_rotated_refresh_token_is_revoked(self):
+        refresh = self._obtain()['refresh']
+        response = self.client.post('/api/token/refresh/', {'refresh': refresh}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response.data['refresh'], refresh)
+        
+        response = self.client.post('/api/token/refresh/', {'refresh': refresh}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class HealthCheckAPITest(TestCase):
+    def test_liveness_has_no_dependencies(self):
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/health/live/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], 'alive')
+
+    def test_readiness_serves_last_probe(self):
+        health_prober.probe()
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/health/ready/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['database'], 'healthy')
+        self.assertTrue(response.data['details']['database']['connected'])
+        self.assertIn('latency_ms', response.data['details']['database'])
+
+    def test_readiness_fails_when_probe_is_stale(self):
+        result = health_prober.probe()
+        result['checked_monotonic'] -= health_prober.interval * 4
+        response = self.client.get('/api/health/ready/')
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertTrue(response.data['stale'])
+
+
+class MetricsAPITest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.hr_user = User.objects.create_user(
+            username='hruser',
+            email='hr@example.com',
+            password='hrpass123',
+            role='HR'
+        )
+        self.employee_user = User.objects.create_user(
+            username='employee',
+            email='emp@example.com',
+            password='emppass123',
+            role='EMPLOYEE'
+        )
+
+    @override_settings(METRICS_ALLOWED_IPS=[])
+    def test_metrics_report_requests_by_view(self):
+        self.client.force_authenticate(user=self.hr_user)
+        self.client.get('/api/employees/?search=metrics')
+        
+        response = self.client.get('/api/metrics/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        body = response.content.decode()
+        self.assertIn('http_request_duration_seconds_count{view="employee-list",method="GET",status="200"}', body)
+        self.assertIn('http_request_db_queries_total{view="employee-list",method="GET",status="200"}', body)
+
+    @override_settings(METRICS_ALLOWED_IPS=[])
+    def test_metrics_require_hr_or_internal_address(self):
+        self.client.force_authenticate(user=self.employee_user)
+        response = self.client.get('/api/metrics/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        
+        with override_settings(METRICS_ALLOWED_IPS=['127.0.0.1']):
+            response = self.client.get('/api/metrics/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class SlowQueryLogAPITest(TestCase):
+    def setUp(self):
+        slow_query_log.clear()
+        self.hr_user = User.objects.create_user(
+            username='hruser',
+            email='hr@example.com',
+            password='hrpass123',
+            role='HR'
+        )
+        employee = Employee.objects.create(name='Test Employee', email='employee@example.com', company_id=123)
+        self.leave_request = LeaveRequest.objects.create(
+            employee=employee,
+            leave_type='annual',
+            start_date=date.today() + timedelta(days=1),
+            end_date=date.today() + timedelta(days=5)
+        )
+
+    @override_settings(SLOW_QUERY_LOG_ENABLED=True, SLOW_QUERY_THRESHOLD_MS=0)
+    def test_slow_queries_are_attributed_to_application_code(self):
+        client = APIClient()
+        client.force_authenticate(user=self.hr_user)
+        response = client.patch(f'/api/leaves/{self.leave_request.id}/approve/', format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        response = client.get('/api/slow-queries/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        entries = response.data['data']['entries']
+        overlap_check = [entry for entry in entries if entry['function'] == 'validate_no_overlapping_approved_leaves']
+        self.assertTrue(overlap_check)
+        self.assertEqual(overlap_check[0]['view'], 'leave-approve')
+        self.assertTrue(overlap_check[0]['location'].startswith('core/validators.py:'))
+
+    def test_slow_query_log_is_off_by_default_and_hr_only(self):
+        client = APIClient()
+        client.force_authenticate(user=self.hr_user)
+        client.get('/api/leaves/')
+        response = client.get('/api/slow-queries/')
+        self.assertEqual(response.data['data']['entries'], [])
+        
+        employee_user = User.objects.create_user(
+            username='employee',
+            email='emp@example.com',
+            password='emppass123',
+            role='EMPLOYEE'
+        )
+        client.force_authenticate(user=employee_user)
+        response = client.get('/api/slow-queries/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,314 @@
+import difflib
+import re
+from datetime import date, timedelta
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from core.authentication import add_user_claims
+from employees.models import Employee, EmployeeSyncJob
+from leaves.models import LeaveRequest
+
+User = get_user_model()
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+def normalize_sql(sql):
+    """Replaces literals so queries that differ only in their parameters compare equal."""
+    return _LITERALS.sub('?', sql)
+
+
+class QueryBudgetTestCase(TestCase):
+    """Asserts how many queries an endpoint runs, and that the count does not grow with the data.
+
+    assertQueryBudget() runs the request once, calls `grow` to add rows, and runs it again. Either
+    run exceeding the budget, or the two runs differing, fails with the captured SQL of both
+    runs as a unified diff, so the repeated (N+1) statements stand out.
+    """
+
+    def setUp(self):
+        cache.clear()
+
+    def client_for(self, user):
+        client = APIClient()
+        token = add_user_claims(RefreshToken.for_user(user), user)
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token.access_token}')
+        return client
+
+    def capture(self, request, expected_status):
+        # Cached list responses would hide the queries under test.
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = request()
+        self.assertEqual(response.status_code, expected_status, getattr(response, 'data', response.content))
+        return [query['sql'] for query in context.captured_queries]
+
+    def assertQueryBudget(self, budget, request, grow=None, expected_status=200):
+        queries = self.capture(request, expected_status)
+        larger = None
+        if grow is not None:
+            grow()
+            larger = self.capture(request, expected_status)
+
+        counts = [len(queries)] + ([len(larger)] if larger is not None else [])
+        if max(counts) <= budget and len(set(counts)) == 1:
+            return
+
+        lines = [f'Query budget of {budget} exceeded or count grew with the data: {counts}']
+        if larger is not None:
+            lines += difflib.unified_diff(
+                [normalize_sql(sql) for sql in queries],
+                [normalize_sql(sql) for sql in larger],
+                fromfile='queries',
+                tofile='queries after grow()',
+                lineterm='',
+                n=len(queries) + len(larger)
+            )
+        else:
+            lines += [f'{number:>3}. {sql}' for number, sql in enumerate(queries, 1)]
+        self.fail('\n'.join(lines))
+
+
+class LeaveQueryBudgetTest(QueryBudgetTestCase):
+    def setUp(self):
+        super().setUp()
+        self.hr_user = User.objects.create_user(username='hr', email='hr@example.com', password='pass12345', role='HR')
+        self.employee_user = User.objects.create_user(
+            username='employee', email='employee@example.com', password='pass12345', role='EMPLOYEE'
+        )
+        self.employee = Employee.objects.create(
+            user=self.employee_user, name='Budget Employee', email='budget@example.com', company_id=1
+        )
+        self.hr = self.client_for(self.hr_user)
+        self.employee_client = self.client_for(self.employee_user)
+        self.leave = self.add_leaves(self.employee, 3)[0]
+
+    def add_leaves(self, employee, count, status='pending'):
+        start = LeaveRequest.objects.filter(employee=employee).count() * 3 + 10
+        leaves = []
+        for offset in range(start, start + count * 3, 3):
+            leave = LeaveRequest.objects.create(
+                employee=employee,
+                leave_type='annual',
+                start_date=date.today() + timedelta(days=offset),
+                end_date=date.today() + timedelta(days=offset + 1),
+                status=status
+            )
+            leaves.append(leave)
+        return leaves
+
+    def add_employees_with_leaves(self, count=5):
+        for index in range(count):
+            user = User.objects.create_user(
+                username=f'grow{index}', email=f'grow{index}@example.com', password='pass12345', role='EMPLOYEE'
+            )
+            employee = Employee.objects.create(
+                user=user, name=f'Grow {index}', email=f'grow-employee{index}@example.com', company_id=1
+            )
+            self.add_leaves(employee, 2)
+
+    def test_list_as_hr(self):
+        self.assertQueryBudget(2, lambda: self.hr.get('/api/leaves/'), grow=self.add_employees_with_leaves)
+
+    def test_list_as_employee(self):
+        self.assertQueryBudget(
+            2,
+            lambda: self.employee_client.get('/api/leaves/'),
+            grow=lambda: self.add_leaves(self.employee, 10)
+        )
+
+    def test_list_filtered_and_searched(self):
+        self.assertQueryBudget(
+            2,
+            lambda: self.hr.get('/api/leaves/', {'status': 'pending', 'search': 'example.com', 'page_size': 100}),
+            grow=self.add_employees_with_leaves
+        )
+
+    def test_retrieve_as_owner(self):
+        self.assertQueryBudget(1, lambda: self.employee_client.get(f'/api/leaves/{self.leave.pk}/'))
+
+    def test_retrieve_as_hr(self):
+        self.assertQueryBudget(1, lambda: self.hr.get(f'/api/leaves/{self.leave.pk}/'))
+
+    def test_create(self):
+        start = date.today() + timedelta(days=200)
+        self.assertQueryBudget(
+            4,
+            lambda: self.employee_client.post('/api/leaves/', {
+                'leave_type': 'sick',
+                'start_date': str(start),
+                'end_date': str(start + timedelta(days=1)),
+            }, format='json'),
+            expected_status=201
+        )
+
+    def test_approve(self):
+        self.assertQueryBudget(4, lambda: self.hr.patch(f'/api/leaves/{self.leave.pk}/approve/'))
+
+    def test_reject(self):
+        self.assertQueryBudget(3, lambda: self.hr.patch(f'/api/leaves/{self.leave.pk}/reject/'))
+
+    def test_partial_update(self):
+        self.assertQueryBudget(
+            3,
+            lambda: self.hr.patch(f'/api/leaves/{self.leave.pk}/', {'leave_type': 'casual'}, format='json')
+        )
+
+    def test_destroy(self):
+        self.assertQueryBudget(
+            2, lambda: self.employee_client.delete(f'/api/leaves/{self.leave.pk}/'), expected_status=204
+        )
+
+
+class EmployeeQueryBudgetTest(QueryBudgetTestCase):
+    def setUp(self):
+        super().setUp()
+        self.hr_user = User.objects.create_user(username='hr', email='hr@example.com', password='pass12345', role='HR')
+        self.hr = self.client_for(self.hr_user)
+        self.employee = Employee.objects.create(name='First Employee', email='first@example.com', company_id=7)
+
+    def add_employees(self, count=10):
+        for index in range(count):
+            Employee.objects.create(name=f'Employee {index}', email=f'employee{index}@example.com', company_id=7)
+
+    def test_list(self):
+        self.assertQueryBudget(2, lambda: self.hr.get('/api/employees/'), grow=self.add_employees)
+
+    def test_list_filtered_and_searched(self):
+        self.assertQueryBudget(
+            2,
+            lambda: self.hr.get('/api/employees/', {'company_id': 7, 'search': 'Employee', 'page_size': 100}),
+            grow=self.add_employees
+        )
+
+    def test_retrieve(self):
+        self.assertQueryBudget(1, lambda: self.hr.get(f'/api/employees/{self.employee.pk}/'))
+
+    def test_create(self):
+        self.assertQueryBudget(
+            3,
+            lambda: self.hr.post('/api/employees/', {
+                'name': 'Created Employee', 'email': 'created@example.com', 'company_id': 7
+            }, format='json'),
+            expected_status=201
+        )
+
+    def test_partial_update(self):
+        self.assertQueryBudget(
+            3,
+            lambda: self.hr.patch(f'/api/employees/{self.employee.pk}/', {'name': 'Renamed'}, format='json')
+        )
+
+    def test_destroy(self):
+        self.assertQueryBudget(3, lambda: self.hr.delete(f'/api/employees/{self.employee.pk}/'), expected_status=204)
+
+    def test_destroy_with_leaves(self):
+        counts = []
+        for index, leaves in enumerate((1, 10)):
+            employee = Employee.objects.create(name=f'Leaver {index}', email=f'leaver{index}@example.com', company_id=7)
+            LeaveRequest.objects.bulk_create(
+                LeaveRequest(
+                    employee=employee,
+                    leave_type='annual',
+                    start_date=date(2030, 1, 1) + timedelta(days=day * 3),
+                    end_date=date(2030, 1, 2) + timedelta(days=day * 3)
+                )
+                for day in range(leaves)
+            )
+            queries = self.capture(lambda: self.hr.delete(f'/api/employees/{employee.pk}/'), 204)
+            counts.append(len(queries))
+        
+        self.assertEqual(counts[0], counts[1])
+
+    def test_company_summary(self):
+        self.assertQueryBudget(1, lambda: self.hr.get('/api/companies/7/summary/'), grow=self.add_employees)
+
+    def test_sync_status(self):
+        job = EmployeeSyncJob.objects.create(api_url='https://example.com/users', requested_by=self.hr_user)
+        self.assertQueryBudget(1, lambda: self.hr.get(f'/api/employees/sync/{job.pk}/'))
+
+
+class TokenQueryBudgetTest(QueryBudgetTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(
+            username='tokenuser', email='token@example.com', password='pass12345', role='EMPLOYEE'
+        )
+        Employee.objects.create(user=self.user, name='Token Employee', email='token-employee@example.com', company_id=1)
+
+    def test_obtain_pair(self):
+        self.assertQueryBudget(
+            3,
+            lambda: APIClient().post('/api/token/', {'username': 'tokenuser', 'password': 'pass12345'}, format='json')
+        )
+
+    def test_refresh(self):
+        refresh = str(RefreshToken.for_user(self.user))
+        self.assertQueryBudget(1, lambda: APIClient().post('/api/token/refresh/', {'refresh': refresh}, format='json'))
+
+
+class HealthQueryBudgetTest(QueryBudgetTestCase):
+    def test_liveness(self):
+        self.assertQueryBudget(0, lambda: APIClient().get('/api/health/live/'))
+
+    def test_readiness(self):
+        # Served from the background prober's last result; at most the first probe runs inline.
+        self.client.get('/api/health/ready/')
+        self.assertQueryBudget(0, lambda: APIClient().get('/api/health/ready/'))
+
+
+class AdminQueryBudgetTest(QueryBudgetTestCase):
+    def setUp(self):
+        super().setUp()
+        admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='pass12345')
+        self.client.force_login(admin)
+        self.add_leaves(3)
+
+    def add_leaves(self, count=5):
+        for index in range(count):
+            employee = Employee.objects.create(
+                name=f'Admin Employee {Employee.objects.count()}',
+                email=f'admin-employee{Employee.objects.count()}@example.com',
+                company_id=1
+            )
+            LeaveRequest.objects.create(
+                employee=employee,
+                leave_type='annual',
+                start_date=date.today() + timedelta(days=1),
+                end_date=date.today() + timedelta(days=2)
+            )
+
+    def test_leave_request_changelist(self):
+        self.assertQueryBudget(5, lambda: self.client.get('/admin/leaves/leaverequest/'), grow=self.add_leaves)
+
+
+class QueryBudgetHarnessTest(QueryBudgetTestCase):
+    def test_growing_query_count_fails_with_sql_diff(self):
+        from django.http import HttpResponse
+        
+        def n_plus_one():
+            for leave in LeaveRequest.objects.all():
+                str(leave)
+            return HttpResponse()
+        
+        employee = Employee.objects.create(name='Harness', email='harness@example.com', company_id=1)
+        
+        def grow():
+            LeaveRequest.objects.create(
+                employee=employee,
+                leave_type='annual',
+                start_date=date.today() + timedelta(days=1),
+                end_date=date.today() + timedelta(days=2)
+            )
+        
+        with self.assertRaises(AssertionError) as context:
+            self.assertQueryBudget(5, n_plus_one, grow=grow)
+        
+        message = str(context.exception)
+        self.assertIn('count grew with the data: [1, 2]', message)
+        self.assertIn('+++ queries after grow()', message)
+        self.assertIn('+SELECT "employees"', message)